@@ -236,6 +236,13 @@ def run_rez_selftest():
     return run("selftest")
 
 
+@scriptname("rez-serve")
+def run_rez_serve():
+    check_production_install()
+    from rez.cli._main import run
+    return run("serve")
+
+
 @scriptname("rez-status")
 def run_rez_status():
     check_production_install()
@@ -68,6 +68,7 @@ subcommands = {
     "selftest": {
         "arg_mode": "grouped"
     },
+    "serve": {},
     "status": {},
     "suite": {},
     "test": {},
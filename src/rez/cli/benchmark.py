@@ -43,6 +43,16 @@ def setup_parser(parser, completions=False):
         "--iterations", type=int, default=1, metavar="N",
         help="Run every resolve N times and take the average (default: %(default)s)"
     )
+    parser.add_argument(
+        "--session", action="store_true",
+        help="Share loaded packages between resolves, as "
+        "ResolvedContext.resolve_many does"
+    )
+    parser.add_argument(
+        "--micro", metavar="NAME", choices=sorted(micro_benchmarks),
+        help="Run the micro-benchmark NAME on the benchmark packages, instead "
+        "of the resolves. One of: %s" % ", ".join(sorted(micro_benchmarks))
+    )
     parser.add_argument(
         "--histogram", action="store_true",
         help="Show an ASCII histogram of resolve times (from results in --out)"
@@ -61,7 +71,7 @@ def load_packages():
     from rez.packages import iter_package_families
 
     print("Warming package cache...")
-    fams = list(iter_package_families(paths=[pkg_repo_dir]))
+    fams = list(iter_package_families(paths=[pkg_repo_dir], prefetch=True))
 
     for i, fam in enumerate(fams):
         sys.stdout.write("\n[%d/%d]" % (i + 1, len(fams)))
@@ -127,7 +137,7 @@ def get_system_info():
 def do_resolves():
     from rez import module_root_path
     from rez.resolved_context import ResolvedContext
-    from rez.solver import SolverCallbackReturn
+    from rez.solver import SolverCallbackReturn, SolverSession
 
     filepath = os.path.join(module_root_path, "data", "benchmarking", "requests.json")
     with open(filepath) as f:
@@ -141,6 +151,7 @@ def do_resolves():
         return (SolverCallbackReturn.keep_going, '')
 
     summaries = []
+    solver_session = SolverSession() if _opts.session else None
     t_start = time.time()
 
     for i, request_list in enumerate(requests):
@@ -164,7 +175,8 @@ def do_resolves():
                     package_requests=request_list,
                     package_paths=[pkg_repo_dir],
                     add_implicit_packages=False,
-                    callback=callback
+                    callback=callback,
+                    solver_session=solver_session
                 )
                 secs += time.time() - t
 
@@ -215,6 +227,7 @@ def do_resolves():
         "num_success_resolves": n_resolve_times,
         "num_error_resolves": len(errors),
         "num_failed_resolves": len(fails),
+        "solver_session": _opts.session
     }
 
     stats.update(get_system_info())
@@ -245,7 +258,7 @@ def do_resolves():
         f.write(stats_str)
 
 
-def run_benchmark():
+def extract_packages():
     from rez import module_root_path
     from rez.utils.execution import Popen
 
@@ -267,10 +280,216 @@ def run_benchmark():
     )
     proc.wait()
 
+
+def run_benchmark():
+    extract_packages()
     load_packages()
     do_resolves()
 
 
+def get_requires_strings():
+    """Get the requirements of every package and variant in the benchmark
+    packages, as strings.
+    """
+    from rez.packages import iter_package_families
+
+    requires = []
+    for fam in iter_package_families(paths=[pkg_repo_dir]):
+        for pkg in fam.iter_packages():
+            requires.extend(str(x) for x in (pkg.requires or []))
+            for var in pkg.iter_variants():
+                requires.extend(str(x) for x in var.variant_requires)
+
+    return requires
+
+
+def time_calls(func, args):
+    """Call `func` on every item in `args`, and return the best time taken
+    over all iterations.
+    """
+    best = None
+    for _ in range(_opts.iterations):
+        t = time.time()
+        for arg in args:
+            func(arg)
+        secs = time.time() - t
+        best = secs if best is None else min(best, secs)
+
+    return best
+
+
+def bench_parse_requires():
+    """Parse every requirement string in the benchmark packages, with and
+    without the intern cache.
+    """
+    from rez.vendor.version.requirement import Requirement
+    from rez.vendor.version.util import intern_cache
+
+    requires = get_requires_strings()
+    max_size = intern_cache.max_size
+
+    try:
+        intern_cache.max_size = 0
+        intern_cache.clear()
+        uncached = time_calls(Requirement, requires)
+    finally:
+        intern_cache.max_size = max_size
+
+    intern_cache.clear()
+    cached = time_calls(Requirement, requires)
+
+    return {
+        "num_requires": len(requires),
+        "num_unique_requires": len(set(requires)),
+        "uncached_time": uncached,
+        "cached_time": cached
+    }
+
+
+def bench_sort_versions():
+    """Sort the versions of every package family in the benchmark packages,
+    in ascending and descending order.
+    """
+    from rez.packages import iter_package_families
+    from rez.vendor.version.version import reverse_sort_key
+
+    families = []
+    for fam in iter_package_families(paths=[pkg_repo_dir]):
+        families.append([x.version for x in fam.iter_packages()])
+
+    ascending = time_calls(sorted, families)
+    descending = time_calls(lambda x: sorted(x, key=reverse_sort_key), families)
+
+    return {
+        "num_families": len(families),
+        "num_versions": sum(len(x) for x in families),
+        "ascending_time": ascending,
+        "descending_time": descending
+    }
+
+
+def bench_contains_versions():
+    """Test a family of 10000 versions for containment in each version range
+    required by the benchmark packages, one version at a time and in batch.
+
+    The callers are timed too, on versions in no particular order (as
+    repositories return them): filtering one version at a time (as
+    `iter_packages` does), sorting and then filtering in batch, and the
+    solver's version index (see `_VersionIndex`), which sorts just once.
+    """
+    from random import Random
+    from rez.solver import _VersionIndex
+    from rez.vendor.version.requirement import Requirement
+    from rez.vendor.version.version import Version
+
+    ranges = set()
+    for s in get_requires_strings():
+        range_ = Requirement(s).range
+        if range_ is not None:
+            ranges.add(range_)
+
+    versions = sorted(
+        Version("%d.%d.%d" % (x // 1000, (x // 10) % 100, x % 10))
+        for x in range(10000)
+    )
+    ranges = sorted(ranges, key=str)
+
+    def _test_each(range_):
+        return [x in range_ for x in versions]
+
+    def _test_batch(range_):
+        return range_.contains_versions(versions)
+
+    single = time_calls(_test_each, ranges)
+    batch = time_calls(_test_batch, ranges)
+
+    # unsorted callers, on a sample of the ranges
+    unsorted = list(versions)
+    Random(0).shuffle(unsorted)
+    sample = ranges[::20]
+
+    def _filter_each(range_):
+        return [x for x in unsorted if x in range_]
+
+    def _filter_sorted(range_):
+        versions_ = sorted(unsorted)
+        return [versions_[k] for i, j in range_.intersect_spans(versions_)
+                for k in range(i, j)]
+
+    t = time.time()
+    index = _VersionIndex(unsorted)
+    index_build = time.time() - t
+
+    filter_each = time_calls(_filter_each, sample)
+    filter_sorted = time_calls(_filter_sorted, sample)
+    index_query = time_calls(index.get_intersection, sample)
+
+    return {
+        "num_ranges": len(ranges),
+        "num_versions": len(versions),
+        "single_time": single,
+        "batch_time": batch,
+        "num_unsorted_ranges": len(sample),
+        "unsorted_single_time": filter_each,
+        "unsorted_sort_and_batch_time": filter_sorted,
+        "unsorted_index_build_time": index_build,
+        "unsorted_index_query_time": index_query
+    }
+
+
+def bench_parse_ranges():
+    """Parse the version range of every requirement in the benchmark packages,
+    with the regex-based and the single pass range parsers.
+    """
+    from rez.vendor.version.requirement import Requirement
+    from rez.vendor.version.version import AlphanumericVersionToken, \
+        _VersionRangeParser, _SinglePassVersionRangeParser
+
+    ranges = []
+    for s in get_requires_strings():
+        range_ = Requirement(s).range
+        if range_ is not None:
+            ranges.append(str(range_))
+
+    def _timer(parser_class):
+        def _parse(range_str):
+            parser_class(range_str, AlphanumericVersionToken)
+        return time_calls(_parse, ranges)
+
+    regex = _timer(_VersionRangeParser)
+    single_pass = _timer(_SinglePassVersionRangeParser)
+
+    return {
+        "num_ranges": len(ranges),
+        "num_unique_ranges": len(set(ranges)),
+        "regex_time": regex,
+        "single_pass_time": single_pass
+    }
+
+
+micro_benchmarks = {
+    "contains_versions": bench_contains_versions,
+    "parse_ranges": bench_parse_ranges,
+    "parse_requires": bench_parse_requires,
+    "sort_versions": bench_sort_versions
+}
+
+
+def run_micro_benchmark():
+    extract_packages()
+
+    print("Running %s micro-benchmark..." % _opts.micro)
+    stats = micro_benchmarks[_opts.micro]()
+    stats.update(get_system_info())
+
+    print("\nRESULT:")
+    stats_str = json.dumps(stats, indent=2)
+    print(stats_str)
+
+    with open(os.path.join(out_dir, "micro_%s.json" % _opts.micro), 'w') as f:
+        f.write(stats_str)
+
+
 def print_histogram():
     n_rows = 40
     n_columns = 40
@@ -382,5 +601,7 @@ def command(opts, parser, extra_arg_groups=None):
         print_histogram()
     elif opts.compare:
         compare()
+    elif opts.micro:
+        run_micro_benchmark()
     else:
         run_benchmark()
@@ -124,7 +124,7 @@ def setup_parser(parser, completions=False):
         "when verbosity is enabled)")
     parser.add_argument(
         "--stats", action="store_true",
-        help="print advanced solver stats")
+        help="print advanced solver and resolve cache stats")
     parser.add_argument(
         "--no-pkg-cache", action="store_true",
         help="Disable package caching")
@@ -17,6 +17,8 @@
 Manage and query memcache server(s).
 """
 from __future__ import print_function
+import os.path
+import time
 
 
 def setup_parser(parser, completions=False):
@@ -38,6 +40,16 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--warm", action="store_true",
         help="warm the cache server with visible packages")
+    parser.add_argument(
+        "--warm-resolves", dest="warm_resolves", nargs='*', metavar="SOURCE",
+        help="warm the resolve cache(s) by re-resolving each SOURCE, which is "
+        "either a request (eg 'foo-1 bah'), a context (.rxt) file, or a suite "
+        "directory. If no SOURCE is given, the contexts of visible suites (see "
+        "'rez-suite --list') are used")
+    parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="number of worker processes used to warm resolves (default: "
+        "number of cores)")
 
 
 def poll(client, interval):
@@ -86,6 +98,96 @@ def poll(client, interval):
         time.sleep(interval)
 
 
+def _get_warm_resolve_sources(sources):
+    from rez.suite import Suite
+
+    if sources:
+        suites = []
+        result = []
+
+        for source in sources:
+            if os.path.isdir(source):
+                suites.append(Suite.load(source))
+            else:
+                result.append(source)
+    else:
+        suites = Suite.load_visible_suites()
+        result = []
+
+    for suite in suites:
+        for context_name in sorted(suite.context_names):
+            result.append(suite._context_path(context_name))
+
+    return result
+
+
+def _warm_resolve(source):
+    # runs in a worker process
+    from rez.resolved_context import ResolvedContext
+    from rez.vendor.six import six
+
+    t = time.time()
+
+    try:
+        if source.endswith(".rxt"):
+            # re-resolve the context's request, with the same settings
+            rc = ResolvedContext.load(source)
+            context = ResolvedContext(
+                rc.requested_packages(include_implicit=True),
+                timestamp=rc.requested_timestamp,
+                building=rc.building,
+                caching=True,
+                package_paths=rc.package_paths,
+                package_filter=rc.package_filter,
+                package_orderers=rc.package_orderers,
+                add_implicit_packages=False)
+        else:
+            context = ResolvedContext(source.split(), caching=True)
+    except Exception as e:
+        return source, "error: %s" % six.text_type(e), time.time() - t
+
+    if context.from_cache:
+        status = "fresh"
+    elif context.success:
+        status = "warmed"
+    else:
+        status = "failed"
+
+    return source, status, time.time() - t
+
+
+def warm_resolves(sources, num_workers, verbose=False):
+    from rez.utils.formatting import columnise
+    from multiprocessing import Pool
+
+    sources = _get_warm_resolve_sources(sources)
+    if not sources:
+        print("no resolves to warm.")
+        return
+
+    pool = Pool(max(min(num_workers, len(sources)), 1))
+    rows = []
+
+    try:
+        for source, status, secs in pool.imap(_warm_resolve, sources):
+            if verbose:
+                print("%s: %s (%.02f secs)" % (source, status, secs))
+            rows.append((source, status, "%.02f" % secs))
+    finally:
+        pool.close()
+        pool.join()
+
+    rows = [("SOURCE", "STATUS", "SECS"),
+            ("------", "------", "----")] + rows
+
+    print('\n'.join(columnise(rows)))
+
+    statuses = [x[1] for x in rows[2:]]
+    print("\n%d resolves warmed, %d already fresh, %d failed."
+          % (statuses.count("warmed"), statuses.count("fresh"),
+             len(statuses) - statuses.count("warmed") - statuses.count("fresh")))
+
+
 def command(opts, parser, extra_arg_groups=None):
     from rez.config import config
     from rez.packages import iter_package_families, iter_packages
@@ -93,8 +195,19 @@ def command(opts, parser, extra_arg_groups=None):
     from rez.utils.memcached import Client
     from rez.utils.formatting import columnise, readable_time_duration, \
         readable_memory_size
+    from rez.utils.platform_ import platform_
     import sys
 
+    if opts.warm_resolves is not None:
+        if not (config.resolve_caching
+                and (config.memcached_uri or config.resolve_cache_path)):
+            print("resolve caching is not enabled.", file=sys.stderr)
+            sys.exit(1)
+
+        num_workers = opts.workers or platform_.logical_cores
+        warm_resolves(opts.warm_resolves, num_workers, verbose=opts.verbose)
+        return
+
     memcache_client = Client(servers=config.memcached_uri,
                              debug=config.debug_memcache)
 
@@ -145,6 +258,8 @@ def command(opts, parser, extra_arg_groups=None):
         if stats:
             txt = dump_yaml(stats)
             print(txt)
+            txt = dump_yaml({"kinds": memcache_client.get_kind_stats()})
+            print(txt)
         else:
             _fail()
         return
@@ -179,3 +294,29 @@ def command(opts, parser, extra_arg_groups=None):
 
         rows.append(row)
     print('\n'.join(columnise(rows)))
+
+    # print hit ratios by kind of cache entry
+    kind_stats = memcache_client.get_kind_stats()
+    if not kind_stats:
+        return
+
+    rows = [["CACHE ENTRY KIND", "LOCAL HITS", "HITS", "MISSES", "HIT RATIO"],
+            ["----------------", "----------", "----", "------", "---------"]]
+
+    for kind, counts in sorted(kind_stats.items()):
+        local_hits = counts["local_hits"]
+        hits = counts["hits"]
+        misses = counts["misses"]
+
+        hit_ratio = float(local_hits + hits) / max(local_hits + hits + misses, 1)
+        hit_percent = int(hit_ratio * 100.0)
+
+        row = (kind,
+               str(local_hits),
+               str(hits),
+               str(misses),
+               "%d%%" % hit_percent)
+
+        rows.append(row)
+    print('')
+    print('\n'.join(columnise(rows)))
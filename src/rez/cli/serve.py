@@ -0,0 +1,69 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+'''
+Run a local resolve server, that other rez processes send resolves to.
+'''
+from __future__ import print_function
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "--socket", metavar="PATH",
+        help="Unix socket to listen on (default: the 'resolve_server_socket' "
+        "config setting)")
+    parser.add_argument(
+        "--status", action="store_true",
+        help="print the status of the resolve server, rather than running it")
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.config import config
+    from rez.resolve_server import ResolveServer, ResolveServerError, \
+        send_request
+    import sys
+
+    socket_path = opts.socket or config.resolve_server_socket
+    if not socket_path:
+        print("No socket given, and 'resolve_server_socket' is not set.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    if opts.status:
+        try:
+            result = send_request(socket_path, "ping", timeout=5.0)
+        except ResolveServerError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+
+        print("resolve server (pid %d) on %s has served %d requests."
+              % (result["pid"], socket_path, result["num_requests"]))
+        return
+
+    if socket_path != config.resolve_server_socket:
+        print("Warning: clients only use the server on the socket set in "
+              "'resolve_server_socket' (%s)." % config.resolve_server_socket,
+              file=sys.stderr)
+
+    server = ResolveServer(socket_path, verbose=opts.verbose)
+    print("resolve server listening on %s" % socket_path)
+
+    try:
+        server.serve_forever()
+    except ResolveServerError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
@@ -285,6 +285,13 @@ class VariantSelectMode_(Str):
         return Or(*(x.name for x in VariantSelectMode))
 
 
+class ScopeSplitMode_(Str):
+    @cached_class_property
+    def schema(cls):
+        from rez.solver import ScopeSplitMode
+        return Or(*(x.name for x in ScopeSplitMode))
+
+
 class RezToolsVisibility_(Str):
     @cached_class_property
     def schema(cls):
@@ -379,6 +386,9 @@ config_schema = Schema({
     "create_executable_script_mode":                ExecutableScriptMode_,
     "suite_alias_prefix_char":                      Char,
     "cache_packages_path":                          OptionalStr,
+    "package_file_cache_path":                      OptionalStr,
+    "resolve_cache_path":                           OptionalStr,
+    "resolve_server_socket":                        OptionalStr,
     "package_definition_python_path":               OptionalStr,
     "tmpdir":                                       OptionalStr,
     "context_tmpdir":                               OptionalStr,
@@ -420,10 +430,19 @@ config_schema = Schema({
     "memcached_context_file_min_compress_len":      Int,
     "memcached_listdir_min_compress_len":           Int,
     "memcached_resolve_min_compress_len":           Int,
+    "package_file_cache_max_size":                  Int,
+    "resolve_cache_max_size":                       Int,
+    "memcached_disk_cache_max_size":                Int,
+    "memcached_local_cache_max_size":               Int,
+    "memcached_kind_stats":                         Bool,
+    "resolve_caching_threads":                      Int,
+    "solver_parallel_workers":                      Int,
+    "scope_split_mode":                             ScopeSplitMode_,
     "shell_error_truncate_cap":                     Int,
     "package_cache_log_days":                       Int,
     "package_cache_max_variant_days":               Int,
     "package_cache_clean_limit":                    Float,
+    "resolve_server_timeout":                       Float,
     "allow_unversioned_packages":                   Bool,
     "rxt_as_yaml":                                  Bool,
     "package_cache_during_build":                   Bool,
@@ -434,6 +453,7 @@ config_schema = Schema({
     "cache_package_files":                          Bool,
     "cache_listdir":                                Bool,
     "prune_failed_graph":                           Bool,
+    "rxt_include_graph":                            Bool,
     "all_parent_variables":                         Bool,
     "all_resetting_variables":                      Bool,
     "package_commands_sourced_first":               Bool,
@@ -449,7 +469,9 @@ config_schema = Schema({
     "debug_resources":                              Bool,
     "debug_package_exclusions":                     Bool,
     "debug_memcache":                               Bool,
+    "debug_disk_cache":                             Bool,
     "debug_resolve_memcache":                       Bool,
+    "debug_resolve_server":                         Bool,
     "debug_context_tracking":                       Bool,
     "debug_all":                                    Bool,
     "debug_none":                                   Bool,
@@ -0,0 +1,2 @@
+name = "test_nogood_a"
+version = "1.0"
@@ -0,0 +1,4 @@
+name = "test_nogood_a"
+version = "2.0"
+
+requires = ["test_nogood_c-2"]
@@ -0,0 +1,4 @@
+name = "test_nogood_b"
+version = "1.0"
+
+requires = ["test_nogood_d"]
@@ -0,0 +1,2 @@
+name = "test_nogood_c"
+version = "2.0"
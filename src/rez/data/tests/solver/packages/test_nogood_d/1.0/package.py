@@ -0,0 +1,4 @@
+name = "test_nogood_d"
+version = "1.0"
+
+requires = ["!test_nogood_c-2"]
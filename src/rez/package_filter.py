@@ -103,6 +103,9 @@ class PackageFilter(PackageFilterBase):
     excluded iff it matches one or more exclusion rules, and does not match any
     inclusion rules.
     """
+    # max number of verdicts remembered, see `_excludes_handle`
+    max_verdicts = 100000
+
     def __init__(self):
         self._excludes = {}
         self._includes = {}
@@ -111,29 +114,37 @@ class PackageFilter(PackageFilterBase):
         if not self._excludes:
             return None  # quick out
 
-        def _match(rules):
-            if rules:
-                for rule in rules:
-                    if rule.match(package):
-                        return rule
-            return None
+        return self._excludes_handle(package, package.handle)
+
+    def _excludes_handle(self, package, handle):
+        # verdicts are remembered per package, since filters tend to be
+        # applied to the same packages over and over (eg in every resolve)
+        verdicts = self._verdicts
+        excl = verdicts.get(handle, KeyError)
+        if excl is not KeyError:
+            return excl
 
-        excludes = self._excludes.get(package.name)
-        excl = _match(excludes)
-        if not excl:
-            excludes = self._excludes.get(None)
-            excl = _match(excludes)
+        excludes, includes = self._compiled_rules
+        name = package.name
+
+        excl = None
+        for family in (name, None):
+            rules = excludes.get(family)
+            if rules:
+                excl = rules.match(package)
+                if excl:
+                    break
 
         if excl:
-            includes = self._includes.get(package.name)
-            incl = _match(includes)
-            if incl:
-                excl = None
-            else:
-                includes = self._includes.get(None)
-                if _match(includes):
+            for family in (name, None):
+                rules = includes.get(family)
+                if rules and rules.match(package):
                     excl = None
+                    break
 
+        if len(verdicts) >= self.max_verdicts:
+            verdicts.clear()
+        verdicts[handle] = excl
         return excl
 
     def add_exclusion(self, rule):
@@ -213,6 +224,23 @@ class PackageFilter(PackageFilterBase):
         rules_ = rules_dict.get(family, [])
         rules_dict[family] = sorted(rules_ + [rule], key=lambda x: x.cost())
         cached_property.uncache(self, "cost")
+        cached_property.uncache(self, "_compiled_rules")
+        cached_property.uncache(self, "_verdicts")
+
+    @cached_property
+    def _compiled_rules(self):
+        def _compile(rules_dict):
+            return dict(
+                (family, _CompiledRules(rules))
+                for family, rules in rules_dict.items()
+            )
+
+        return _compile(self._excludes), _compile(self._includes)
+
+    @cached_property
+    def _verdicts(self):
+        # package handle -> excluding rule, or None
+        return {}
 
     def __str__(self):
         def sortkey(rule_items):
@@ -262,10 +290,19 @@ class PackageFilterList(PackageFilterBase):
             f.add_inclusion(rule)
 
     def excludes(self, package):
+        handle = None
+
         for f in self.filters:
-            rule = f.excludes(package)
+            if not f._excludes:
+                continue
+
+            if handle is None:
+                handle = package.handle
+
+            rule = f._excludes_handle(package, handle)
             if rule:
                 return rule
+
         return None
 
     def copy(self):
@@ -310,6 +347,76 @@ class PackageFilterList(PackageFilterBase):
 no_filter = PackageFilterList()
 
 
+class _CompiledRules(object):
+    """A sorted list of rules, compiled for matching.
+
+    The glob and regex rules in the list are merged into a few regexes, so
+    that a package is matched against many of them at once. The first rule in
+    the list that matches a package is still the one that is returned.
+    """
+
+    # Each merged rule is a group in its regex, and python2's re module
+    # supports at most 100 groups per regex.
+    max_groups = 100
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.regex_rules = []
+        self.regexes = []
+
+        # index into self.regexes of the regex that each rule is merged into
+        self.merged = [None] * len(rules)
+
+        indices = [
+            i for i, rule in enumerate(rules)
+            if isinstance(rule, RegexRuleBase) and rule.can_merge()
+        ]
+
+        for j in range(0, len(indices), self.max_groups):
+            indices_ = indices[j:j + self.max_groups]
+            if len(indices_) < 2:
+                continue
+
+            # each rule's pattern becomes a group of the merged regex, and
+            # the first group (ie rule) that can match is the one that does
+            regex_rules = [rules[i] for i in indices_]
+            pattern = '|'.join("(%s)" % x.regex.pattern for x in regex_rules)
+
+            try:
+                regex = re.compile(pattern)
+            except (re.error, AssertionError):
+                continue  # these rules are matched one by one
+
+            for i in indices_:
+                self.merged[i] = len(self.regexes)
+
+            self.regexes.append((regex, regex_rules))
+            self.regex_rules.extend(regex_rules)
+
+    def match(self, package):
+        """Returns the first rule that matches the package, or None."""
+        regex_matches = {}
+
+        for rule, merged in zip(self.rules, self.merged):
+            if merged is None:
+                if rule.match(package):
+                    return rule
+                continue
+
+            regex_match = regex_matches.get(merged, KeyError)
+
+            if regex_match is KeyError:
+                regex, regex_rules = self.regexes[merged]
+                m = regex.match(package.qualified_name)
+                regex_match = regex_rules[m.lastindex - 1] if m else None
+                regex_matches[merged] = regex_match
+
+            if regex_match is rule:
+                return rule
+
+        return None
+
+
 class Rule(object):
     name = None
 
@@ -410,6 +517,15 @@ class RegexRuleBase(Rule):
     def match(self, package):
         return bool(self.regex.match(package.qualified_name))
 
+    def can_merge(self):
+        """Returns True if this rule's regex can be merged with others, into a
+        single regex (see `_CompiledRules`).
+
+        Patterns containing groups or global flags cannot be merged.
+        """
+        return (self.regex.groups == 0) \
+            and not (self.regex.flags & ~re.UNICODE)
+
     def cost(self):
         return 10
 
@@ -471,8 +587,12 @@ class RangeRule(Rule):
         self._family = requirement.name
 
     def match(self, package):
-        o = VersionedObject.construct(package.name, package.version)
-        return not self._requirement.conflicts_with(o)
+        # equivalent to testing for a conflict with the package, without
+        # constructing a `VersionedObject` for it
+        if package.name != self._family or self._requirement.range_ is None:
+            return True
+        return (package.version in self._requirement.range_) \
+            != self._requirement.conflict
 
     def cost(self):
         return 10
@@ -530,7 +650,8 @@ class TimestampRule(Rule):
             return (package.timestamp <= self.timestamp)
 
     def cost(self):
-        # This is expensive because it causes a package load
+        # This is expensive because it can cause a package load, if the
+        # package's repository doesn't store release times separately
         return 1000
 
     @classmethod
@@ -111,6 +111,18 @@ class PackageRepository(object):
         """Clear any cached resources in the pool."""
         self.pool.clear_caches()
 
+    def is_stale(self):
+        """Determine if data cached by this repository is out of date.
+
+        This is used by long-running processes (such as the resolve server, see
+        `rez.resolve_server`) to decide when caches need to be cleared. By
+        default, this returns False.
+
+        Returns:
+            bool: True if `clear_caches` should be called.
+        """
+        return False
+
     @cached_property
     def uid(self):
         """Returns a unique identifier for this repository.
@@ -205,6 +217,17 @@ class PackageRepository(object):
 
         return None
 
+    def prefetch_packages(self, names):
+        """Hint that the packages of the given families are about to be read.
+
+        Repositories may use this to fetch the packages ahead of time, for
+        example concurrently. The default implementation does nothing.
+
+        Args:
+            names (list of str): Package family names.
+        """
+        pass
+
     def get_package_from_uri(self, uri):
         """Get a package given its URI.
 
@@ -413,6 +436,22 @@ class PackageRepository(object):
         """
         return 0
 
+    def get_package_timestamp(self, package_resource):
+        """Get the release time of a package, without loading it.
+
+        Timestamped resolves need the release time of every package in the
+        families they consider. A repository that can get these more cheaply
+        than by loading each package should implement this.
+
+        Args:
+            package_resource (`PackageResource`): Package.
+
+        Returns:
+            int: Epoch time at which the package was released, or None if this
+                is not known without loading the package.
+        """
+        return None
+
     def make_resource_handle(self, resource_key, **variables):
         """Create a `ResourceHandle`
 
@@ -636,6 +675,18 @@ class PackageRepositoryManager(object):
         self.repositories.clear()
         self.pool.clear_caches()
 
+    def clear_stale_caches(self):
+        """Clear cached data of repositories that have changed.
+
+        Returns:
+            list of `PackageRepository`: Repositories whose caches were cleared.
+        """
+        stale_repos = [x for x in self.repositories.values() if x.is_stale()]
+
+        for repo in stale_repos:
+            repo.clear_caches()
+        return stale_repos
+
     def _get_repository(self, path, **repo_args):
         repo_type, location = path.split('@', 1)
         cls = plugin_manager.get_plugin_class('package_repository', repo_type)
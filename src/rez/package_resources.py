@@ -24,6 +24,7 @@ from rez.utils.formatting import PackageRequest
 from rez.exceptions import PackageMetadataError, ResourceError
 from rez.config import config, Config, create_config
 from rez.vendor.version.version import Version
+from rez.vendor.version.requirement import RequirementList
 from rez.vendor.schema.schema import Schema, SchemaError, Optional, Or, And, Use
 from rez.vendor.six import six
 
@@ -383,12 +384,67 @@ class VariantResource(PackageResource):
         """
         return self._subpath()
 
+    def get_requires(self, build_requires=False, private_build_requires=False):
+        """Get the requirements of the variant, if they are not late bound.
+
+        The requirements are gathered once per resource (for each combination
+        of arguments), and then shared by every `Variant` of this resource.
+
+        Args:
+            build_requires (bool): If True, include build requirements.
+            private_build_requires (bool): If True, include private build
+                requirements.
+
+        Returns:
+            Tuple of `Requirement` objects, or None if the requirements can
+            only be determined in a context (ie, they are late bound), or if
+            the repository does not provide them.
+        """
+        key = (build_requires, private_build_requires)
+        requires = self._requires_cache.get(key, KeyError)
+
+        if requires is KeyError:
+            requires = self._get_requires(build_requires, private_build_requires)
+            self._requires_cache[key] = requires
+
+        return requires
+
+    def get_requirement_list(self, build_requires=False):
+        """Get the requirements of the variant as a `RequirementList`.
+
+        Like `get_requires`, the list is created once and shared, so it must
+        not be changed.
+
+        Returns:
+            `RequirementList`, or None if the requirements are not available
+            (see `get_requires`).
+        """
+        key = ("list", build_requires)
+        reqlist = self._requires_cache.get(key, KeyError)
+
+        if reqlist is KeyError:
+            requires = self.get_requires(build_requires=build_requires)
+            if requires is not None:
+                reqlist = RequirementList(requires)
+            else:
+                reqlist = None
+            self._requires_cache[key] = reqlist
+
+        return reqlist
+
+    @cached_property
+    def _requires_cache(self):
+        return {}
+
     def _root(self, ignore_shortlinks=False):
         raise NotImplementedError
 
     def _subpath(self, ignore_shortlinks=False):
         raise NotImplementedError
 
+    def _get_requires(self, build_requires, private_build_requires):
+        return None
+
 
 # ------------------------------------------------------------------------------
 # resource helper classes
@@ -530,6 +586,25 @@ class VariantResourceHelper(six.with_metaclass(_Metas, VariantResource)):
                     "Unexpected error - variant %s cannot be found in its "
                     "parent package %s" % (self.uri, self.parent.uri))
 
+    def _get_requires(self, build_requires, private_build_requires):
+        requires = []
+        keys = ["requires"]
+        if build_requires:
+            keys.append("build_requires")
+        if private_build_requires:
+            keys.append("private_build_requires")
+
+        for key in keys:
+            value = getattr(self, key)
+            if isinstance(value, SourceCode):
+                return None  # late bound
+
+            requires.extend(value or [])
+            if key == "requires":
+                requires.extend(self.variant_requires)
+
+        return tuple(requires)
+
     @property
     def wrapped(self):  # forward Package attributes onto ourself
         return self.parent
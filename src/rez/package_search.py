@@ -25,7 +25,8 @@ import fnmatch
 from collections import defaultdict
 import sys
 
-from rez.packages import iter_package_families, iter_packages, get_latest_package
+from rez.packages import iter_package_families, iter_packages, \
+    get_latest_package, prefetch_packages
 from rez.exceptions import PackageFamilyNotFoundError, ResourceContentError
 from rez.util import ProgressBar
 from rez.utils.colorize import critical, info, error, Printer
@@ -76,6 +77,7 @@ def get_reverse_dependency_tree(package_name, depth=None, paths=None,
     if depth == 0:
         return pkgs_list, g
 
+    prefetch_packages(package_names, paths=paths)
     bar = ProgressBar("Searching", len(package_names))
     lookup = defaultdict(set)
 
@@ -151,7 +153,7 @@ def get_plugins(package_name, paths=None):
     if not pkg.has_plugins:
         return []
 
-    it = iter_package_families(paths)
+    it = iter_package_families(paths, prefetch=True)
     package_names = set(x.name for x in it)
     bar = ProgressBar("Searching", len(package_names))
 
@@ -279,6 +281,7 @@ class ResourceSearcher(object):
             return "family", results
 
         results = []
+        prefetch_packages(family_names, paths=self.package_paths)
 
         # iterate over packages/variants
         for name in family_names:
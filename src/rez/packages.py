@@ -26,7 +26,7 @@ from rez.utils.schema import schema_keys
 from rez.utils.resources import ResourceHandle, ResourceWrapper
 from rez.exceptions import PackageFamilyNotFoundError, ResourceError
 from rez.vendor.version.version import Version, VersionRange
-from rez.vendor.version.requirement import VersionedObject
+from rez.vendor.version.requirement import VersionedObject, RequirementList
 from rez.vendor.six import six
 from rez.serialise import FileFormat
 from rez.config import config
@@ -264,6 +264,21 @@ class Package(PackageBaseResourceWrapper):
         family = self.repository.get_parent_package_family(self.resource)
         return PackageFamily(family) if family else None
 
+    @property
+    def timestamp(self):
+        """Get the release time of the package.
+
+        The package is only loaded if its repository can't provide this any
+        other way (see `PackageRepository.get_package_timestamp`).
+
+        Returns:
+            int: Epoch time, or None if the package has no timestamp.
+        """
+        timestamp = self.repository.get_package_timestamp(self.resource)
+        if timestamp is None:
+            timestamp = self.resource.timestamp
+        return timestamp
+
     @cached_property
     def num_variants(self):
         return len(self.data.get("variants", []))
@@ -416,11 +431,9 @@ class Variant(PackageBaseResourceWrapper):
         specific variant.
 
         Returns:
-            List of `Requirement` objects.
+            Tuple of `Requirement` objects.
         """
-        return (
-            (self.parent.requires or []) + self.variant_requires
-        )
+        return self.get_requires()
 
     def get_requires(self, build_requires=False, private_build_requires=False):
         """Get the requirements of the variant.
@@ -431,16 +444,45 @@ class Variant(PackageBaseResourceWrapper):
                 requirements.
 
         Returns:
-            List of `Requirement` objects.
+            Tuple of `Requirement` objects.
         """
-        requires = self.requires or []
+        # requirements that aren't late bound are shared by the resource
+        requires = self.resource.get_requires(
+            build_requires=build_requires,
+            private_build_requires=private_build_requires
+        )
+
+        if requires is not None:
+            return requires
+
+        requires = (self.parent.requires or []) + self.variant_requires
 
         if build_requires:
             requires = requires + (self.build_requires or [])
         if private_build_requires:
             requires = requires + (self.private_build_requires or [])
 
-        return requires
+        return tuple(requires)
+
+    def get_requirement_list(self, build_requires=False):
+        """Get the requirements of the variant as a `RequirementList`.
+
+        The list may be shared, so it must not be changed.
+
+        Args:
+            build_requires (bool): If True, include build requirements.
+
+        Returns:
+            `RequirementList`.
+        """
+        reqlist = self.resource.get_requirement_list(
+            build_requires=build_requires)
+
+        if reqlist is None:
+            requires = self.get_requires(build_requires=build_requires)
+            reqlist = RequirementList(requires)
+
+        return reqlist
 
     def install(self, path, dry_run=False, overrides=None):
         """Install this variant into another package repository.
@@ -529,7 +571,7 @@ class PackageSearchPath(object):
 # resource acquisition functions
 # ------------------------------------------------------------------------------
 
-def iter_package_families(paths=None):
+def iter_package_families(paths=None, prefetch=False):
     """Iterate over package families, in no particular order.
 
     Note that multiple package families with the same name can be returned.
@@ -539,16 +581,45 @@ def iter_package_families(paths=None):
     Args:
         paths (list of str, optional): paths to search for package families,
             defaults to `config.packages_path`.
+        prefetch (bool): If True, the packages of every family are going to be
+            read, so repositories are given the chance to fetch them ahead of
+            time (see `prefetch_packages`).
 
     Returns:
         `PackageFamily` iterator.
     """
     for path in (paths or config.packages_path):
         repo = package_repository_manager.get_repository(path)
-        for resource in repo.iter_package_families():
+
+        if prefetch:
+            resources = list(repo.iter_package_families())
+            repo.prefetch_packages([x.name for x in resources])
+        else:
+            resources = repo.iter_package_families()
+
+        for resource in resources:
             yield PackageFamily(resource)
 
 
+def prefetch_packages(names, paths=None):
+    """Hint that the packages of the given families are about to be read.
+
+    This allows package repositories to fetch the packages ahead of time - for
+    example, the filesystem repository scans family directories concurrently
+    (see its 'scan_threads' setting).
+
+    Args:
+        names (list of str): Package family names.
+        paths (list of str, optional): paths to search for packages, defaults
+            to `config.packages_path`.
+    """
+    names = list(names)
+
+    for path in (paths or config.packages_path):
+        repo = package_repository_manager.get_repository(path)
+        repo.prefetch_packages(names)
+
+
 def iter_packages(name, range_=None, paths=None):
     """Iterate over `Package` instances, in no particular order.
 
@@ -568,6 +639,11 @@ def iter_packages(name, range_=None, paths=None):
     """
     entries = _get_families(name, paths)
 
+    if isinstance(range_, basestring):
+        range_ = VersionRange(range_)
+    if not range_ or range_.is_any():
+        range_ = None
+
     seen = set()
     for repo, family_resource in entries:
         for package_resource in repo.iter_packages(family_resource):
@@ -576,11 +652,12 @@ def iter_packages(name, range_=None, paths=None):
                 continue
 
             seen.add(key)
-            if range_:
-                if isinstance(range_, basestring):
-                    range_ = VersionRange(range_)
-                if package_resource.version not in range_:
-                    continue
+
+            # Note: Repositories return packages in no particular order, so
+            # testing each version is cheaper than sorting them to use the
+            # batch test (`VersionRange.intersect_spans`).
+            if range_ is not None and package_resource.version not in range_:
+                continue
 
             yield Package(package_resource)
 
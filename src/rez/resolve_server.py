@@ -0,0 +1,387 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+A long-running local server that performs resolves.
+
+Every rez process otherwise pays to import rez, load config and plugins, and
+read package repositories from scratch. The server keeps all of this in memory
+between requests. It is started with 'rez-serve', and listens on the Unix
+socket given by the 'resolve_server_socket' config setting, which is also how
+clients find it (see `ResolvedContext`).
+
+Requests and responses are JSON. A client sends a single request per
+connection, then shuts down its side of the socket; the server replies and
+closes the connection. Requests are served one at a time.
+"""
+from __future__ import print_function
+
+from rez import __version__
+from rez.config import config
+from rez.exceptions import RezError
+from rez.package_repository import package_repository_manager
+from rez.solver import SolverSession
+from rez.utils.logging_ import print_warning
+from rez.vendor.six import six
+from hashlib import sha1
+import json
+import os
+import os.path
+import socket
+import stat
+import threading
+import time
+
+
+basestring = six.string_types[0]
+
+# this version should be changed if and when the request format changes
+protocol_version = 1
+
+debug_print = config.debug_printer("resolve_server")
+
+# set while a request is being served, when resolves must not be sent to a
+# server
+_thread_locals = threading.local()
+
+
+class ResolveServerError(RezError):
+    """Error communicating with a resolve server."""
+    pass
+
+
+def get_config_key():
+    """Get a key that identifies the current configuration.
+
+    The server only serves clients that are configured the same way it is, so
+    that a resolve is the same as it would have been in the client's process.
+    The key is based on the rez version, the config files and their mtimes,
+    environment variable overrides of config settings, and in-process config
+    overrides.
+
+    Returns:
+        str: Config key.
+    """
+    setting_names = set(
+        x for x in config.schema._schema if isinstance(x, basestring))
+
+    files = []
+    for filepath in config.filepaths:
+        try:
+            files.append((filepath, os.stat(filepath).st_mtime))
+        except OSError:
+            files.append((filepath, None))
+
+    env = []
+    for name, value in os.environ.items():
+        if name.startswith("REZ_"):
+            setting_name = name[4:].lower()
+            if setting_name.endswith("_json"):
+                setting_name = setting_name[:-5]
+            if setting_name in setting_names:
+                env.append((name, value))
+
+    data = [__version__, protocol_version, files, sorted(env), config.overrides]
+    data_str = json.dumps(data, sort_keys=True, default=str)
+    return sha1(data_str.encode("utf-8")).hexdigest()
+
+
+class ResolveServer(object):
+    """A server that performs resolves for clients on the same host.
+
+    Repositories, package resources and the solver's package variants (see
+    `SolverSession`) are cached in memory between requests. Before each
+    request, repositories that have changed on disk since they were read (see
+    `PackageRepository.is_stale`) have their caches cleared.
+    """
+    def __init__(self, socket_path, verbose=False):
+        """Create a resolve server.
+
+        Args:
+            socket_path (str): Path of the Unix socket to listen on.
+            verbose (bool): If True, print info about each request.
+        """
+        self.socket_path = socket_path
+        self.verbose = verbose
+        self.config_key = get_config_key()
+        self.num_requests = 0
+        self.solver_session = SolverSession()
+        self._socket = None
+
+    def serve_forever(self):
+        """Serve requests until interrupted."""
+        self._bind()
+
+        # The client does its own context tracking and package caching. Note
+        # that this doesn't affect `self.config_key`.
+        config.override("context_tracking_host", '')
+
+        try:
+            while True:
+                conn, _ = self._socket.accept()
+                try:
+                    self._handle_connection(conn)
+                finally:
+                    conn.close()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop listening, and remove the socket file."""
+        if self._socket is None:
+            return
+
+        self._socket.close()
+        self._socket = None
+
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+    def handle_request(self, request):
+        """Handle a request.
+
+        Args:
+            request (dict): Request, as sent by the client.
+
+        Returns:
+            dict: Response, containing either "result" or "error".
+        """
+        if request.get("config_key") != self.config_key:
+            return {"error": "config mismatch"}
+
+        action = request.get("action")
+        func = getattr(self, "_action_%s" % action, None)
+        if func is None:
+            return {"error": "unknown action: %r" % action}
+
+        stale_repos = package_repository_manager.clear_stale_caches()
+        if stale_repos:
+            self.solver_session.clear()
+            if self.verbose:
+                print("cleared caches of changed repositories: %s"
+                      % ", ".join(str(x) for x in stale_repos))
+
+        _thread_locals.serving = True
+        try:
+            result = func(**request.get("args", {}))
+        except RezError as e:
+            return {"error": str(e)}
+        finally:
+            _thread_locals.serving = False
+
+        return {"result": result}
+
+    def _action_ping(self):
+        return {"pid": os.getpid(), "num_requests": self.num_requests}
+
+    def _action_resolve(self, **kwargs):
+        # Timestamped resolves filter packages differently from each other, so
+        # they would only fill the session with variants that are never reused.
+        if kwargs.get("timestamp"):
+            solver_session = None
+        else:
+            solver_session = self.solver_session
+
+        context = _create_context(solver_session=solver_session, **kwargs)
+        return context.to_dict()
+
+    def _action_get_shell_code(self, context, load_path=None, shell=None,
+                               parent_environ=None, style=None):
+        from rez.resolved_context import ResolvedContext
+        from rez.rex import OutputStyle
+
+        context = ResolvedContext.from_dict(context)
+        context.load_path = load_path
+        style = OutputStyle[style] if style else OutputStyle.file
+
+        return context.get_shell_code(shell=shell,
+                                      parent_environ=parent_environ,
+                                      style=style)
+
+    def _bind(self):
+        socket_path = self.socket_path
+
+        if os.path.exists(socket_path):
+            if is_server_running(socket_path):
+                raise ResolveServerError(
+                    "A resolve server is already listening on %s" % socket_path)
+            os.remove(socket_path)  # left over from a server that died
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        # only this user can connect
+        old_umask = os.umask(0o077)
+        try:
+            sock.bind(socket_path)
+        finally:
+            os.umask(old_umask)
+
+        sock.listen(64)
+        self._socket = sock
+
+    def _handle_connection(self, conn):
+        t = time.time()
+
+        try:
+            request = json.loads(_recv_all(conn).decode("utf-8"))
+            action = request.get("action")
+            response = self.handle_request(request)
+        except Exception as e:
+            action = None
+            response = {"error": "%s: %s" % (e.__class__.__name__, str(e))}
+            print_warning("resolve server error: %s", response["error"])
+
+        self.num_requests += 1
+
+        try:
+            conn.sendall(json.dumps(response).encode("utf-8"))
+        except socket.error as e:
+            print_warning("resolve server failed to send response: %s", str(e))
+
+        if self.verbose:
+            status = "error: %s" % response["error"] if "error" in response else "ok"
+            print("%s request (%s) took %.03f secs"
+                  % (action, status, time.time() - t))
+
+
+def send_request(socket_path, action, timeout=None, **kwargs):
+    """Send a request to a resolve server.
+
+    Args:
+        socket_path (str): Path of the server's Unix socket.
+        action (str): Request action, eg 'resolve'.
+        timeout (float): Time in seconds to wait for the response. None means
+            no limit.
+        kwargs: Arguments for the action.
+
+    Returns:
+        The result of the request.
+
+    Raises:
+        `ResolveServerError`: If the server could not be reached, or the
+        request failed.
+    """
+    request = {
+        "action": action,
+        "config_key": get_config_key(),
+        "args": kwargs
+    }
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8"))
+        sock.shutdown(socket.SHUT_WR)
+        response = json.loads(_recv_all(sock).decode("utf-8"))
+    except (socket.error, ValueError) as e:
+        raise ResolveServerError("Failed to communicate with resolve server "
+                                 "at %s: %s" % (socket_path, str(e)))
+    finally:
+        sock.close()
+
+    if "error" in response:
+        raise ResolveServerError("Resolve server at %s: %s"
+                                 % (socket_path, response["error"]))
+
+    return response["result"]
+
+
+def is_server_running(socket_path):
+    """Determine if a resolve server is listening on the given socket.
+
+    Returns:
+        bool: True if a server is listening.
+    """
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return False
+
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(1.0)
+        sock.connect(socket_path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+
+def get_server_socket():
+    """Get the socket of the resolve server to use, if any.
+
+    Returns:
+        str: Path of the server's Unix socket, or None if no server is
+        configured, or if it isn't running.
+    """
+    socket_path = config.resolve_server_socket
+    if not socket_path or not hasattr(socket, "AF_UNIX") \
+            or getattr(_thread_locals, "serving", False):
+        return None
+
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return None
+
+    if not stat.S_ISSOCK(st.st_mode):
+        return None
+    return socket_path
+
+
+def _create_context(package_requests, timestamp=None, building=False,
+                    caching=None, package_paths=None, package_filter=None,
+                    package_orderers=None, max_fails=-1, time_limit=-1,
+                    solver_session=None):
+    from rez.resolved_context import ResolvedContext
+    from rez.package_filter import PackageFilterList
+    from rez.package_order import from_pod as package_order_from_pod
+
+    if package_filter is not None:
+        package_filter = PackageFilterList.from_pod(package_filter)
+    if package_orderers is not None:
+        package_orderers = [package_order_from_pod(x) for x in package_orderers]
+
+    # implicit packages are already included in the client's request
+    return ResolvedContext(package_requests,
+                           timestamp=timestamp,
+                           building=building,
+                           caching=caching,
+                           package_paths=package_paths,
+                           package_filter=package_filter,
+                           package_orderers=package_orderers,
+                           max_fails=max_fails,
+                           time_limit=time_limit,
+                           add_implicit_packages=False,
+                           package_caching=False,
+                           solver_session=solver_session)
+
+
+def _recv_all(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
@@ -17,8 +17,10 @@ from __future__ import print_function
 
 from rez import __version__, module_root_path
 from rez.package_repository import package_repository_manager
-from rez.solver import SolverCallbackReturn
+from rez.solver import SolverCallbackReturn, SolverSession
 from rez.resolver import Resolver, ResolverStatus
+from rez.resolve_server import get_server_socket, send_request, \
+    ResolveServerError, debug_print
 from rez.system import system
 from rez.config import config
 from rez.util import dedup, is_non_string_iterable
@@ -45,7 +47,8 @@ from rez.exceptions import ResolvedContextError, PackageCommandError, \
     RezError, _NeverError, PackageCacheError, PackageNotFoundError
 from rez.utils.graph_utils import write_dot, write_compacted, \
     read_graph_from_string
-from rez.utils.resolve_graph import failure_detail_from_graph
+from rez.utils.resolve_graph import failure_detail_from_graph, \
+    graph_from_data
 from rez.vendor.six import six
 from rez.vendor.version.version import VersionRange
 from rez.vendor.version.requirement import Requirement
@@ -55,6 +58,7 @@ from rez.utils import json
 from rez.utils.yaml import dump_yaml
 from rez.utils.platform_ import platform_
 
+from ast import literal_eval
 from contextlib import contextmanager
 from functools import wraps
 import getpass
@@ -142,7 +146,7 @@ class ResolvedContext(object):
     command within a configured python namespace, without spawning a child
     shell.
     """
-    serialize_version = (4, 7)
+    serialize_version = (4, 8)
     tmpdir_manager = TempDirs(config.context_tmpdir, prefix="rez_context_")
     context_tracking_payload = None
     context_tracking_lock = threading.Lock()
@@ -175,7 +179,7 @@ class ResolvedContext(object):
                  package_filter=None, package_orderers=None, max_fails=-1,
                  add_implicit_packages=True, time_limit=-1, callback=None,
                  package_load_callback=None, buf=None, suppress_passive=False,
-                 print_stats=False, package_caching=None):
+                 print_stats=False, package_caching=None, solver_session=None):
         """Perform a package resolve, and store the result.
 
         Args:
@@ -214,6 +218,8 @@ class ResolvedContext(object):
             package_caching (bool|None): If True, apply package caching settings
                 as per the config. If None, enable as determined by config
                 setting 'package_cache_during_build'.
+            solver_session (`SolverSession`): Session to share package variants
+                with other resolves, if any. See `resolve_many`.
         """
         self.load_path = None
 
@@ -278,6 +284,7 @@ class ResolvedContext(object):
         self._resolved_ephemerals = None
         self.failure_description = None
         self.graph_string = None
+        self.graph_data = None
         self.graph_ = None
         self.from_cache = None
 
@@ -307,6 +314,28 @@ class ResolvedContext(object):
 
         request = self.requested_packages(include_implicit=True)
 
+        # use the resolve server if there is one, unless the resolve needs to
+        # call back into, or print from, this process
+        socket_path = get_server_socket()
+        if socket_path and (callback or package_load_callback or verbosity
+                            or print_stats or solver_session):
+            socket_path = None
+
+        if not (socket_path and self._resolve_with_server(
+                socket_path, request, max_fails, time_limit)):
+            self._resolve(request, callback_, _package_load_callback, buf,
+                          suppress_passive, print_stats, solver_session)
+
+        # track context usage
+        if config.context_tracking_host:
+            data = self.to_dict(fields=config.context_tracking_context_fields)
+            self._track_context(data, action="created")
+
+        # update package cache
+        self._update_package_cache()
+
+    def _resolve(self, request, callback, package_load_callback, buf,
+                 suppress_passive, print_stats, solver_session=None):
         resolver = Resolver(context=self,
                             package_requests=request,
                             package_paths=self.package_paths,
@@ -315,12 +344,13 @@ class ResolvedContext(object):
                             timestamp=self.requested_timestamp,
                             building=self.building,
                             caching=self.caching,
-                            callback=callback_,
-                            package_load_callback=_package_load_callback,
-                            verbosity=verbosity,
+                            callback=callback,
+                            package_load_callback=package_load_callback,
+                            verbosity=self.verbosity,
                             buf=buf,
                             suppress_passive=suppress_passive,
-                            print_stats=print_stats)
+                            print_stats=print_stats,
+                            solver_session=solver_session)
 
         resolver.solve()
 
@@ -329,7 +359,8 @@ class ResolvedContext(object):
         self.solve_time = resolver.solve_time
         self.load_time = resolver.load_time
         self.failure_description = resolver.failure_description
-        self.graph_ = resolver.graph
+        self.graph_data = resolver.graph_data
+        self.graph_ = resolver.graph_
         self.from_cache = resolver.from_cache
 
         if self.status_ == ResolverStatus.solved:
@@ -340,13 +371,51 @@ class ResolvedContext(object):
 
             self._resolved_ephemerals = resolver.resolved_ephemerals
 
-        # track context usage
-        if config.context_tracking_host:
-            data = self.to_dict(fields=config.context_tracking_context_fields)
-            self._track_context(data, action="created")
+    def _resolve_with_server(self, socket_path, request, max_fails, time_limit):
+        # Returns False if the server could not perform the resolve, in which
+        # case it should be done in-process instead.
+        package_orderers = None
+        if self.package_orderers is not None:
+            package_orderers = [package_order.to_pod(x)
+                                for x in self.package_orderers]
 
-        # update package cache
-        self._update_package_cache()
+        try:
+            d = send_request(socket_path, "resolve",
+                             package_requests=list(map(str, request)),
+                             timestamp=self.requested_timestamp,
+                             building=self.building,
+                             caching=self.caching,
+                             package_paths=self.package_paths,
+                             package_filter=self.package_filter.to_pod(),
+                             package_orderers=package_orderers,
+                             max_fails=max_fails,
+                             time_limit=time_limit,
+                             timeout=(config.resolve_server_timeout or None))
+        except ResolveServerError as e:
+            debug_print("Resolving in-process: %s", str(e))
+            return False
+
+        r = self._from_dict(d)
+
+        self.status_ = r.status_
+        self.solve_time = r.solve_time
+        self.load_time = r.load_time
+        self.failure_description = r.failure_description
+        self.graph_string = r.graph_string
+        self.graph_data = r.graph_data
+        self.graph_ = None
+        self.from_cache = r.from_cache
+        self.num_loaded_packages = r.num_loaded_packages
+
+        if self.status_ == ResolverStatus.solved:
+            self._resolved_packages = []
+            for variant in r._resolved_packages:
+                variant.set_context(self)
+                self._resolved_packages.append(variant)
+
+            self._resolved_ephemerals = r._resolved_ephemerals
+
+        return True
 
     def __str__(self):
         request = self.requested_packages(include_implicit=True)
@@ -443,7 +512,8 @@ class ResolvedContext(object):
     @property
     def has_graph(self):
         """Return True if the resolve has a graph."""
-        return bool((self.graph_ is not None) or self.graph_string)
+        return bool((self.graph_ is not None) or self.graph_string
+                    or self.graph_data)
 
     def get_resolved_package(self, name):
         """Returns a `Variant` object or None if the package is not in the
@@ -634,22 +704,25 @@ class ResolvedContext(object):
         if not self.has_graph:
             return None
 
-        if not as_dot:
-            if self.graph_ is None:
-                # reads either dot format or our compact format
-                self.graph_ = read_graph_from_string(self.graph_string)
-            return self.graph_
+        if as_dot and self.graph_string \
+                and not self.graph_string.startswith('{'):
+            # already in dot format. Note that this will only happen in
+            # old rez contexts where the graph is not stored in the newer
+            # compact format.
+            return self.graph_string
 
-        if self.graph_string:
-            if self.graph_string.startswith('{'):  # compact format
+        if self.graph_ is None:
+            if self.graph_string:
+                # reads either dot format or our compact format
                 self.graph_ = read_graph_from_string(self.graph_string)
             else:
-                # already in dot format. Note that this will only happen in
-                # old rez contexts where the graph is not stored in the newer
-                # compact format.
-                return self.graph_string
+                # the graph is only built when it is first needed
+                self.graph_ = graph_from_data(self.graph_data)
 
-        return write_dot(self.graph_)
+        if as_dot:
+            return write_dot(self.graph_)
+        else:
+            return self.graph_
 
     def save(self, path):
         """Save the resolved context to file."""
@@ -669,6 +742,50 @@ class ResolvedContext(object):
 
         buf.write(content)
 
+    @classmethod
+    def resolve_many(cls, requests, num_processes=None, **kwargs):
+        """Resolve many requests.
+
+        The resolves share loaded packages (see `SolverSession`), which makes
+        this much faster than creating each context separately.
+
+        Args:
+            requests (list of list): Package requests, one list per context.
+            num_processes (int): If greater than one, resolve in this many
+                worker processes, each of which shares packages between the
+                resolves it performs. Contexts resolved in a worker process are
+                transferred back to this process in serialized form.
+            kwargs: Arguments passed to each `ResolvedContext`. These must be
+                picklable if `num_processes` is used, so callbacks are not
+                supported in that case.
+
+        Returns:
+            List of `ResolvedContext`: Contexts, in the same order as `requests`.
+        """
+        requests = [list(x) for x in requests]
+
+        if num_processes and num_processes > 1 and len(requests) > 1:
+            from multiprocessing import Pool
+
+            pool = Pool(processes=num_processes,
+                        initializer=_init_resolve_many_worker,
+                        initargs=(kwargs,))
+
+            # Workers are left to exit, rather than terminated. SIGTERM would
+            # run rez's cli handler in them, which kills the process group.
+            try:
+                results = pool.map(_resolve_many_worker, requests)
+            finally:
+                pool.close()
+                pool.join()
+
+            # the workers have already tracked the contexts and updated the
+            # package cache
+            return [cls._from_dict(x) for x in results]
+
+        session = SolverSession()
+        return [cls(x, solver_session=session, **kwargs) for x in requests]
+
     @classmethod
     def get_current(cls):
         """Get the context for the current env, if there is one.
@@ -1219,6 +1336,27 @@ class ResolvedContext(object):
                 defaults to os.environ if None.
             style (): Style to format shell code in.
         """
+        socket_path = get_server_socket()
+
+        if socket_path:
+            try:
+                return send_request(
+                    socket_path, "get_shell_code",
+                    context=self.to_dict(),
+                    load_path=self.load_path,
+                    shell=(shell or create_shell().name()),
+                    parent_environ=dict(parent_environ or os.environ),
+                    style=style.name
+                )
+            except ResolveServerError as e:
+                debug_print("Getting shell code in-process: %s", str(e))
+
+        return self._get_shell_code(shell=shell,
+                                    parent_environ=parent_environ,
+                                    style=style)
+
+    def _get_shell_code(self, shell=None, parent_environ=None,
+                        style=OutputStyle.file):
         executor = self._create_executor(interpreter=create_shell(shell),
                                          parent_environ=parent_environ)
 
@@ -1540,14 +1678,27 @@ class ResolvedContext(object):
             data["package_filter"] = self.package_filter.to_pod()
 
         if _add("graph"):
-            if self.graph_string and self.graph_string.startswith('{'):
-                graph_str = self.graph_string  # already in compact format
-            else:
-                g = self.graph()
-                graph_str = write_compacted(g)
+            # the graph is only written if asked for, since it can be built
+            # from the (much smaller) graph data
+            graph_str = None
+            if config.rxt_include_graph or (fields and "graph" in fields) \
+                    or not self.graph_data:
+                if self.graph_string and self.graph_string.startswith('{'):
+                    graph_str = self.graph_string  # already in compact format
+                elif self.has_graph:
+                    g = self.graph()
+                    graph_str = write_compacted(g)
 
             data["graph"] = graph_str
 
+        if _add("graph_data"):
+            # stored as a compact string, like the graph
+            graph_data_str = None
+            if self.graph_data:
+                graph_data_str = str(self.graph_data)
+
+            data["graph_data"] = graph_data_str
+
         data.update(dict(
             timestamp=self.timestamp,
             requested_timestamp=self.requested_timestamp,
@@ -1601,6 +1752,25 @@ class ResolvedContext(object):
         Returns:
             `ResolvedContext` object.
         """
+        r = cls._from_dict(d, identifier_str)
+
+        # track context usage
+        if config.context_tracking_host:
+            data = dict((k, v) for k, v in d.items()
+                        if k in config.context_tracking_context_fields)
+
+            r._track_context(data, action="sourced")
+
+        # update package cache
+        r._update_package_cache()
+
+        return r
+
+    @classmethod
+    def _from_dict(cls, d, identifier_str=None):
+        # Deserialize a context, without tracking its use or updating the
+        # package cache. See `from_dict`.
+
         # check serialization version
         def _print_version(value):
             return '.'.join(str(x) for x in value)
@@ -1715,17 +1885,12 @@ class ResolvedContext(object):
             req = Requirement(eph_str)
             r._resolved_ephemerals.append(req)
 
-        # <END SERIALIZATION>
-
-        # track context usage
-        if config.context_tracking_host:
-            data = dict((k, v) for k, v in d.items()
-                        if k in config.context_tracking_context_fields)
+        # -- SINCE SERIALIZE VERSION 4.8
 
-            r._track_context(data, action="sourced")
+        graph_data_str = d.get("graph_data")
+        r.graph_data = literal_eval(graph_data_str) if graph_data_str else None
 
-        # update package cache
-        r._update_package_cache()
+        # <END SERIALIZATION>
 
         return r
 
@@ -2160,3 +2325,21 @@ class ResolvedContext(object):
         for path in suite_paths:
             tools_path = os.path.join(path, "bin")
             executor.env.PATH.append(tools_path)
+
+
+# per-process state of `ResolvedContext.resolve_many` workers
+_resolve_many_worker_state = {}
+
+
+def _init_resolve_many_worker(kwargs):
+    _resolve_many_worker_state["kwargs"] = kwargs
+    _resolve_many_worker_state["session"] = SolverSession()
+
+
+def _resolve_many_worker(request):
+    context = ResolvedContext(
+        request,
+        solver_session=_resolve_many_worker_state["session"],
+        **_resolve_many_worker_state["kwargs"]
+    )
+    return context.to_dict()
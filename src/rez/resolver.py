@@ -18,12 +18,18 @@ from rez.package_repository import package_repository_manager
 from rez.packages import get_variant, get_last_release_time
 from rez.package_filter import PackageFilterList, TimestampRule
 from rez.utils.memcached import memcached_client, pool_memcached_connections
+from rez.utils.disk_cache import DiskCache
 from rez.utils.logging_ import log_duration
+from rez.utils.resources import ResourceHandle
+from rez.utils.resolve_graph import graph_from_data
 from rez.config import config
 from rez.vendor.enum import Enum
 from rez.vendor.version.requirement import Requirement
 from contextlib import contextmanager
 from hashlib import sha1
+from multiprocessing.pool import ThreadPool
+from pprint import pformat
+import sys
 
 
 class ResolverStatus(Enum):
@@ -49,7 +55,7 @@ class Resolver(object):
     def __init__(self, context, package_requests, package_paths, package_filter=None,
                  package_orderers=None, timestamp=0, callback=None, building=False,
                  verbosity=False, buf=None, package_load_callback=None, caching=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, solver_session=None):
         """Create a Resolver.
 
         Args:
@@ -66,6 +72,8 @@ class Resolver(object):
             caching: If True, cache(s) may be used to speed the resolve. If
                 False, caches will not be used.
             print_stats (bool): If true, print advanced solver stats at the end.
+            solver_session (`SolverSession`): Session to share package variants
+                with other solves, if any.
         """
         self.context = context
         self.package_requests = package_requests
@@ -80,6 +88,7 @@ class Resolver(object):
         self.buf = buf
         self.suppress_passive = suppress_passive
         self.print_stats = print_stats
+        self.solver_session = solver_session
 
         # store hash of package orderers. This is used in the memcached key
         if package_orderers:
@@ -111,7 +120,9 @@ class Resolver(object):
         self.resolved_ephemerals_ = None
         self.failure_description = None
         self.graph_ = None
+        self.graph_data = None
         self.from_cache = False
+        self.cache_source = None
         self.memcached_servers = config.memcached_uri if config.resolve_caching else None
 
         self.solve_time = 0.0  # time spent solving
@@ -123,8 +134,15 @@ class Resolver(object):
     def solve(self):
         """Perform the solve.
         """
-        with log_duration(self._print, "memcache get (resolve) took %s"):
-            solver_dict = self._get_cached_solve()
+        solver_dict = None
+
+        for source in self._get_cache_sources():
+            with log_duration(self._print, "%s get (resolve) took %%s" % source):
+                solver_dict = self._get_cached_solve(source)
+
+            if solver_dict:
+                self.cache_source = source
+                break
 
         if solver_dict:
             self.from_cache = True
@@ -135,9 +153,13 @@ class Resolver(object):
             solver_dict = self._solver_to_dict(solver)
             self._set_result(solver_dict)
 
-            with log_duration(self._print, "memcache set (resolve) took %s"):
+            with log_duration(self._print, "cache set (resolve) took %s"):
                 self._set_cached_solve(solver_dict)
 
+        if self.print_stats and self.caching:
+            data = {"resolve_cache": self.cache_source or "miss"}
+            print(pformat(data), file=(self.buf or sys.stdout))
+
     @property
     def status(self):
         """Return the current status of the resolve.
@@ -173,16 +195,20 @@ class Resolver(object):
 
         The resolve graph shows unsuccessful as well as successful resolves.
 
+        The graph is built on first access, from `graph_data`.
+
         Returns:
             A pygraph.digraph object, or None if the solve has not completed.
         """
+        if self.graph_ is None and self.graph_data is not None:
+            self.graph_ = graph_from_data(self.graph_data)
         return self.graph_
 
     def _get_variant(self, variant_handle):
         return get_variant(variant_handle, context=self.context)
 
-    def _get_cached_solve(self):
-        """Find a memcached resolve.
+    def _get_cached_solve(self, source):
+        """Find a cached resolve.
 
         If there is NOT a resolve timestamp:
             - fetch a non-timestamped memcache entry;
@@ -221,14 +247,69 @@ class Resolver(object):
         reused if the timestamp matches exactly (but this might happen a lot -
         consider a workflow where a work area is tied down to a particular
         timestamp in order to 'lock' it from any further software releases).
-        """
-        if not (self.caching and self.memcached_servers):
-            return None
 
+        Args:
+            source (str): Cache to look in, see `_get_cache_sources`.
+        """
         # these caches avoids some potentially repeated file stats
         variant_states = {}
         last_release_times = {}
 
+        def _get_variant_state(variant_handle):
+            # returns (variant, state), or (variant, exception) if the variant's
+            # state could not be read
+            if isinstance(variant_handle, dict):
+                variant_handle = ResourceHandle.from_dict(variant_handle)
+
+            entry = variant_states.get(variant_handle)
+            if entry is None:
+                variant = self._get_variant(variant_handle)
+                try:
+                    repo = variant.resource._repository
+                    state = repo.get_variant_state_handle(variant.resource)
+                except (IOError, OSError) as e:
+                    state = e
+
+                entry = (variant, state)
+                variant_states[variant_handle] = entry
+            return entry
+
+        def _get_last_release_time(package_name):
+            time_ = last_release_times.get(package_name)
+            if time_ is None:
+                time_ = get_last_release_time(package_name, self.package_paths)
+                last_release_times[package_name] = time_
+            return time_
+
+        def _check_states(entries):
+            # Read variant states and package release times concurrently, in
+            # advance of the checks below. Each is a file stat, which can be
+            # slow on network storage.
+            num_threads = config.resolve_caching_threads
+            variant_handles = []
+            package_names = set()
+
+            for _, data in entries:
+                if data:
+                    solver_dict, release_times_dict, _ = data
+                    variant_handles.extend(solver_dict.get("variant_handles", []))
+                    package_names.update(release_times_dict.keys())
+
+            jobs = ([(_get_variant_state, x) for x in variant_handles]
+                    + [(_get_last_release_time, x) for x in package_names])
+
+            num_threads = min(num_threads, len(jobs))
+            if num_threads < 2:
+                return
+
+            with log_duration(self._print, "resolve cache state checks took %s"):
+                pool = ThreadPool(num_threads)
+                try:
+                    pool.map(lambda x: x[0](x[1]), jobs)
+                finally:
+                    pool.close()
+                    pool.join()
+
         def _hit(data):
             solver_dict, _, _ = data
             return solver_dict
@@ -238,37 +319,36 @@ class Resolver(object):
             return None
 
         def _delete_cache_entry(key):
-            with self._memcached_client() as client:
+            with self._cache_client(source) as client:
                 client.delete(key)
             self._print("Discarded entry: %r", key)
 
-        def _retrieve(timestamped):
-            key = self._memcache_key(timestamped=timestamped)
-            self._print("Retrieving memcache key: %r", key)
-            with self._memcached_client() as client:
-                data = client.get(key)
-            return key, data
+        def _retrieve():
+            # the timestamped entry (if any) is fetched at the same time, to
+            # save a round trip to the cache if it is needed
+            keys = [self._memcache_key(timestamped=False)]
+            if self.timestamp:
+                keys.append(self._memcache_key(timestamped=True))
+
+            self._print("Retrieving %s keys: %r", source, keys)
+            with self._cache_client(source) as client:
+                entries = client.get_multi(keys)
+            return [(key, entries.get(key)) for key in keys]
 
         def _packages_changed(key, data):
             solver_dict, _, variant_states_dict = data
             for variant_handle in solver_dict.get("variant_handles", []):
-                variant = self._get_variant(variant_handle)
+                variant, new_state = _get_variant_state(variant_handle)
                 old_state = variant_states_dict.get(variant.name)
 
-                new_state = variant_states.get(variant)
-                if new_state is None:
-                    try:
-                        repo = variant.resource._repository
-                        new_state = repo.get_variant_state_handle(variant.resource)
-                    except (IOError, OSError) as e:
-                        # if, ie a package file was deleted on disk, then
-                        # an IOError or OSError will be raised when we try to
-                        # read from it - assume that the packages have changed!
-                        self._print("Error loading %r (assuming cached state "
-                                    "changed): %s", variant.qualified_name,
-                                    e)
-                        return True
-                    variant_states[variant] = new_state
+                if isinstance(new_state, (IOError, OSError)):
+                    # if, ie a package file was deleted on disk, then
+                    # an IOError or OSError will be raised when we try to
+                    # read from it - assume that the packages have changed!
+                    self._print("Error loading %r (assuming cached state "
+                                "changed): %s", variant.qualified_name,
+                                new_state)
+                    return True
 
                 if old_state != new_state:
                     self._print("%r has been modified", variant.qualified_name)
@@ -278,10 +358,7 @@ class Resolver(object):
         def _releases_since_solve(key, data):
             _, release_times_dict, _ = data
             for package_name, release_time in release_times_dict.items():
-                time_ = last_release_times.get(package_name)
-                if time_ is None:
-                    time_ = get_last_release_time(package_name, self.package_paths)
-                    last_release_times[package_name] = time_
+                time_ = _get_last_release_time(package_name)
 
                 if time_ != release_time:
                     self._print(
@@ -301,7 +378,9 @@ class Resolver(object):
                     return True
             return False
 
-        key, data = _retrieve(False)
+        entries = _retrieve()
+        _check_states(entries)
+        key, data = entries[0]
 
         if self.timestamp:
             if data:
@@ -310,7 +389,7 @@ class Resolver(object):
                 elif not _timestamp_is_earlier(key, data):
                     return _hit(data)
 
-            key, data = _retrieve(True)
+            key, data = entries[1]
             if not data:
                 return _miss()
             if _packages_changed(key, data):
@@ -327,6 +406,32 @@ class Resolver(object):
             else:
                 return _hit(data)
 
+    def _get_cache_sources(self):
+        """Get the caches that resolves are stored in.
+
+        Returns:
+            list of str: Zero or more of 'memcached' and 'local' (see the
+            'resolve_cache_path' config setting), in the order that they are
+            searched.
+        """
+        sources = []
+        if not self.caching:
+            return sources
+
+        if self.memcached_servers:
+            sources.append("memcached")
+        if config.resolve_caching and get_resolve_cache():
+            sources.append("local")
+        return sources
+
+    @contextmanager
+    def _cache_client(self, source):
+        if source == "memcached":
+            with self._memcached_client() as client:
+                yield client
+        else:
+            yield get_resolve_cache()
+
     @contextmanager
     def _memcached_client(self):
         with memcached_client(self.memcached_servers,
@@ -334,7 +439,7 @@ class Resolver(object):
             yield client
 
     def _set_cached_solve(self, solver_dict):
-        """Store a solve to memcached.
+        """Store a solve to the cache(s).
 
         If there is NOT a resolve timestamp:
             - store the solve to a non-timestamped entry.
@@ -348,7 +453,8 @@ class Resolver(object):
         if self.status_ != ResolverStatus.solved:
             return  # don't cache failed solves
 
-        if not (self.caching and self.memcached_servers):
+        sources = self._get_cache_sources()
+        if not sources:
             return
 
         # most recent release times get stored with solve result in the cache
@@ -377,9 +483,11 @@ class Resolver(object):
         timestamped = (self.timestamp and releases_since_solve)
         key = self._memcache_key(timestamped=timestamped)
         data = (solver_dict, release_times_dict, variant_states_dict)
-        with self._memcached_client() as client:
-            client.set(key, data)
-        self._print("Sent memcache key: %r", key)
+
+        for source in sources:
+            with self._cache_client(source) as client:
+                client.set(key, data)
+            self._print("Sent %s key: %r", source, key)
 
     def _memcache_key(self, timestamped=False):
         """Makes a key suitable as a memcache entry."""
@@ -395,7 +503,8 @@ class Resolver(object):
              self.package_filter_hash,
              self.package_orderers_hash,
              self.building,
-             config.prune_failed_graph]
+             config.prune_failed_graph,
+             config.scope_split_mode]
 
         if timestamped and self.timestamp:
             t.append(self.timestamp)
@@ -415,13 +524,16 @@ class Resolver(object):
                         prune_unfailed=config.prune_failed_graph,
                         buf=self.buf,
                         suppress_passive=self.suppress_passive,
-                        print_stats=self.print_stats)
+                        print_stats=self.print_stats,
+                        session=self.solver_session)
         solver.solve()
 
         return solver
 
     def _set_result(self, solver_dict):
         self.status_ = solver_dict.get("status")
+        self.graph_data = solver_dict.get("graph_data")
+        # entries cached before the graph was stored as graph data
         self.graph_ = solver_dict.get("graph")
         self.solve_time = solver_dict.get("solve_time")
         self.load_time = solver_dict.get("load_time")
@@ -444,7 +556,7 @@ class Resolver(object):
 
     @classmethod
     def _solver_to_dict(cls, solver):
-        graph_ = solver.get_graph()
+        graph_data = solver.get_graph_data()
         solve_time = solver.solve_time
         load_time = solver.load_time
         failure_description = None
@@ -473,10 +585,35 @@ class Resolver(object):
 
         return dict(
             status=status_,
-            graph=graph_,
+            graph_data=graph_data,
             solve_time=solve_time,
             load_time=load_time,
             failure_description=failure_description,
             variant_handles=variant_handles,
             ephemerals=ephemerals
         )
+
+
+_resolve_cache = None
+
+
+def get_resolve_cache():
+    """Get the local disk cache of resolves.
+
+    Returns:
+        `DiskCache`: The cache, or None if disabled (see the
+        'resolve_cache_path' config setting).
+    """
+    global _resolve_cache
+
+    path = config.resolve_cache_path
+    if not path:
+        return None
+
+    max_size = config.resolve_cache_max_size
+
+    if _resolve_cache is None or _resolve_cache.path != path \
+            or _resolve_cache.max_size != max_size:
+        _resolve_cache = DiskCache(path, max_size=max_size)
+
+    return _resolve_cache
@@ -156,6 +156,11 @@ bind_module_path = []
 # would change the result of an existing resolve.
 resolve_caching = True
 
+# Number of threads used to check whether a cached resolve is still valid. This
+# involves a file stat for every package in the resolve, which can add up to a
+# significant delay on network storage. Values less than 2 disable threading.
+resolve_caching_threads = 0
+
 # Cache package file reads to memcached, if enabled. Updated package files will
 # still be read correctly (ie, the cache invalidates when the filesystem
 # changes).
@@ -166,6 +171,46 @@ cache_package_files = True
 # changes).
 cache_listdir = True
 
+# Path of a directory on local disk, used to cache the contents of package
+# definition files (such as package.py) once they have been loaded. Other rez
+# processes on the same host can then skip loading the file - which for a
+# package.py, means skipping its execution. Updated package files will still be
+# read correctly (ie, the cache invalidates when the file changes). This is
+# useful on hosts that do not have access to a memcached server. If None, this
+# cache is disabled.
+package_file_cache_path = None
+
+# The maximum size in bytes of the cache in 'package_file_cache_path'. When the
+# cache grows larger than this, the least recently used entries are deleted.
+# Zero means no limit.
+package_file_cache_max_size = 104857600
+
+# Path of a directory on local disk, used to cache resolves. This works in the
+# same way as resolve caching to memcached (see 'resolve_caching'), and can be
+# used as well as, or instead of, memcached. It is useful on workstations that
+# repeat the same resolves, but do not have access to a memcached server. For
+# example, "~/.cache/rez/resolves". If None, this cache is disabled.
+resolve_cache_path = None
+
+# The maximum size in bytes of the cache in 'resolve_cache_path'. When the cache
+# grows larger than this, the least recently used entries are deleted. Zero
+# means no limit.
+resolve_cache_max_size = 104857600
+
+# Path of the Unix socket of a resolve server (see 'rez-serve'). A resolve server
+# is a long-running process that keeps package repositories and resolves cached
+# in memory, so that resolves requested by other rez processes on the same host
+# are faster. If a server is listening on this socket, resolves and shell code
+# generation are sent to it, otherwise they are done in-process as usual. If
+# None, no resolve server is used.
+resolve_server_socket = None
+
+# The time in seconds to wait for a resolve server to perform a resolve. The
+# server performs one request at a time, so a slow resolve holds up every other
+# client. If the server does not respond in this time, the resolve is done
+# in-process instead. Zero means no limit.
+resolve_server_timeout = 30.0
+
 # The size of the local (in-process) resource cache. Resources include package
 # families, packages and variants. A value of 0 disables caching; -1 sets a cache
 # of unlimited size. The size refers to the number of entries, not byte count.
@@ -174,8 +219,31 @@ resource_caching_maxsize = -1
 # Uris of running memcached server(s) to use as a file and resolve cache. For
 # example, the uri "127.0.0.1:11211" points to memcached running on localhost on
 # its default port. Must be either null, or a list of strings.
+#
+# Alternatively, a single uri of the form "file:///path/to/dir" uses a directory
+# on local disk as the cache, in place of a memcached server. This gives hosts
+# that don't have access to memcached a cache that is shared between processes.
 memcached_uri = []
 
+# The maximum size in bytes of a local disk cache used in place of memcached
+# (see 'memcached_uri'). When the cache grows larger than this, the least
+# recently used entries are deleted. Zero means no limit.
+memcached_disk_cache_max_size = 1073741824
+
+# The maximum size in bytes of an in-process cache that sits in front of the
+# memcached server(s). Cache entries are keyed on file and directory state (such
+# as mtime and inode), so they never go stale, and repeated lookups within one
+# process (a long-running tool, for example) can skip the trip to the server.
+# Zero disables the in-process cache.
+memcached_local_cache_max_size = 67108864
+
+# If True, count cache hits and misses by kind of entry (resolves, package
+# files, directory listings etc) in each process, and add the counts to totals
+# stored in the cache when the process exits. See 'rez-memcache'. This costs a
+# few extra round trips to the server at process exit, so it is off by default.
+# It is also enabled by 'debug_memcache'. The totals are approximate.
+memcached_kind_stats = False
+
 # Bytecount beyond which memcached entries are compressed, for cached package
 # files (such as package.yaml, package.py). Zero means never compress.
 memcached_package_file_min_compress_len = 16384
@@ -336,6 +404,33 @@ platform_map = {}
 # failure.
 prune_failed_graph = True
 
+# If true, the resolve graph is written into rxt files. Otherwise, only the
+# much smaller data that the graph is built from is written, and the graph is
+# built if and when it is needed (for example, by 'rez-context --graph').
+rxt_include_graph = False
+
+# If nonzero, a solve that backtracks (ie, one that takes many solve steps)
+# explores the alternatives it would backtrack to in parallel, in up to this
+# many forked worker processes, so that alternatives that fail can be skipped.
+# The result is the same as a serial solve. This only helps with large solves
+# whose alternatives fail too, and is not used when the solve is verbose, or on
+# platforms that cannot fork (such as Windows).
+solver_parallel_workers = 0
+
+# Scope split mode. When the solver can make no further progress, it splits the
+# variants of one of the packages in the solve into two groups, and tries the
+# first group before the second. This setting determines which package gets
+# split. Valid options are:
+# - first: Split the first package that can be split, in request order;
+# - fewest_variants: Split the package with the fewest remaining variants;
+# - most_dependents: Split the package that is required by the most other
+#   packages in the solve.
+#
+# This can affect how long a solve takes, and, when more than one resolve is
+# possible, which one is found. Note that cached resolves are not shared
+# between different modes.
+scope_split_mode = "first"
+
 # Variant select mode. This determines which variants in a package are preferred
 # during a solve. Valid options are:
 # - version_priority: Prefer variants that contain higher versions of packages
@@ -725,11 +820,19 @@ debug_package_exclusions = False
 # Print debugging info related to use of memcached during a resolve
 debug_resolve_memcache = False
 
+# Print debugging info about use of the resolve server (see
+# 'resolve_server_socket').
+debug_resolve_server = False
+
 # Debug memcache usage. As well as printing debugging info to stdout, it also
 # sends human-readable strings as memcached keys (that you can read by running
 # "memcached -vv" as the server)
 debug_memcache = False
 
+# Print debugging info about use of local disk caches (see
+# 'package_file_cache_path' and 'resolve_cache_path').
+debug_disk_cache = False
+
 # Print debugging info when AMPQ is used in context tracking
 debug_context_tracking = False
 
@@ -14,7 +14,8 @@
 
 
 """
-Read and write data from file. File caching via a memcached server is supported.
+Read and write data from file. File caching via a memcached server, or a local
+disk cache, is supported.
 """
 from contextlib import contextmanager
 from inspect import isfunction, ismodule
@@ -31,6 +32,7 @@ from rez.utils.filesystem import TempDirs
 from rez.utils.data_utils import ModifyList
 from rez.exceptions import ResourceError, InvalidPackageError
 from rez.utils.memcached import memcached
+from rez.utils.disk_cache import DiskCache
 from rez.utils.execution import add_sys_paths
 from rez.utils import py23
 from rez.config import config
@@ -44,6 +46,7 @@ from rez.vendor import yaml
 tmpdir_manager = TempDirs(config.tmpdir, prefix="rez_write_")
 debug_print = config.debug_printer("file_loads")
 file_cache = {}
+_disk_cache = None
 
 
 class FileFormat(Enum):
@@ -172,7 +175,40 @@ def _load_from_file__key(filepath, format_, update_data_callback):
            key=_load_from_file__key,
            debug=config.debug_memcache)
 def _load_from_file(filepath, format_, update_data_callback):
-    return _load_file(filepath, format_, update_data_callback)
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return _load_file(filepath, format_, update_data_callback)
+
+    key = _load_from_file__key(filepath, format_, update_data_callback)
+    result = disk_cache.get(key)
+
+    if result is disk_cache.miss:
+        result = _load_file(filepath, format_, update_data_callback)
+        disk_cache.set(key, result)
+
+    return result
+
+
+def get_disk_cache():
+    """Get the local disk cache of loaded package definition files.
+
+    Returns:
+        `DiskCache`: The cache, or None if disabled (see the
+        'package_file_cache_path' config setting).
+    """
+    global _disk_cache
+
+    path = config.package_file_cache_path
+    if not path:
+        return None
+
+    max_size = config.package_file_cache_max_size
+
+    if _disk_cache is None or _disk_cache.path != path \
+            or _disk_cache.max_size != max_size:
+        _disk_cache = DiskCache(path, max_size=max_size)
+
+    return _disk_cache
 
 
 def _load_file(filepath, format_, update_data_callback, original_filepath=None):
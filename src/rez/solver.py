@@ -25,10 +25,12 @@ See SOLVER.md for an in-depth description of how this module works.
 from __future__ import print_function
 
 from rez.config import config
-from rez.packages import iter_packages
+from rez.packages import iter_packages, Package
 from rez.package_repository import package_repo_stats
 from rez.utils.logging_ import print_debug
 from rez.utils.data_utils import cached_property
+from rez.utils.sourcecode import SourceCode
+from rez.utils.resolve_graph import graph_from_data
 from rez.vendor.pygraph.classes.digraph import digraph
 from rez.vendor.pygraph.algorithms.cycles import find_cycle
 from rez.vendor.pygraph.algorithms.accessibility import accessibility
@@ -39,8 +41,11 @@ from rez.vendor.version.requirement import VersionedObject, Requirement, \
     RequirementList
 from rez.vendor.enum import Enum
 from contextlib import contextmanager
-from itertools import product, chain
+from collections import defaultdict
+from itertools import chain
 import copy
+import multiprocessing
+import signal
 import time
 import sys
 import os
@@ -70,12 +75,67 @@ _force_unoptimised_solver = (os.getenv("_FORCE_REZ_UNOPTIMISED_SOLVER") == "1")
 SOLVER_VERSION = 2
 
 
+# Speculative solve workers (see Solver._speculate) are forked, so that they
+# inherit the solver, rather than it being pickled (which phases don't support)
+if not hasattr(os, "fork"):
+    _fork_context = None
+elif hasattr(multiprocessing, "get_context"):
+    _fork_context = multiprocessing.get_context("fork")
+else:
+    _fork_context = multiprocessing  # py2, which always forks
+
+# shared by objects in the solver until they need a set of their own
+_empty_set = frozenset()
+
+
+class _TestMemo(object):
+    """A bounded table of the results of requirement and range tests.
+
+    Whether a requirement conflicts with a request, or a version is contained
+    in a range, depends only on the requirements, ranges and versions
+    involved. Results are therefore valid for every solver in the process,
+    whatever package paths, filters and orderers it uses, and the same tests
+    come up again in every phase of a solve and in later solves. When the
+    table is full, it is cleared.
+    """
+    max_size = 100000
+
+    def __init__(self):
+        self.results = {}
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def set(self, key, value):
+        if len(self.results) >= self.max_size:
+            self.results.clear()
+        self.results[key] = value
+
+    def clear(self):
+        self.results.clear()
+
+
+# (dependency str, request str) -> True if they conflict
+_conflict_memo = _TestMemo()
+
+# (range str, version) -> True if the version is in the range
+_containment_memo = _TestMemo()
+
+
 class VariantSelectMode(Enum):
     """Variant selection mode."""
     version_priority = 0
     intersection_priority = 1
 
 
+class ScopeSplitMode(Enum):
+    """Mode for selecting the package scope to split, when a solve phase is
+    exhausted."""
+    first = 0
+    fewest_variants = 1
+    most_dependents = 2
+
+
 class SolverStatus(Enum):
     """Enum to represent the current state of a solver instance.  The enum
     also includes a human readable description of what the state represents.
@@ -169,6 +229,8 @@ class SolverState(object):
 
 
 class _Common(object):
+    __slots__ = ()
+
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, str(self))
 
@@ -176,6 +238,9 @@ class _Common(object):
 class Reduction(_Common):
     """A variant was removed because its dependencies conflicted with another
     scope in the current phase."""
+    __slots__ = ("name", "version", "variant_index", "dependency",
+                 "conflicting_request")
+
     def __init__(self, name, version, variant_index, dependency,
                  conflicting_request):
         self.name = name
@@ -210,6 +275,8 @@ class Reduction(_Common):
 class DependencyConflict(_Common):
     """A common dependency shared by all variants in a scope, conflicted with
     another scope in the current phase."""
+    __slots__ = ("dependency", "conflicting_request")
+
     def __init__(self, dependency, conflicting_request):
         """
         Args:
@@ -340,8 +407,8 @@ class PackageVariant(_Common):
         'requires' attribute may trigger a package load, which may be avoided if
         this variant is reduced away before that happens.
         """
-        requires = self.variant.get_requires(build_requires=self.building)
-        reqlist = RequirementList(requires)
+        reqlist = self.variant.get_requirement_list(
+            build_requires=self.building)
 
         if reqlist.conflict:
             raise ResolveError(
@@ -386,6 +453,8 @@ class _PackageEntry(object):
 
     Holds some extra state data, such as whether the variants are sorted.
     """
+    __slots__ = ("package", "variants", "solver", "sorted")
+
     def __init__(self, package, variants, solver):
         self.package = package
         self.variants = variants
@@ -468,12 +537,51 @@ class _PackageEntry(object):
         self.sorted = True
 
 
+class _VersionIndex(object):
+    """An ascending sort of a list of versions.
+
+    Finds the versions within a range by bisecting on each of the range's
+    bounds, rather than testing each version for containment in turn.
+    """
+    def __init__(self, versions):
+        self.indices = sorted(range(len(versions)), key=versions.__getitem__)
+        self.versions = [versions[i] for i in self.indices]
+
+    def get_intersection(self, range_):
+        """Get the versions that intersect with the given range.
+
+        Args:
+            range_ (`VersionRange`): Version range.
+
+        Returns:
+            List of int: Indices into the original versions list, in ascending
+            index order.
+        """
+        if range_.is_any():
+            return list(range(len(self.versions)))
+
+        indices = []
+
+        for i, j in range_.intersect_spans(self.versions):
+            indices.extend(self.indices[i:j])
+
+        indices.sort()
+        return indices
+
+
 class _PackageVariantList(_Common):
     """A list of package variants, loaded lazily.
+
+    A variant list may be shared by the solvers in a `SolverSession`, so it
+    doesn't keep a reference to any one solver.
     """
-    def __init__(self, package_name, solver):
+    # entry value of a package that is expanded separately in each solve (see
+    # `get_intersection`)
+    late_bound = object()
+
+    def __init__(self, package_name, solver, shared=False):
         self.package_name = package_name
-        self.solver = solver
+        self.shared = shared
 
         # note: we do not apply package filters here, because doing so might
         # cause package loads (eg, timestamp rules). We only apply filters
@@ -482,44 +590,51 @@ class _PackageVariantList(_Common):
         self.entries = []
 
         for package in iter_packages(self.package_name,
-                                     paths=self.solver.package_paths):
+                                     paths=solver.package_paths):
             package.set_context(solver.context)
             self.entries.append([package, False])
 
         if not self.entries:
             raise PackageFamilyNotFoundError(
                 "package family not found: %s (searched: %s)"
-                % (package_name, "; ".join(self.solver.package_paths)))
+                % (package_name, "; ".join(solver.package_paths)))
 
-    def get_intersection(self, range_):
+        self.index = _VersionIndex([x[0].version for x in self.entries])
+
+    def get_intersection(self, range_, solver):
         """Get a list of variants that intersect with the given range.
 
         Args:
             range_ (`VersionRange`): Package version range.
+            solver (`Solver`): Solver the variants are for.
 
         Returns:
             List of `_PackageEntry` objects.
         """
         result = []
 
-        for entry in self.entries:
+        for i in self.index.get_intersection(range_):
+            entry = self.entries[i]
             package, value = entry
 
             if value is None:
                 continue  # package was blocked by package filters
 
-            if package.version not in range_:
-                continue
-
             if isinstance(value, list):
-                variants = value
-                entry_ = _PackageEntry(package, variants, self.solver)
+                # variants are sorted in place, so a shared list is copied
+                variants = list(value) if self.shared else value
+                entry_ = _PackageEntry(package, variants, solver)
                 result.append(entry_)
                 continue
 
+            if value is self.late_bound:
+                variants = solver._get_late_bound_variants(package)
+                result.append(_PackageEntry(package, variants, solver))
+                continue
+
             # apply package filter
-            if self.solver.package_filter:
-                rule = self.solver.package_filter.excludes(package)
+            if solver.package_filter:
+                rule = solver.package_filter.excludes(package)
                 if rule:
                     if config.debug_package_exclusions:
                         print_debug("Package '%s' was excluded by rule '%s'"
@@ -528,20 +643,37 @@ class _PackageVariantList(_Common):
                     continue
 
             # expand package entry into list of variants
-            if self.solver.package_load_callback:
-                self.solver.package_load_callback(package)
+            if solver.package_load_callback:
+                solver.package_load_callback(package)
+
+            # Late bound requirements can depend on the context (and its
+            # request), so they can't be shared with solves in other contexts.
+            if self.shared and self._has_late_bound_requires(package):
+                entry[1] = self.late_bound
+                variants = solver._get_late_bound_variants(package)
+                result.append(_PackageEntry(package, variants, solver))
+                continue
 
             variants_ = []
             for var in package.iter_variants():
-                variant = PackageVariant(var, self.solver.building)
+                variant = PackageVariant(var, solver.building)
                 variants_.append(variant)
 
             entry[1] = variants_
-            entry_ = _PackageEntry(package, variants_, self.solver)
+            variants = list(variants_) if self.shared else variants_
+            entry_ = _PackageEntry(package, variants, solver)
             result.append(entry_)
 
         return result or None
 
+    @staticmethod
+    def _has_late_bound_requires(package):
+        for key in ("requires", "build_requires", "private_build_requires"):
+            value = getattr(package.resource, key, None)
+            if isinstance(value, SourceCode) and value.late_binding:
+                return True
+        return False
+
     def dump(self):
         print(self.package_name)
 
@@ -575,6 +707,11 @@ class _PackageVariantList(_Common):
 
 class _PackageVariantSlice(_Common):
     """A subset of a variant list, but with more dependency-related info."""
+    __slots__ = ("solver", "package_name", "entries", "extracted_fams",
+                 "been_reduced_by", "been_intersected_with", "sorted",
+                 "_owns_tests", "_len", "_range", "_fam_requires",
+                 "_common_fams", "_variant_keys")
+
     def __init__(self, package_name, entries, solver):
         """
         Args:
@@ -584,16 +721,22 @@ class _PackageVariantSlice(_Common):
         self.solver = solver
         self.package_name = package_name
         self.entries = entries
-        self.extracted_fams = set()
-        self.been_reduced_by = set()
-        self.been_intersected_with = set()
+        self.extracted_fams = _empty_set
         self.sorted = False
 
+        # The requests and ranges that this slice is known to be unaffected
+        # by. These are shared with the slice that this one was copied from,
+        # until this slice adds to them (see _copy).
+        self.been_reduced_by = _empty_set
+        self.been_intersected_with = _empty_set
+        self._owns_tests = False
+
         # calculated on demand
         self._len = None
         self._range = None
         self._fam_requires = None
         self._common_fams = None
+        self._variant_keys = None
 
     @property
     def pr(self):
@@ -616,6 +759,14 @@ class _PackageVariantSlice(_Common):
         self._update_fam_info()
         return self._common_fams
 
+    @property
+    def variant_keys(self):
+        """Set of (version, index) tuples identifying the variants in the slice."""
+        if self._variant_keys is None:
+            self._variant_keys = frozenset(
+                (x.version, x.index) for x in self.iter_variants())
+        return self._variant_keys
+
     @property
     def extractable(self):
         """True if there are possible remaining extractions."""
@@ -649,16 +800,35 @@ class _PackageVariantSlice(_Common):
         self.solver.intersection_tests_count += 1
 
         with self.solver.timed(self.solver.intersection_time):
-            # this is faster than iter_intersecting :(
-            entries = [x for x in self.entries if x.version in range_]
+            # this is faster than iter_intersecting, and the same ranges
+            # come up again in later phases and solves
+            entries = []
+            range_s = str(range_)
+            hits = 0
+
+            for entry in self.entries:
+                key = (range_s, entry.version)
+                result = _containment_memo.get(key)
+                if result is None:
+                    result = entry.version in range_
+                    _containment_memo.set(key, result)
+                else:
+                    hits += 1
+
+                if result:
+                    entries.append(entry)
+
+            self.solver.intersection_memo_hits_count += hits
 
         if not entries:
             return None
         elif len(entries) < len(self.entries):
             copy_ = self._copy(entries)
+            copy_._own_tests()
             copy_.been_intersected_with.add(range_)
             return copy_
         else:
+            self._own_tests()
             self.been_intersected_with.add(range_)
             return self
 
@@ -690,15 +860,18 @@ class _PackageVariantSlice(_Common):
 
         entries = []
         reductions = []
-        conflict_tests = {}
+        request_s = str(package_request)
 
         def _conflicts(req_):
-            # cache conflict tests, since variants often share similar requirements
-            req_s = str(req)
-            result = conflict_tests.get(req_s)
+            # variants often share similar requirements, and the same tests
+            # come up again in later phases and solves
+            key = (str(req_), request_s)
+            result = _conflict_memo.get(key)
             if result is None:
                 result = req_.conflicts_with(package_request)
-                conflict_tests[req_s] = result
+                _conflict_memo.set(key, result)
+            else:
+                self.solver.reduction_memo_hits_count += 1
             return result
 
         for entry in self.entries:
@@ -731,9 +904,11 @@ class _PackageVariantSlice(_Common):
             return (None, reductions)
         elif reductions:
             copy_ = self._copy(new_entries=entries)
+            copy_._own_tests()
             copy_.been_reduced_by.add(package_request)
             return (copy_, reductions)
         else:
+            self._own_tests()
             self.been_reduced_by.add(package_request)
             return (self, [])
 
@@ -876,11 +1051,22 @@ class _PackageVariantSlice(_Common):
                                       entries=new_entries,
                                       solver=self.solver)
 
+        # The copy contains a subset of this slice's variants, so anything
+        # that doesn't affect this slice doesn't affect the copy either. This
+        # means the copy can share this slice's tests, even as they are added
+        # to by this slice.
         slice_.sorted = self.sorted
-        slice_.been_reduced_by = self.been_reduced_by.copy()
-        slice_.been_intersected_with = self.been_intersected_with.copy()
+        slice_.been_reduced_by = self.been_reduced_by
+        slice_.been_intersected_with = self.been_intersected_with
         return slice_
 
+    def _own_tests(self):
+        # copy shared tests before they are added to
+        if not self._owns_tests:
+            self.been_reduced_by = set(self.been_reduced_by)
+            self.been_intersected_with = set(self.been_intersected_with)
+            self._owns_tests = True
+
     def _update_fam_info(self):
         if self._common_fams is not None:
             return
@@ -901,6 +1087,12 @@ class _PackageVariantSlice(_Common):
 
         return self._len
 
+    def __copy__(self):
+        slice_ = _PackageVariantSlice.__new__(_PackageVariantSlice)
+        for name in _PackageVariantSlice.__slots__:
+            setattr(slice_, name, getattr(self, name))
+        return slice_
+
     def __str__(self):
         """
         foo[2..6(3:4)]* means, 3 versions, 4 variants in 2..6, and at least one
@@ -936,9 +1128,18 @@ class _PackageVariantSlice(_Common):
 
 
 class PackageVariantCache(object):
-    def __init__(self, solver):
+    def __init__(self, solver, variant_lists=None):
+        """
+        Args:
+            solver (`Solver`): Solver the cache is used by.
+            variant_lists (dict): Variant lists shared with other solvers (see
+                `SolverSession`). If None, the cache isn't shared.
+        """
         self.solver = solver
-        self.variant_lists = {}  # {package-name: _PackageVariantList}
+        self.shared = (variant_lists is not None)
+
+        # {package-name: _PackageVariantList}
+        self.variant_lists = {} if variant_lists is None else variant_lists
 
     def get_variant_slice(self, package_name, range_):
         """Get a list of variants from the cache.
@@ -953,10 +1154,11 @@ class PackageVariantCache(object):
         variant_list = self.variant_lists.get(package_name)
 
         if variant_list is None:
-            variant_list = _PackageVariantList(package_name, self.solver)
+            variant_list = _PackageVariantList(package_name, self.solver,
+                                               shared=self.shared)
             self.variant_lists[package_name] = variant_list
 
-        entries = variant_list.get_intersection(range_)
+        entries = variant_list.get_intersection(range_, self.solver)
         if not entries:
             return None
 
@@ -971,6 +1173,9 @@ class _PackageScope(_Common):
     or a conflict range. As the resolve progresses, package scopes are narrowed
     down.
     """
+    __slots__ = ("package_name", "solver", "package_request", "variant_slice",
+                 "pr", "is_ephemeral")
+
     def __init__(self, package_request, solver):
         self.package_name = package_request.name
         self.solver = solver
@@ -1144,11 +1349,7 @@ class _PackageScope(_Common):
             guaranteed to have a common dependency. Or None, if splitting is
             not applicable to this scope.
         """
-        if (
-            self.is_conflict
-            or self.is_ephemeral
-            or len(self.variant_slice) == 1
-        ):
+        if not self.splittable:
             return None
 
         r = self.variant_slice.split()
@@ -1160,12 +1361,56 @@ class _PackageScope(_Common):
         next_scope = self._copy(next_slice)
         return (scope, next_scope)
 
+    @property
+    def splittable(self):
+        """True if `split` is applicable to this scope."""
+        return not (
+            self.is_conflict
+            or self.is_ephemeral
+            or len(self.variant_slice) == 1
+        )
+
     def _copy(self, new_slice):
         scope = copy.copy(self)
         scope.variant_slice = new_slice
         scope._update()
         return scope
 
+    def __copy__(self):
+        scope = _PackageScope.__new__(_PackageScope)
+        for name in _PackageScope.__slots__:
+            setattr(scope, name, getattr(self, name))
+        return scope
+
+    def _is_within(self, scope):
+        """Returns True if anything this scope allows is also allowed by
+        `scope`, which must be a scope for the same package.
+        """
+        if scope is self:
+            return True
+
+        if (self.is_ephemeral != scope.is_ephemeral) \
+                or (self.is_conflict != scope.is_conflict):
+            return False
+
+        range_ = self.package_request.range
+        other_range = scope.package_request.range
+        if range_ is None or other_range is None:
+            return False
+
+        # a conflict is narrower if it excludes a wider range
+        if self.is_conflict:
+            return range_.issuperset(other_range)
+
+        if not other_range.issuperset(range_):
+            return False
+
+        if self.is_ephemeral or (self.variant_slice is scope.variant_slice):
+            return True
+
+        return self.variant_slice.variant_keys.issubset(
+            scope.variant_slice.variant_keys)
+
     def _is_solved(self):
         return (
             self.is_conflict
@@ -1204,6 +1449,36 @@ class _PackageScope(_Common):
             return str(self.variant_slice)
 
 
+class _Nogood(_Common):
+    """A learned set of package scopes that cannot be satisfied together.
+
+    A nogood is recorded when a phase fails, and contains only those scopes
+    that were directly involved in the failure. Any later phase whose scopes
+    for the same packages each fall within the recorded scopes is guaranteed
+    to fail in the same way, so it can be discarded without being solved.
+    """
+    __slots__ = ("scopes", "failure_reason")
+
+    def __init__(self, scopes, failure_reason):
+        self.scopes = dict((x.package_name, x) for x in scopes)
+        self.failure_reason = failure_reason
+
+    def matches(self, scopes):
+        """Returns True if the given scopes contain this nogood.
+
+        Args:
+            scopes (dict): Package scopes, keyed by package name.
+        """
+        for package_name, scope in self.scopes.items():
+            scope_ = scopes.get(package_name)
+            if scope_ is None or not scope_._is_within(scope):
+                return False
+        return True
+
+    def __str__(self):
+        return ' '.join(str(x) for x in self.scopes.values())
+
+
 def _get_dependency_order(g, node_list):
     """Return list of nodes as close as possible to the ordering in node_list,
     but with child nodes earlier in the list than parents."""
@@ -1243,9 +1518,13 @@ class _ResolvePhase(_Common):
     If the resolve phase gets to a point where every package scope is solved,
     then the entire resolve is considered to be solved.
     """
+    __slots__ = ("solver", "failure_reason", "conflict_scopes", "extractions",
+                 "status", "scopes", "changed_scopes_i")
+
     def __init__(self, solver):
         self.solver = solver
         self.failure_reason = None
+        self.conflict_scopes = None
         self.extractions = {}
         self.status = SolverStatus.pending
 
@@ -1268,6 +1547,7 @@ class _ResolvePhase(_Common):
 
         scopes = self.scopes[:]
         failure_reason = None
+        conflict_scopes = []
         extractions = {}
 
         changed_scopes_i = self.changed_scopes_i.copy()
@@ -1276,6 +1556,7 @@ class _ResolvePhase(_Common):
             phase = copy.copy(self)
             phase.scopes = scopes
             phase.failure_reason = failure_reason
+            phase.conflict_scopes = conflict_scopes
             phase.extractions = extractions
             phase.changed_scopes_i = set()
 
@@ -1286,6 +1567,15 @@ class _ResolvePhase(_Common):
                 phase.status = status
             return phase
 
+        # discard the phase if it contains a nogood learned from an earlier
+        # failure - it is guaranteed to fail in the same way
+        nogood = self.solver._find_nogood(scopes)
+        if nogood:
+            if self.pr:
+                self.pr("pruned by nogood: %s", nogood)
+            failure_reason = nogood.failure_reason
+            return _create_phase(SolverStatus.failed)
+
         # iteratively reduce until no more reductions possible
         while True:
             prev_num_scopes = len(scopes)
@@ -1295,6 +1585,7 @@ class _ResolvePhase(_Common):
             while True:
                 self.pr.subheader("EXTRACTING:")
                 extracted_requests = []
+                extracted_scopes = {}  # {package_name: [extracting scope]}
 
                 # perform all possible extractions
                 with self.solver.timed(self.solver.extraction_time):
@@ -1306,6 +1597,8 @@ class _ResolvePhase(_Common):
                                 extracted_requests.append(extracted_request)
                                 k = (scopes[i].package_name, extracted_request.name)
                                 extractions[k] = extracted_request
+                                extracted_scopes.setdefault(
+                                    extracted_request.name, []).append(scope_)
                                 self.solver.extractions_count += 1
                                 scopes[i] = scope_
                             else:
@@ -1322,6 +1615,7 @@ class _ResolvePhase(_Common):
                     req1, req2 = extracted_requests.conflict
                     conflict = DependencyConflict(req1, req2)
                     failure_reason = DependencyConflicts([conflict])
+                    conflict_scopes = extracted_scopes[req1.name]
                     return _create_phase(SolverStatus.failed)
                 elif self.pr:
                     self.pr("merged extractions: %s", extracted_requests)
@@ -1347,6 +1641,8 @@ class _ResolvePhase(_Common):
                             conflict = DependencyConflict(
                                 extracted_req, scope.package_request)
                             failure_reason = DependencyConflicts([conflict])
+                            conflict_scopes = \
+                                extracted_scopes[extracted_req.name] + [scope]
                             return _create_phase(SolverStatus.failed)
 
                         if scope_ is not scope:
@@ -1411,6 +1707,15 @@ class _ResolvePhase(_Common):
                     and not widened_scopes_i:
                 break
 
+            # scopes have been narrowed or added, which may now contain a
+            # nogood. It's cheaper to check this before reducing
+            nogood = self.solver._find_nogood(scopes)
+            if nogood:
+                if self.pr:
+                    self.pr("pruned by nogood: %s", nogood)
+                failure_reason = nogood.failure_reason
+                return _create_phase(SolverStatus.failed)
+
             # iteratively reduce until no more reductions possible
             self.pr.subheader("REDUCING:")
 
@@ -1423,25 +1728,29 @@ class _ResolvePhase(_Common):
             # and list of added scopes. Each item is an (x, y) tuple, where
             # scope[x] will reduce by scope[y].package_request.
             #
-            all_scopes_i = range(num_scopes)
-            prev_scopes_i = range(prev_num_scopes)
             added_scopes_i = range(prev_num_scopes, num_scopes)
+            reducible_by, reducers_of = self._get_reduction_index(scopes)
 
             pending_reducts = set(chain(
 
                 # existing scopes must reduce against changed scopes
-                product(prev_scopes_i, changed_scopes_i),
+                (
+                    (x, y) for y in changed_scopes_i
+                    for x in reducible_by(y) if x < prev_num_scopes
+                ),
 
                 # existing scopes must reduce against newly added scopes
-                product(prev_scopes_i, added_scopes_i),
-
-                # newly added scopes must reduce against all other scopes
-                product(added_scopes_i, all_scopes_i),
-
-                # 'widened' scopes (see earlier comment in this func) must reduce
-                # against all other scopes
-                #
-                product(widened_scopes_i, all_scopes_i)
+                (
+                    (x, y) for y in added_scopes_i
+                    for x in reducible_by(y) if x < prev_num_scopes
+                ),
+
+                # newly added scopes must reduce against all other scopes, as
+                # must 'widened' scopes (see earlier comment in this func)
+                (
+                    (x, y) for x in chain(added_scopes_i, widened_scopes_i)
+                    for y in reducers_of(x)
+                )
             ))
 
             # iteratively reduce until there are no more pending reductions.
@@ -1465,13 +1774,14 @@ class _ResolvePhase(_Common):
 
                     if new_scope is None:
                         failure_reason = TotalReduction(reductions)
+                        conflict_scopes = [scopes[x], scopes[y]]
                         return _create_phase(SolverStatus.failed)
 
                     elif new_scope is not scopes[x]:
                         scopes[x] = new_scope
 
                         # other scopes need to reduce against x again
-                        for j in all_scopes_i:
+                        for j in reducible_by(x):
                             if j != x:
                                 pending_reducts.append((j, x))
 
@@ -1479,6 +1789,59 @@ class _ResolvePhase(_Common):
 
         return _create_phase()
 
+    def _get_reduction_index(self, scopes):
+        """Get the scopes that reductions need to be scheduled between.
+
+        A scope can only be reduced by the request of another scope if its
+        variants require that package family (see
+        `_PackageVariantSlice.reduce_by`). Every other reduction has no effect,
+        and these typically make up most of the pairs of scopes in a large
+        solve. Scopes are indexed by family as they're needed. Scopes only
+        narrow during reduction, so the index never misses a reduction that
+        has an effect. The reductions that remain are scheduled in the same
+        order as they otherwise would be, so the solve is the same.
+
+        When the solver is unoptimised, every pair of scopes is given.
+
+        Returns:
+            2-tuple of callables:
+            - reducible_by(y): Indexes of scopes that may be reduced by scope y;
+            - reducers_of(x): Indexes of scopes that may reduce scope x.
+            Indexes are in ascending order.
+        """
+        all_scopes_i = range(len(scopes))
+
+        if not self.solver.optimised:
+            def _all(i):
+                return all_scopes_i
+            return _all, _all
+
+        index = {}
+
+        def reducible_by(y):
+            name = scopes[y].package_name
+            scopes_i = index.get(name)
+
+            if scopes_i is None:
+                scopes_i = [
+                    i for i in all_scopes_i
+                    if scopes[i].variant_slice is not None
+                    and name in scopes[i].variant_slice.fam_requires
+                ]
+                index[name] = scopes_i
+
+            return scopes_i
+
+        def reducers_of(x):
+            slice_ = scopes[x].variant_slice
+            if slice_ is None:
+                return []
+
+            fams = slice_.fam_requires
+            return [i for i in all_scopes_i if scopes[i].package_name in fams]
+
+        return reducible_by, reducers_of
+
     def finalise(self):
         """Remove conflict requests, detect cyclic dependencies, and reorder
         packages wrt dependency and then request order.
@@ -1528,7 +1891,7 @@ class _ResolvePhase(_Common):
 
         When a phase is exhausted, it gets split into a pair of phases to be
         further solved. The split happens like so:
-        1) Select the first unsolved package scope.
+        1) Select an unsolved package scope (see `_get_split_index`).
         2) Find some common dependency in the first N variants of the scope.
         3) Split the scope into two: [:N] and [N:].
         4) Create two copies of the phase, containing each half of the split
@@ -1545,24 +1908,15 @@ class _ResolvePhase(_Common):
         """
         assert(self.status == SolverStatus.exhausted)
 
-        scopes = []
-        next_scopes = []
-        split_i = None
-
-        for i, scope in enumerate(self.scopes):
-            if split_i is None:
-                r = scope.split()
-                if r is not None:
-                    scope_, next_scope = r
-                    scopes.append(scope_)
-                    next_scopes.append(next_scope)
-                    split_i = i
-                    continue
+        split_i = self._get_split_index()
+        assert split_i is not None
 
-            scopes.append(scope)
-            next_scopes.append(scope)
+        r = self.scopes[split_i].split()
 
-        assert split_i is not None
+        # the new phases share all but the split scope
+        scopes = self.scopes[:]
+        next_scopes = self.scopes[:]
+        scopes[split_i], next_scopes[split_i] = r
 
         phase = copy.copy(self)
         phase.scopes = scopes
@@ -1579,6 +1933,56 @@ class _ResolvePhase(_Common):
         next_phase.scopes = next_scopes
         return (phase, next_phase)
 
+    def _get_split_index(self):
+        """Select the scope to split, according to the solver's split mode.
+
+        - first: the first splittable scope, in request order;
+        - fewest_variants: the splittable scope with the fewest variants, since
+          it has the fewest alternatives to backtrack through;
+        - most_dependents: the splittable scope that the most other scopes
+          depend on, since narrowing it reduces the most other scopes.
+
+        Ties go to the scope that is first in request order.
+
+        Returns:
+            int: Index of the scope to split, or None if no scope is
+            splittable.
+        """
+        mode = self.solver.split_mode
+        indexes = (i for i, x in enumerate(self.scopes) if x.splittable)
+
+        if mode == ScopeSplitMode.first:
+            return next(indexes, None)
+
+        indexes = list(indexes)
+        if not indexes:
+            return None
+
+        if mode == ScopeSplitMode.fewest_variants:
+            def _key(i):
+                return len(self.scopes[i].variant_slice)
+        else:  # ScopeSplitMode.most_dependents
+            names = set(self.scopes[i].package_name for i in indexes)
+            num_dependents = defaultdict(int)
+
+            for scope in self.scopes:
+                if scope.variant_slice is not None:
+                    for name in (names & scope.variant_slice.fam_requires):
+                        num_dependents[name] += 1
+
+            def _key(i):
+                scope = self.scopes[i]
+                return (-num_dependents[scope.package_name],
+                        len(scope.variant_slice))
+
+        return min(indexes, key=_key)
+
+    def __copy__(self):
+        phase = _ResolvePhase.__new__(_ResolvePhase)
+        for name in _ResolvePhase.__slots__:
+            setattr(phase, name, getattr(self, name))
+        return phase
+
     def get_graph(self):
         """Get the resolve graph.
 
@@ -1589,248 +1993,68 @@ class _ResolvePhase(_Common):
         Returns:
             A pygraph.digraph object.
         """
-        g = digraph()
-        scopes = dict((x.package_name, x) for x in self.scopes)
-        failure_nodes = set()
-        request_nodes = {}  # (request, node_id)
-        scope_nodes = {}  # (package_name, node_id)
-        scope_requests = {}  # (node_id, request)
-
-        # -- graph creation basics
-
-        node_color = "#F6F6F6"
-        request_color = "#FFFFAA"
-        solved_color = "#AAFFAA"
-        node_fontsize = 10
-        counter = [1]
-
-        def _uid():
-            id_ = counter[0]
-            counter[0] += 1
-            return "_%d" % id_
-
-        def _add_edge(id1, id2, arrowsize=0.5):
-            e = (id1, id2)
-            if g.has_edge(e):
-                g.del_edge(e)
-            g.add_edge(e)
-            g.add_edge_attribute(e, ("arrowsize", str(arrowsize)))
-            return e
-
-        def _add_extraction_merge_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.add_edge_attribute(e, ("arrowhead", "odot"))
-
-        def _add_conflict_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, "CONFLICT")
-            g.add_edge_attribute(e, ("style", "bold"))
-            g.add_edge_attribute(e, ("color", "red"))
-            g.add_edge_attribute(e, ("fontcolor", "red"))
-
-        def _add_cycle_edge(id1, id2):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, "CYCLE")
-            g.add_edge_attribute(e, ("style", "bold"))
-            g.add_edge_attribute(e, ("color", "red"))
-            g.add_edge_attribute(e, ("fontcolor", "red"))
-
-        def _add_reduct_edge(id1, id2, label):
-            e = _add_edge(id1, id2, 1)
-            g.set_edge_label(e, label)
-            g.add_edge_attribute(e, ("fontsize", node_fontsize))
-
-        def _add_node(label, color, style):
-            attrs = [("label", label),
-                     ("fontsize", node_fontsize),
-                     ("fillcolor", color),
-                     ("style", '"%s"' % style)]
-            id_ = _uid()
-            g.add_node(id_, attrs=attrs)
-            return id_
-
-        def _add_request_node(request, initial_request=False):
-            id_ = request_nodes.get(request)
-            if id_ is not None:
-                return id_
-
-            label = str(request)
-            if initial_request:
-                color = request_color
-            else:
-                color = node_color
+        return graph_from_data(self.get_graph_data())
 
-            id_ = _add_node(label, color, "filled,dashed")
-            request_nodes[request] = id_
-            return id_
+    def get_graph_data(self):
+        """Get the data that the resolve graph is built from.
 
-        def _add_scope_node(scope):
-            id_ = scope_nodes.get(scope.package_name)
-            if id_ is not None:
-                return id_
+        This is much cheaper to get than the graph itself, and contains only
+        builtin types, so it can be cached or serialized. The graph is built
+        with `rez.utils.resolve_graph.graph_from_data`.
 
+        Returns:
+            dict: Graph data, containing:
+            - requests: Initial requests, as strings;
+            - scopes: A (package_name, label, state, package_request,
+              requires) list per scope. State is 'solved', 'conflict' or
+              empty. Requires lists the solved variant's requirements;
+            - extractions: A (source family, family, request) list per
+              extraction;
+            - failure: None, or a (type, items) list where type is one of
+              'conflicts', 'reductions' or 'cycle';
+            - prune_unfailed: See `Solver`.
+        """
+        scopes = []
+        for scope in self.scopes:
+            requires = []
             variant = scope._get_solved_variant()
             if variant:
                 label = str(variant)
-                color = solved_color
-                style = "filled"
+                state = "solved"
+                requires = [str(x) for x in variant.requires_list.requirements]
             elif scope.is_conflict:
                 label = str(scope)
-                color = node_color
-                style = "filled,dashed"
+                state = "conflict"
             else:
                 label = str(scope)
-                color = node_color
-                style = "filled"
-
-            id_ = _add_node(label, color, style)
-            scope_nodes[scope.package_name] = id_
-            scope_requests[id_] = scope.package_request
-            return id_
-
-        def _add_reduct_node(request):
-            return _add_node(str(request), node_color, "filled,dashed")
-
-        # -- generate the graph
-
-        # create initial request nodes
-        for request in self.solver.request_list:
-            _add_request_node(request, True)
-
-        # create scope nodes
-        for scope in self.scopes:
-            if scope.is_conflict:
-                id1 = request_nodes.get(scope.package_request)
-                if id1 is not None:
-                    # special case - a scope that matches an initial conflict request,
-                    # we switch nodes so the request node becomes a scope node
-                    scope_nodes[scope.package_name] = id1
-                    del request_nodes[scope.package_request]
-                    continue
+                state = ""
 
-            _add_scope_node(scope)
+            scopes.append([scope.package_name, label, state,
+                           str(scope.package_request), requires])
 
-        # create (initial request -> scope) edges
-        for request in self.solver.request_list:
-            id1 = request_nodes.get(request)
-            if id1 is not None:
-                id2 = scope_nodes.get(request.name)
-                if id2 is not None:
-                    _add_edge(id1, id2)
+        extractions = [[src_fam, fam, str(request)]
+                       for (src_fam, fam), request in self.extractions.items()]
 
-        # for solved scopes, create (scope -> requirement) edge
-        for scope in self.scopes:
-            variant = scope._get_solved_variant()
-            if variant:
-                id1 = scope_nodes[scope.package_name]
-
-                for request in variant.requires_list.requirements:
-                    id2 = _add_request_node(request)
-                    _add_edge(id1, id2)
-
-        # add extractions
-        for (src_fam, _), dest_req in self.extractions.items():
-            id1 = scope_nodes.get(src_fam)
-            if id1 is not None:
-                id2 = _add_request_node(dest_req)
-                _add_edge(id1, id2)
-
-        # add extraction intersections
-        extracted_fams = set(x[1] for x in self.extractions.keys())
-        for fam in extracted_fams:
-            requests = [v for k, v in self.extractions.items() if k[1] == fam]
-            if len(requests) > 1:
-                reqlist = RequirementList(requests)
-                if not reqlist.conflict:
-                    merged_request = reqlist.get(fam)
-                    for request in requests:
-                        if merged_request != request:
-                            id1 = _add_request_node(request)
-                            id2 = _add_request_node(merged_request)
-                            _add_extraction_merge_edge(id1, id2)
-
-        # add conflicts
+        failure = None
         fr = self.failure_reason
-        if fr:
-            if isinstance(fr, DependencyConflicts):
-                for conflict in fr.conflicts:
-                    conflicting_request = conflict.conflicting_request
-                    scope_n = scope_nodes.get(conflicting_request.name)
-                    scope_r = scope_requests.get(scope_n)
-
-                    if scope_n is not None \
-                            and scope_r is not None \
-                            and scope_r.conflicts_with(conflicting_request):
-                        # confirmed that scope node is in conflict
-                        id1 = _add_request_node(conflicting_request)
-                        id2 = scope_n
-                    elif scope_n is not None and scope_r is None:
-                        # occurs when an existing conflict request conflicts
-                        # with a pkg requirement
-                        id1 = scope_n
-                        id2 = _add_request_node(conflict.dependency)
-                    else:
-                        id1 = _add_request_node(conflict.dependency)
-                        id2 = scope_n or _add_request_node(conflicting_request)
-
-                    _add_conflict_edge(id1, id2)
-
-                    failure_nodes.add(id1)
-                    failure_nodes.add(id2)
-            elif isinstance(fr, TotalReduction):
-                if len(fr.reductions) == 1:
-                    # special case - singular total reduction
-                    reduct = fr.reductions[0]
-                    id1 = scope_nodes[reduct.name]
-                    id2 = _add_request_node(reduct.dependency)
-                    id3 = scope_nodes[reduct.conflicting_request.name]
-                    _add_edge(id1, id2)
-                    _add_conflict_edge(id2, id3)
-
-                    failure_nodes.add(id1)
-                    failure_nodes.add(id2)
-                    failure_nodes.add(id3)
-                else:
-                    for reduct in fr.reductions:
-                        id1 = scope_nodes[reduct.name]
-                        id2 = _add_reduct_node(reduct.dependency)
-                        id3 = scope_nodes[reduct.conflicting_request.name]
-                        _add_reduct_edge(id1, id2, reduct.reducee_str())
-                        _add_conflict_edge(id2, id3)
-
-                        failure_nodes.add(id1)
-                        failure_nodes.add(id2)
-                        failure_nodes.add(id3)
-            elif isinstance(fr, Cycle):
-                for i, pkg in enumerate(fr.packages):
-                    id1 = scope_nodes[pkg.name]
-                    failure_nodes.add(id1)
-                    pkg2 = fr.packages[(i + 1) % len(fr.packages)]
-                    id2 = scope_nodes[pkg2.name]
-                    _add_cycle_edge(id1, id2)
-
-        # connect leaf-node requests to a matching scope, if any
-        for request, id1 in request_nodes.items():
-            if not g.neighbors(id1):  # leaf node
-                id2 = scope_nodes.get(request.name)
-                if id2 is not None:
-                    scope = scopes.get(request.name)
-                    if not request.conflicts_with(scope.package_request):
-                        _add_edge(id1, id2)
-
-        # prune nodes not related to failure
-        if self.solver.prune_unfailed and failure_nodes:
-            access_dict = accessibility(g)
-            del_nodes = set()
-
-            for n, access_nodes in access_dict.items():
-                if not (set(access_nodes) & failure_nodes):
-                    del_nodes.add(n)
-
-            for n in del_nodes:
-                g.del_node(n)
-
-        return g
+        if isinstance(fr, DependencyConflicts):
+            failure = ["conflicts",
+                       [[str(x.dependency), str(x.conflicting_request)]
+                        for x in fr.conflicts]]
+        elif isinstance(fr, TotalReduction):
+            failure = ["reductions",
+                       [[x.name, str(x.dependency), str(x.conflicting_request),
+                         x.reducee_str()] for x in fr.reductions]]
+        elif isinstance(fr, Cycle):
+            failure = ["cycle", [x.name for x in fr.packages]]
+
+        return dict(
+            requests=[str(x) for x in self.solver.request_list],
+            scopes=scopes,
+            extractions=extractions,
+            failure=failure,
+            prune_unfailed=bool(self.solver.prune_unfailed)
+        )
 
     def _get_minimal_graph(self):
         if not self._is_solved():
@@ -1887,6 +2111,48 @@ class _ResolvePhase(_Common):
         return ' '.join(str(x) for x in self.scopes)
 
 
+class SolverSession(object):
+    """Package variants shared by many solves.
+
+    Each `Solver` normally loads the package families it needs, and wraps
+    their variants, itself. Solvers created with the same session share this
+    work instead, which greatly speeds up solving many requests in one process.
+
+    Variants are shared between solves with the same package paths, package
+    filter and building mode. Packages with late bound requirements are still
+    expanded separately in each solve, since their requirements can depend on
+    the context being resolved.
+
+    A session does not notice packages that are released after a family was
+    loaded, so it should not be kept for longer than a single batch of solves,
+    unless `clear` is called when repositories change. Sessions are not
+    thread-safe.
+    """
+    def __init__(self):
+        self.variant_lists = {}
+
+    def get_variant_lists(self, solver):
+        """Get the variant lists that a solver shares with other solves.
+
+        Args:
+            solver (`Solver`): Solver.
+
+        Returns:
+            dict: Variant lists, keyed by package name.
+        """
+        if solver.package_filter:
+            filter_hash = solver.package_filter.sha1
+        else:
+            filter_hash = ''
+
+        key = (tuple(solver.package_paths), filter_hash, solver.building)
+        return self.variant_lists.setdefault(key, {})
+
+    def clear(self):
+        """Discard all shared variants."""
+        self.variant_lists = {}
+
+
 class Solver(_Common):
     """Solver.
 
@@ -1896,11 +2162,16 @@ class Solver(_Common):
     """
     max_verbosity = 3
 
+    # number of solve steps before split phases are first explored in parallel,
+    # and between subsequent parallel explorations
+    speculation_interval = 20
+
     def __init__(self, package_requests, package_paths, context=None,
                  package_filter=None, package_orderers=None, callback=None,
                  building=False, optimised=True, verbosity=0, buf=None,
                  package_load_callback=None, prune_unfailed=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, session=None,
+                 num_workers=None, split_mode=None):
         """Create a Solver.
 
         Args:
@@ -1933,6 +2204,16 @@ class Solver(_Common):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            session (`SolverSession`): Session to share package variants with
+                other solves, if any. Note that `package_load_callback` is only
+                called for packages that the session had not yet loaded.
+            num_workers (int): If nonzero, explore split phases in parallel
+                in this many worker processes, as well as in this process. If
+                None, the 'solver_parallel_workers' config setting is used.
+                See `_speculate`.
+            split_mode (`ScopeSplitMode`): How to select the package scope to
+                split when a phase is exhausted. If None, the
+                'scope_split_mode' config setting is used.
         """
         self.package_paths = package_paths
         self.package_filter = package_filter
@@ -1948,6 +2229,14 @@ class Solver(_Common):
         self.print_stats = print_stats
         self.buf = buf
 
+        if num_workers is None:
+            num_workers = config.solver_parallel_workers
+        self.num_workers = num_workers
+
+        if split_mode is None:
+            split_mode = ScopeSplitMode[config.scope_split_mode]
+        self.split_mode = split_mode
+
         if _force_unoptimised_solver:
             self.optimised = False
         else:
@@ -1958,6 +2247,7 @@ class Solver(_Common):
         self.abort_reason = None
         self.callback_return = None
         self.depth_counts = None
+        self.nogoods = None
         self.solve_begun = None
         self.solve_time = None
         self.load_time = None
@@ -1968,19 +2258,34 @@ class Solver(_Common):
         self.intersections_count = 0
         self.intersection_tests_count = 0
         self.intersection_broad_tests_count = 0
+        self.intersection_memo_hits_count = 0
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_memo_hits_count = 0
+        self.nogood_prunes_count = 0
+        self.speculations_count = 0
+        self.speculative_fails_count = 0
+        self.speculative_skips_count = 0
 
         self.extraction_time = [0.0]
         self.intersection_time = [0.0]
         self.intersection_test_time = [0.0]
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
+        self.nogood_time = [0.0]
+        self.speculation_time = [0.0]
 
         self._init()
 
-        self.package_cache = PackageVariantCache(self)
+        # {package-uri: [PackageVariant]}, see _get_late_bound_variants
+        self._late_bound_variants = {}
+
+        if session is None:
+            self.package_cache = PackageVariantCache(self)
+        else:
+            self.package_cache = PackageVariantCache(
+                self, variant_lists=session.get_variant_lists(self))
 
         # merge the request
         if self.pr:
@@ -2050,7 +2355,7 @@ class Solver(_Common):
     def num_fails(self):
         """Return the number of failed solve steps that have been executed.
         Note that num_solves is inclusive of failures."""
-        n = len(self.failed_phase_list)
+        n = len(self.failed_phase_list) + self.speculative_fails_count
         if self.phase_stack[-1].status in (SolverStatus.failed, SolverStatus.cyclic):
             n += 1
         return n
@@ -2109,10 +2414,16 @@ class Solver(_Common):
         pt1 = package_repo_stats.package_load_time
 
         # iteratively solve phases
-        while self.status == SolverStatus.unsolved:
-            self.solve_step()
-            if self.status == SolverStatus.unsolved and not self._do_callback():
-                break
+        try:
+            while self.status == SolverStatus.unsolved:
+                if self.num_workers:
+                    self._speculate()
+
+                self.solve_step()
+                if self.status == SolverStatus.unsolved and not self._do_callback():
+                    break
+        finally:
+            self._stop_speculative_workers()
 
         self.load_time = package_repo_stats.package_load_time - pt1
         self.solve_time = time.time() - t1
@@ -2139,6 +2450,7 @@ class Solver(_Common):
             "num_intersections": self.intersections_count,
             "num_intersection_tests": self.intersection_tests_count,
             "num_intersection_broad_tests": self.intersection_broad_tests_count,
+            "num_intersection_memo_hits": self.intersection_memo_hits_count,
             "intersection_time": self.intersection_time[0],
             "intersection_test_time": self.intersection_test_time[0]
         }
@@ -2147,10 +2459,23 @@ class Solver(_Common):
             "num_reductions": self.reductions_count,
             "num_reduction_tests": self.reduction_tests_count,
             "num_reduction_broad_tests": self.reduction_broad_tests_count,
+            "num_reduction_memo_hits": self.reduction_memo_hits_count,
             "reduction_time": self.reduction_time[0],
             "reduction_test_time": self.reduction_test_time[0]
         }
 
+        nogood_stats = {
+            "num_nogoods": len(self.nogoods),
+            "num_nogood_prunes": self.nogood_prunes_count,
+            "nogood_time": self.nogood_time[0]
+        }
+
+        speculation_stats = {
+            "num_speculations": self.speculations_count,
+            "num_speculative_skips": self.speculative_skips_count,
+            "speculation_time": self.speculation_time[0]
+        }
+
         global_stats = {
             "num_solves": self.num_solves,
             "num_fails": self.num_fails,
@@ -2162,7 +2487,9 @@ class Solver(_Common):
             "global": global_stats,
             "extractions": extraction_stats,
             "intersections": intersection_stats,
-            "reductions": reduction_stats
+            "reductions": reduction_stats,
+            "nogoods": nogood_stats,
+            "speculations": speculation_stats
         }
 
     def solve_step(self):
@@ -2195,6 +2522,7 @@ class Solver(_Common):
 
         if new_phase.status == SolverStatus.failed:
             self.pr.subheader("FAILED:")
+            self._learn_nogood(new_phase)
             self._push_phase(new_phase)
             if self.pr and len(self.phase_stack) == 1:
                 self.pr.header("FAIL: there is no solution")
@@ -2270,12 +2598,24 @@ class Solver(_Common):
         Returns:
             A pygraph.digraph object.
         """
+        return graph_from_data(self.get_graph_data())
+
+    def get_graph_data(self):
+        """Returns the data that the most recent solve graph is built from.
+
+        See `get_graph`, and `_ResolvePhase.get_graph_data`. Use this rather
+        than `get_graph` to defer building the graph until it is needed.
+
+        Returns:
+            dict: Graph data.
+        """
         st = self.status
         if st in (SolverStatus.solved, SolverStatus.unsolved):
             phase = self._latest_nonfailed_phase()
-            return phase.get_graph()
         else:
-            return self.get_fail_graph()
+            phase, _ = self._get_failed_phase()
+
+        return phase.get_graph_data()
 
     def get_fail_graph(self, failure_index=None):
         """Returns a graph showing a solve failure.
@@ -2315,6 +2655,7 @@ class Solver(_Common):
         self.phase_stack = []
         self.failed_phase_list = []
         self.depth_counts = {}
+        self.nogoods = []
         self.solve_time = 0.0
         self.load_time = 0.0
         self.solve_begun = False
@@ -2325,15 +2666,29 @@ class Solver(_Common):
         self.intersections_count = 0
         self.intersection_tests_count = 0
         self.intersection_broad_tests_count = 0
+        self.intersection_memo_hits_count = 0
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_memo_hits_count = 0
+        self.nogood_prunes_count = 0
+        self.speculations_count = 0
+        self.speculative_fails_count = 0
+        self.speculative_skips_count = 0
 
         self.extraction_time = [0.0]
         self.intersection_time = [0.0]
         self.intersection_test_time = [0.0]
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
+        self.nogood_time = [0.0]
+        self.speculation_time = [0.0]
+
+        # see _speculate
+        self._next_speculation = self.speculation_interval
+        self._speculation_min_index = 0
+        self._speculative_workers = []
+        self._speculative_results = {}
 
     def _latest_nonfailed_phase(self):
         if self.status == SolverStatus.failed:
@@ -2370,6 +2725,224 @@ class Solver(_Common):
 
         return slice_
 
+    def _get_late_bound_variants(self, package):
+        # variants of a package whose requirements are late bound, and so are
+        # evaluated within this solve's context
+        variants = self._late_bound_variants.get(package.uri)
+
+        if variants is None:
+            package_ = Package(package.resource, context=self.context)
+            variants = [PackageVariant(x, self.building)
+                        for x in package_.iter_variants()]
+            self._late_bound_variants[package.uri] = variants
+
+        return list(variants)
+
+    def _can_speculate(self):
+        return (
+            self.solve_count >= self._next_speculation
+            and not self.pr  # workers would print over each other
+            and _fork_context is not None
+            and not multiprocessing.current_process().daemon
+        )
+
+    def _speculate(self):
+        """Explore the phases on the stack in parallel.
+
+        Each unsolved phase on the stack is the root of a subtree of the
+        search, and the serial solve explores these subtrees one after the
+        other, from the top of the stack down. Here, while this process solves
+        the phase at the top of the stack, up to `num_workers` of the phases
+        below it have their subtrees fully explored at the same time, in
+        forked worker processes. When the solve fails back to one of those
+        phases, and its subtree was found to fail, the subtree is skipped.
+
+        Only failing subtrees are skipped, so the result of the solve is the
+        same as that of a serial solve. `num_solves` and `num_fails` include
+        the steps taken by workers, but can differ from a serial solve's:
+        nogoods learned in a worker are not sent back, so steps that a serial
+        solve would prune can be repeated here. The failed phases in skipped
+        subtrees are not available to `failure_reason` or `get_fail_graph`.
+        """
+        self._collect_speculative_results()
+
+        if self.phase_stack[-1].status == SolverStatus.failed:
+            self._skip_failed_subtrees()
+
+        if self._can_speculate():
+            self._start_speculative_workers()
+
+    def _start_speculative_workers(self):
+        self._next_speculation = self.solve_count + self.speculation_interval
+        stack = self.phase_stack
+
+        # Do what the next solve step would do first anyway - discard a
+        # previous failure, and split an exhausted phase. The other half of
+        # the split can then be explored by a worker.
+        if stack[-1].status == SolverStatus.failed:
+            self.failed_phase_list.append(self._pop_phase())
+
+        if stack[-1].status == SolverStatus.exhausted:
+            phase, next_phase = self._pop_phase().split()
+            self._push_phase(next_phase)
+            self._push_phase(phase)
+
+        # workers explore the phases that the solve would reach next, so
+        # workers exploring phases further down the stack are replaced
+        running = dict((x[0], x) for x in self._speculative_workers)
+        indices = []
+        i = len(stack) - 2
+
+        while i >= self._speculation_min_index \
+                and len(indices) < self.num_workers:
+            result = self._speculative_results.get(i)
+            if result is None or result[0] is not stack[i]:
+                indices.append(i)
+            i -= 1
+
+        self._stop_speculative_workers(
+            [x for i, x in running.items() if i not in indices])
+        self._speculative_workers = [running[i] for i in indices
+                                     if i in running]
+
+        with self.timed(self.speculation_time):
+            for i in indices:
+                if i in running:
+                    continue
+
+                conn, child_conn = _fork_context.Pipe(duplex=False)
+                proc = _fork_context.Process(target=self._solve_subtree,
+                                             args=(stack[i], child_conn))
+                proc.daemon = True
+                proc.start()
+                child_conn.close()
+
+                self._speculative_workers.append((i, stack[i], proc, conn))
+                self.speculations_count += 1
+
+    def _collect_speculative_results(self, wait_index=None):
+        # Collect the results of workers that have finished. If `wait_index`
+        # is given, wait for the worker exploring the phase at that index.
+        #
+        stack = self.phase_stack
+        running = []
+
+        for worker in self._speculative_workers:
+            i, phase, proc, conn = worker
+
+            if i >= len(stack) or stack[i] is not phase \
+                    or i < self._speculation_min_index:
+                self._stop_speculative_workers([worker])  # no longer needed
+                continue
+
+            if i != wait_index and not conn.poll():
+                running.append(worker)
+                continue
+
+            try:
+                status, num_solves, num_fails = conn.recv()
+            except EOFError:
+                status, num_solves, num_fails = None, 0, 0  # the worker died
+
+            self._stop_speculative_workers([worker])
+            self._speculative_results[i] = (phase, status, num_solves,
+                                            num_fails)
+
+            # the solve ends in this subtree if it gets this far, so nothing
+            # below it needs exploring
+            if status in (SolverStatus.solved, SolverStatus.cyclic):
+                self._speculation_min_index = max(i, self._speculation_min_index)
+
+        self._speculative_workers = running
+
+    def _skip_failed_subtrees(self):
+        stack = self.phase_stack
+
+        # the bottom phase is never skipped, so a solve that fails still
+        # fails the same way
+        while len(stack) > 2 and stack[-1].status == SolverStatus.failed:
+            i = len(stack) - 2
+
+            with self.timed(self.speculation_time):
+                self._collect_speculative_results(wait_index=i)
+
+            result = self._speculative_results.pop(i, None)
+            if result is None or result[0] is not stack[i] \
+                    or result[1] != SolverStatus.failed:
+                break
+
+            self.failed_phase_list.append(self._pop_phase())
+            self._pop_phase()
+
+            self.solve_count += result[2]
+            self.speculative_fails_count += result[3]
+            self.speculative_skips_count += 1
+
+    def _stop_speculative_workers(self, workers=None):
+        if workers is None:
+            workers = self._speculative_workers
+            self._speculative_workers = []
+
+        for _, _, proc, conn in workers:
+            # SIGTERM would run rez's cli handler, which kills the whole
+            # process group
+            if proc.is_alive():
+                os.kill(proc.pid, signal.SIGKILL)
+            proc.join()
+            conn.close()
+
+    def _solve_subtree(self, phase, conn):
+        # Solve a phase serially, without the rest of the stack, and send the
+        # outcome to `conn`. This is done in a speculative solve worker
+        # process, see _speculate.
+        #
+        self.phase_stack = [phase]
+        self.failed_phase_list = []
+        self.callback = None
+        self.num_workers = 0
+        self.solve_count = 0
+        self.speculative_fails_count = 0
+        self._speculative_workers = []  # siblings, not children
+        self._speculative_results = {}
+
+        try:
+            while self.status == SolverStatus.unsolved:
+                self.solve_step()
+            result = (self.phase_stack[-1].status, self.solve_count,
+                      self.num_fails)
+        except Exception:
+            # the serial solve raises the same error if it gets this far
+            result = (None, 0, 0)
+
+        conn.send(result)
+        conn.close()
+
+    def _learn_nogood(self, phase):
+        # phases pruned by an existing nogood have no conflict scopes of
+        # their own, so nothing new is learned from them
+        if not (self.optimised and phase.conflict_scopes):
+            return
+
+        nogood = _Nogood(phase.conflict_scopes, phase.failure_reason)
+        self.nogoods.append(nogood)
+
+        if self.pr:
+            self.pr("learned nogood: %s", nogood)
+
+    def _find_nogood(self, scopes):
+        if not self.nogoods:
+            return None
+
+        with self.timed(self.nogood_time):
+            scopes_ = dict((x.package_name, x) for x in scopes)
+
+            for nogood in self.nogoods:
+                if nogood.matches(scopes_):
+                    self.nogood_prunes_count += 1
+                    return nogood
+
+        return None
+
     def _push_phase(self, phase):
         depth = len(self.phase_stack)
         count = self.depth_counts.get(depth, -1) + 1
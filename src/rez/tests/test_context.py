@@ -23,6 +23,7 @@ from rez.bundle_context import bundle_context
 from rez.bind import hello_world
 from rez.utils.platform_ import platform_
 from rez.utils.filesystem import is_subdirectory
+from rez.utils.graph_utils import write_compacted
 import unittest
 import subprocess
 import platform
@@ -31,6 +32,18 @@ import os.path
 import os
 
 
+late_requires_package = """
+name = "late_requires"
+version = "1.0"
+
+@late()
+def requires():
+    if in_context() and ".hello" in request:
+        return ["hello_world"]
+    return []
+"""
+
+
 class TestContext(TestBase, TempdirMixin):
     @classmethod
     def setUpClass(cls):
@@ -40,6 +53,12 @@ class TestContext(TestBase, TempdirMixin):
         os.makedirs(cls.packages_path)
         hello_world.bind(cls.packages_path)
 
+        # requires hello_world, but only if the '.hello' ephemeral is requested
+        pkg_path = os.path.join(cls.packages_path, "late_requires", "1.0")
+        os.makedirs(pkg_path)
+        with open(os.path.join(pkg_path, "package.py"), 'w') as f:
+            f.write(late_requires_package)
+
         cls.settings = dict(
             packages_path=[cls.packages_path],
             package_filter=None,
@@ -59,6 +78,31 @@ class TestContext(TestBase, TempdirMixin):
         r = ResolvedContext(["hello_world"])
         r.print_info()
 
+    def test_resolve_many(self):
+        """Test resolving many contexts at once."""
+        requests = [
+            ["late_requires", ".hello-1"],
+            ["late_requires"],
+            ["hello_world"],
+            []
+        ]
+        expected = [
+            ["hello_world", "late_requires"],
+            ["late_requires"],
+            ["hello_world"],
+            []
+        ]
+
+        def _names(contexts):
+            return [sorted(x.name for x in r.resolved_packages)
+                    for r in contexts]
+
+        contexts = ResolvedContext.resolve_many(requests)
+        self.assertEqual(_names(contexts), expected)
+
+        contexts = ResolvedContext.resolve_many(requests, num_processes=2)
+        self.assertEqual(_names(contexts), expected)
+
     def test_apply(self):
         """Test apply() function."""
         # Isolate our changes to os.environ and sys.path and return to the
@@ -119,6 +163,29 @@ class TestContext(TestBase, TempdirMixin):
         env = r2.get_environ()
         self.assertEqual(env.get("OH_HAI_WORLD"), "hello")
 
+    def test_graph(self):
+        """Test that the resolve graph is built on demand."""
+        file = os.path.join(self.root, "test_graph.rxt")
+
+        for request in (["hello_world"], ["hello_world", "!hello_world"]):
+            r = ResolvedContext(request)
+            self.assertIsNone(r.graph_)
+            self.assertTrue(r.has_graph)
+            graph_str = write_compacted(r.graph())
+
+            # the graph itself is only saved if asked for
+            r.save(file)
+            r2 = ResolvedContext.load(file)
+            self.assertIsNone(r2.graph_string)
+            self.assertEqual(write_compacted(r2.graph()), graph_str)
+
+            self.update_settings({"rxt_include_graph": True})
+            r.save(file)
+            r2 = ResolvedContext.load(file)
+            self.assertIsNotNone(r2.graph_string)
+            self.assertEqual(write_compacted(r2.graph()), graph_str)
+            self.update_settings({})
+
     def test_retarget(self):
         """Test that a retargeted context behaves identically."""
 
@@ -0,0 +1,279 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+test memcached caching, using the local disk cache backend
+"""
+from rez.tests.util import TestBase, TempdirMixin
+from rez.utils.memcached import Client, DiskCacheBackend, memcached, \
+    memcached_client, DoNotCache, kind_stats, get_local_cache, _LocalCache
+from rez.resolved_context import ResolvedContext
+from rez.suite import Suite
+from rez.package_repository import package_repository_manager
+from rez.config import config
+from rez.vendor.six.six import StringIO
+import unittest
+import shutil
+import os.path
+
+
+class TestMemcached(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
+        cls.cache_uri = "file://" + os.path.join(cls.root, "cache")
+        cls.packages_path = os.path.join(cls.root, "packages")
+        shutil.copytree(cls.data_path("solver", "packages"), cls.packages_path)
+
+        cls.settings = dict(
+            packages_path=[cls.packages_path],
+            package_filter=None,
+            implicit_packages=[],
+            warn_untimestamped=False,
+            memcached_uri=[cls.cache_uri],
+            memcached_kind_stats=True,
+            resolve_caching=True,
+            cache_listdir=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def test_client(self):
+        """Test memcached client against the disk backend."""
+        client = Client([self.cache_uri])
+        self.assertTrue(isinstance(client.client, DiskCacheBackend))
+
+        self.assertIs(client.get("foo"), client.miss)
+        client.set("foo", [1, 2])
+        client.set("none", None)
+        self.assertEqual(client.get("foo"), [1, 2])
+        self.assertEqual(client.get("none"), None)
+
+        client.delete("none")
+        self.assertIs(client.get("none"), client.miss)
+
+        # soft flush only affects this client
+        client2 = Client([self.cache_uri])
+        client.flush()
+        self.assertIs(client.get("foo"), client.miss)
+        self.assertEqual(client2.get("foo"), [1, 2])
+
+        # hard flush deletes all entries
+        client2.flush(hard=True)
+        self.assertIs(Client([self.cache_uri]).get("foo"), client.miss)
+
+        self.assertEqual(client.test_servers(), set([self.cache_uri]))
+
+        # hits are served from the in-process cache
+        stats = dict(client.get_stats())[self.cache_uri]
+        self.assertEqual(stats["get_hits"], 0)
+        self.assertEqual(stats["get_misses"], 3)
+
+        # some entries are found in the in-process cache, some remotely
+        client.set("foo", 1)
+        client.set("bah", None)
+        client.set("eek", 2)
+        get_local_cache().clear()
+        self.assertEqual(client.get("foo"), 1)
+        self.assertEqual(client.get_multi(["foo", "bah", "eek", "meh"]),
+                         {"foo": 1, "bah": None, "eek": 2})
+
+    def test_local_cache(self):
+        """Test the in-process cache in front of the disk backend."""
+        client = Client([self.cache_uri])
+        kind_stats.flush()
+        client.reset_kind_stats()
+
+        client.set(str(("listdir", "/a")), ["foo"])
+        value = client.get(str(("listdir", "/a")))
+        self.assertEqual(value, ["foo"])
+
+        # each hit gets its own copy of the value
+        value.append("bah")
+        self.assertEqual(client.get(str(("listdir", "/a"))), ["foo"])
+
+        # a new client still hits, via the remote cache
+        client2 = Client([self.cache_uri])
+        client2.client.cache.clear()
+        self.assertIs(client2.get(str(("listdir", "/b"))), client2.miss)
+        self.assertEqual(client2.get(str(("listdir", "/a"))), ["foo"])
+
+        self.assertIs(client.get(str(("resolve", "c"))), client.miss)
+
+        kind_stats.flush()
+        stats = client.get_kind_stats()
+        self.assertEqual(stats["listdir"],
+                         {"local_hits": 3, "hits": 0, "misses": 1})
+        self.assertEqual(stats["resolve"],
+                         {"local_hits": 0, "hits": 0, "misses": 1})
+
+        client.reset_kind_stats()
+        self.assertEqual(client.get_kind_stats(), {})
+
+    def test_kind_stats_disabled(self):
+        """Test that hits and misses are not counted unless enabled."""
+        self.update_settings({"memcached_kind_stats": False})
+        kind_stats.flush()
+
+        client = Client([self.cache_uri])
+        client.get(str(("listdir", "/a")))
+        self.assertEqual(dict(kind_stats.counts), {})
+
+    def test_local_cache_size(self):
+        """Test that the in-process cache is bounded by size."""
+        cache = _LocalCache(max_size=100)
+        cache.set("a", b"x" * 40)
+        cache.set("b", b"x" * 40)
+        cache.get("a")  # 'b' is now least recently used
+        cache.set("c", b"x" * 40)
+        cache.set("d", b"x" * 200)  # too big to cache
+
+        self.assertEqual(cache.get("a"), b"x" * 40)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("c"), b"x" * 40)
+        self.assertEqual(cache.get("d"), None)
+        self.assertEqual(cache.size, 80)
+
+    def test_decorator(self):
+        """Test memcached decorator against the disk backend."""
+        calls = []
+
+        @memcached(servers=[self.cache_uri])
+        def _double(x):
+            calls.append(x)
+            if x < 0:
+                return DoNotCache(None)
+            return x * 2
+
+        self.assertEqual(_double(3), 6)
+        self.assertEqual(_double(3), 6)
+        self.assertEqual(calls, [3])
+
+        self.assertEqual(_double(-1), None)
+        self.assertEqual(_double(-1), None)
+        self.assertEqual(calls, [3, -1, -1])
+
+        # forgetting only affects memoized calls within one client scope
+        with memcached_client([self.cache_uri]):
+            _double.forget()
+            self.assertEqual(_double(3), 6)
+        self.assertEqual(calls, [3, -1, -1, 3])
+
+    def test_resolve_caching(self):
+        """Test resolve caching against the disk backend."""
+        r = ResolvedContext(["pyfoo"])
+        self.assertFalse(r.from_cache)
+
+        r2 = ResolvedContext(["pyfoo"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # a newly released package invalidates the cached resolve
+        repo = package_repository_manager.get_repository(self.packages_path)
+        fam_path = os.path.join(self.packages_path, "python")
+        os.utime(fam_path, None)
+        repo.clear_caches()
+
+        r3 = ResolvedContext(["pyfoo"])
+        self.assertFalse(r3.from_cache)
+
+    def test_resolve_caching_threaded(self):
+        """Test resolve cache validation using threads."""
+        self.update_settings({"resolve_caching_threads": 4})
+
+        r = ResolvedContext(["pyodd"])
+        r2 = ResolvedContext(["pyodd"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # a changed package file invalidates the cached resolve
+        variant = r.get_resolved_package("pybah")
+        os.utime(variant.parent.uri, (0, 0))
+        package_repository_manager.clear_caches()
+
+        r3 = ResolvedContext(["pyodd"])
+        self.assertFalse(r3.from_cache)
+
+    def test_local_resolve_cache(self):
+        """Test resolve caching to local disk, without memcached."""
+        self.update_settings({
+            "memcached_uri": [],
+            "resolve_cache_path": os.path.join(self.root, "resolves")
+        })
+
+        r = ResolvedContext(["pyodd"])
+        self.assertFalse(r.from_cache)
+
+        buf = StringIO()
+        r2 = ResolvedContext(["pyodd"], buf=buf, print_stats=True)
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+        self.assertIn("'resolve_cache': 'local'", buf.getvalue())
+
+        # a changed package file invalidates the cached resolve
+        variant = r.get_resolved_package("pyodd")
+        os.utime(variant.parent.uri, (0, 0))
+        package_repository_manager.clear_caches()
+
+        r3 = ResolvedContext(["pyodd"])
+        self.assertFalse(r3.from_cache)
+
+        r4 = ResolvedContext(["pyodd"], caching=False)
+        self.assertFalse(r4.from_cache)
+
+    def test_warm_resolves(self):
+        """Test warming of the resolve cache from requests and suites."""
+        from rez.cli.memcache import _get_warm_resolve_sources, _warm_resolve
+
+        suite = Suite()
+        suite.add_context("nopy", ResolvedContext(["nopy"], caching=False))
+        suite_path = os.path.join(self.root, "suite")
+        suite.save(suite_path)
+
+        sources = _get_warm_resolve_sources(["pysplit python-2.5", suite_path])
+        self.assertEqual(sources, ["pysplit python-2.5",
+                                   suite._context_path("nopy", suite_path)])
+
+        statuses = [_warm_resolve(x)[1] for x in sources]
+        self.assertEqual(statuses, ["warmed", "warmed"])
+
+        statuses = [_warm_resolve(x)[1] for x in sources]
+        self.assertEqual(statuses, ["fresh", "fresh"])
+
+    def test_listdir_caching(self):
+        """Test directory listing caching against the disk backend."""
+        repo = package_repository_manager.get_repository(self.packages_path)
+        self.assertEqual(config.memcached_uri, [self.cache_uri])
+
+        with memcached_client([self.cache_uri]) as client:
+            kind_stats.flush()
+            client.reset_kind_stats()
+            names = sorted(x.name for x in repo.iter_package_families())
+
+            # a new repository instance reads the listing from the cache
+            repo2 = repo._copy()
+            names2 = sorted(x.name for x in repo2.iter_package_families())
+
+            kind_stats.flush()
+            stats = client.get_kind_stats()["listdir"]
+
+        self.assertEqual(names, names2)
+        self.assertGreater(stats["local_hits"] + stats["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+test package filters
+"""
+from rez.package_filter import PackageFilter, PackageFilterList, Rule, \
+    GlobRule, RegexRule, _CompiledRules
+from rez.packages import iter_package_families
+from rez.tests.util import TestBase
+import unittest
+
+
+class TestPackageFilter(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        packages_path = cls.data_path("solver", "packages")
+        cls.settings = dict(packages_path=[packages_path])
+
+        cls.packages = []
+        for family in iter_package_families(paths=[packages_path]):
+            cls.packages.extend(family.iter_packages())
+
+    def _excludes(self, package_filter, package):
+        # reference implementation - test each rule in turn
+        def _match(rules_dict, family):
+            for rule in rules_dict.get(family) or []:
+                if rule.match(package):
+                    return rule
+            return None
+
+        excl = _match(package_filter._excludes, package.name) \
+            or _match(package_filter._excludes, None)
+
+        if excl and (_match(package_filter._includes, package.name)
+                     or _match(package_filter._includes, None)):
+            return None
+        return excl
+
+    def _create_filter(self, excludes, includes=None):
+        return PackageFilter.from_pod(dict(
+            excludes=excludes, includes=(includes or [])))
+
+    def test_compiled_rules(self):
+        """Test that glob and regex rules are merged."""
+        rules = [GlobRule("py*"), RegexRule(".*-1\\.0$"), GlobRule("nada*")]
+        compiled = _CompiledRules(rules)
+        self.assertEqual(compiled.regex_rules, rules)
+
+        # rules with groups or global flags are matched separately
+        rules = [GlobRule("py*"), RegexRule("(py)son.*"), RegexRule("(?i)PY.*"),
+                 GlobRule("nada*")]
+        compiled = _CompiledRules(rules)
+        self.assertEqual(compiled.regex_rules, [rules[0], rules[3]])
+
+    def test_many_rules(self):
+        """Test that rules are merged into several regexes, if there are many."""
+        rules = [GlobRule("nada%d*" % i) for i in range(250)]
+        rules.insert(120, GlobRule("pyfoo-3.1*"))
+        rules.append(GlobRule("py*"))
+
+        compiled = _CompiledRules(rules)
+        self.assertEqual(len(compiled.regexes), 3)
+        self.assertEqual(compiled.regex_rules, rules)
+
+        package_filter = self._create_filter([str(x) for x in rules])
+        for package in self.packages:
+            expected = self._excludes(package_filter, package)
+            self.assertIs(package_filter.excludes(package), expected)
+
+    def test_excludes(self):
+        """Test that the compiled filter excludes as rule by rule matching."""
+        filters = [
+            self._create_filter(["py*"]),
+            self._create_filter(["py*", "*-1.0", "regex(.*son.*)"]),
+            self._create_filter(["range(pyfoo<3)", "pyfoo-3*", "glob(*-5*)"]),
+            self._create_filter(["regex((py)bah.*)", "regex((?i)PYMUM.*)",
+                                 "*-2*", "nada-*"]),
+            self._create_filter(["*"], includes=["pyfoo", "glob(*-3*)"]),
+            self._create_filter(["py*", "range(python<2.6)"],
+                                includes=["regex(.*-2\\.6.*)"]),
+            self._create_filter(["range(~pyfoo)", "range(~python<2.6)"])
+        ]
+
+        for package_filter in filters:
+            for package in self.packages:
+                expected = self._excludes(package_filter, package)
+                self.assertIs(package_filter.excludes(package), expected)
+
+                # again, memoized
+                self.assertIs(package_filter.excludes(package), expected)
+
+        # a weak requirement without a range conflicts with nothing
+        rule = Rule.parse_rule("range(~pyfoo)")
+        self.assertTrue(all(rule.match(x) for x in self.packages))
+
+    def test_rule_added(self):
+        """Test that adding a rule resets remembered verdicts."""
+        package_filter = self._create_filter(["pyfoo-3*"])
+        package = [x for x in self.packages if x.name == "python"][0]
+        self.assertIsNone(package_filter.excludes(package))
+
+        rule = Rule.parse_rule("python")
+        package_filter.add_exclusion(rule)
+        self.assertIs(package_filter.excludes(package), rule)
+
+        package_filter.add_inclusion(Rule.parse_rule("glob(python-*)"))
+        self.assertIsNone(package_filter.excludes(package))
+
+    def test_filter_list(self):
+        """Test that a filter list excludes as its filters do."""
+        flist = PackageFilterList.from_pod([
+            dict(excludes=["pyfoo*"]),
+            dict(excludes=["regex(.*-5.*)"], includes=["pyfoo"])
+        ])
+
+        for package in self.packages:
+            expected = None
+            for package_filter in flist.filters:
+                expected = self._excludes(package_filter, package)
+                if expected:
+                    break
+
+            self.assertIs(flist.excludes(package), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
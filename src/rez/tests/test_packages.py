@@ -22,6 +22,7 @@ from rez.packages import iter_package_families, iter_packages, get_package, \
 from rez.package_py_utils import expand_requirement
 from rez.package_resources import package_release_keys
 from rez.package_move import move_package
+from rez.package_copy import copy_package
 from rez.package_remove import remove_package, remove_packages_ignored_since
 from rez.package_repository import package_repository_manager
 from rez.tests.util import TestBase, TempdirMixin
@@ -31,6 +32,7 @@ import unittest
 from rez.vendor.version.version import Version
 from rez.vendor.version.util import VersionError
 from rez.utils.filesystem import canonical_path
+from rez.serialise import load_from_file, get_disk_cache, FileFormat
 import shutil
 import os.path
 import os
@@ -55,6 +57,10 @@ ALL_PACKAGES = set([
     'test_variant_split_mid2-1.0', 'test_variant_split_mid2-2.0',
     'test_variant_split_end-1.0', 'test_variant_split_end-2.0',
     'test_variant_split_end-3.0', 'test_variant_split_end-4.0',
+    'test_nogood_a-1.0', 'test_nogood_a-2.0',
+    'test_nogood_b-1.0',
+    'test_nogood_c-1.0', 'test_nogood_c-2.0',
+    'test_nogood_d-1.0',
     # packages from data/packages/py_packages and .../yaml_packages
     'unversioned',
     'unversioned_py',
@@ -346,6 +352,26 @@ class TestPackages(TestBase, TempdirMixin):
             self.assertEqual(variant.index, i)
             self.assertEqual(variant.parent, package)
 
+    def test_variant_requires(self):
+        """test variant requirements are parsed once per variant."""
+        package = get_package("variants_py", "2.0")
+        variant = next(package.iter_variants())
+
+        expected = (PackageRequest("python-2.7"),
+                    PackageRequest("platform-linux"))
+        self.assertEqual(variant.requires, expected)
+        self.assertEqual(variant.get_requires(build_requires=True), expected)
+
+        # requirements are shared by variants of the same resource
+        package2 = get_package("variants_py", "2.0")
+        variant2 = next(package2.iter_variants())
+        self.assertIsNot(variant2, variant)
+        self.assertIs(variant2.requires, variant.requires)
+        self.assertIs(variant2.get_requirement_list(),
+                      variant.get_requirement_list())
+        self.assertEqual(variant.get_requirement_list().requirements,
+                         list(expected))
+
     def test_variant_install(self):
         """test variant installation."""
         repo_path = os.path.join(self.root, "packages")
@@ -580,6 +606,167 @@ class TestPackages(TestBase, TempdirMixin):
         i = repo.unignore_package(pkg_name, pkg_version)
         self.assertEqual(i, -1)
 
+    def test_package_index(self):
+        """Test the filesystem repository index."""
+        self.update_settings({
+            "plugins": {"package_repository": {"filesystem": {"use_index": True}}}
+        })
+
+        # copy packages to a temp repo
+        repo_path = os.path.join(self.root, "tmp6_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+
+        repo = package_repository_manager.get_repository(repo_path)
+        self.assertEqual(repo.index, None)
+
+        # index the repo, and check it matches the repo contents
+        repo.update_index()
+        index = repo.index
+        self.assertNotEqual(index, None)
+        self.assertTrue(os.path.isfile(os.path.join(repo_path, ".rez_index", "index")))
+
+        fam_path = os.path.join(repo_path, "pydad")
+        versions = repo._list_version_dirs(fam_path)
+        self.assertEqual(sorted(repo._list_family_dirs()),
+                         sorted(repo._get_family_dirs()))
+        self.assertEqual(sorted(versions), sorted(repo._get_version_dirs(fam_path)))
+
+        pkg = get_package_from_repository("pydad", Version("2"), repo_path)
+        self.assertEqual(pkg.requires, [PackageRequest("pyson-2")])
+
+        # a package definition file that has changed is not read from the index
+        key = (pkg.resource.filepath, pkg.resource.state_handle)
+        self.assertNotEqual(index.get_package_data("pydad", "2", key), None)
+        key = (pkg.resource.filepath, pkg.resource.state_handle + 1)
+        self.assertEqual(index.get_package_data("pydad", "2", key), None)
+
+        # removing a package updates the index
+        was_removed = remove_package("pydad", Version("2"), repo_path)
+        self.assertTrue(was_removed)
+
+        index = repo.index
+        key = repo._version_dirs_key(fam_path)
+        self.assertEqual(sorted(index.get_version_dirs("pydad", key)),
+                         sorted(set(versions) - set(["2"])))
+        self.assertEqual(get_package_from_repository("pydad", Version("2"), repo_path), None)
+
+        # a change made without updating the index invalidates its entries
+        os.mkdir(os.path.join(fam_path, "4"))
+        key = repo._version_dirs_key(fam_path)
+        self.assertEqual(index.get_version_dirs("pydad", key), None)
+
+    def test_package_timestamps(self):
+        """Test the release times stored in filesystem package families."""
+        repo_path = os.path.join(self.root, "tmp9_packages")
+        fam_path = os.path.join(repo_path, "pydad")
+
+        # install packages into a temp repo
+        for pkg in iter_packages("pydad", paths=[self.solver_packages_path]):
+            timestamp = 1000 + int(str(pkg.version))
+            copy_package(pkg, repo_path, overrides={"timestamp": timestamp})
+
+        self.assertTrue(os.path.isfile(os.path.join(fam_path, ".rez_timestamps")))
+
+        # release times are read without loading the packages
+        repo = package_repository_manager.get_repository(repo_path)
+        repo.clear_caches()
+
+        for pkg in iter_packages("pydad", paths=[repo_path]):
+            self.assertEqual(pkg.timestamp, 1000 + int(str(pkg.version)))
+            self.assertNotIn("_data", pkg.resource.__dict__)
+
+        # a package definition file that has changed is loaded instead
+        pkg = get_package_from_repository("pydad", Version("2"), repo_path)
+        st = os.stat(pkg.resource.filepath)
+        os.utime(pkg.resource.filepath, (st.st_atime, st.st_mtime + 10))
+        repo.clear_caches()
+
+        pkg = get_package_from_repository("pydad", Version("2"), repo_path)
+        self.assertEqual(repo.get_package_timestamp(pkg.resource), None)
+        self.assertEqual(pkg.timestamp, 1002)
+
+        # updating release times is not a release
+        release_time = os.path.getmtime(fam_path)
+        repo.update_timestamps()
+        self.assertEqual(repo.get_package_timestamp(pkg.resource), 1002)
+        self.assertEqual(os.path.getmtime(fam_path), release_time)
+
+        # removing a package discards its release time
+        was_removed = remove_package("pydad", Version("3"), repo_path)
+        self.assertTrue(was_removed)
+        self.assertEqual(sorted(repo.get_timestamps("pydad").timestamps),
+                         ["1", "2"])
+
+    def test_package_prefetch(self):
+        """Test concurrent scanning of filesystem package families."""
+        self.update_settings({
+            "plugins": {"package_repository": {"filesystem": {"scan_threads": 4}}}
+        })
+
+        # copy packages to a temp repo, and ignore one
+        repo_path = os.path.join(self.root, "tmp7_packages")
+        shutil.copytree(self.solver_packages_path, repo_path)
+
+        repo = package_repository_manager.get_repository(repo_path)
+        repo.ignore_package("pydad", Version("2"))
+
+        expected = {}
+        for fam in iter_package_families(paths=[repo_path]):
+            expected[fam.name] = _to_qnames(fam.iter_packages())
+        self.assertNotIn("pydad-2", expected["pydad"])
+
+        repo.clear_caches()
+        fams = list(iter_package_families(paths=[repo_path], prefetch=True))
+        self.assertTrue(repo._prefetched_version_dirs)
+
+        for fam in fams:
+            self.assertEqual(_to_qnames(fam.iter_packages()), expected[fam.name])
+        self.assertEqual(repo._prefetched_version_dirs, {})
+
+        # a listing that changed after it was prefetched is not used
+        repo.clear_caches()
+        fams = list(iter_package_families(paths=[repo_path], prefetch=True))
+
+        pkg_path = os.path.join(repo_path, "nopy", "3.0")
+        os.mkdir(pkg_path)
+        with open(os.path.join(pkg_path, "package.py"), 'w') as f:
+            f.write("name = 'nopy'\nversion = '3.0'\n")
+
+        # make sure the mtime changes, however coarse its resolution
+        family_path = os.path.dirname(pkg_path)
+        st = os.stat(family_path)
+        os.utime(family_path, (st.st_atime, st.st_mtime + 10))
+
+        fam = [x for x in fams if x.name == "nopy"][0]
+        self.assertEqual(_to_qnames(fam.iter_packages()),
+                         expected["nopy"] | set(["nopy-3.0"]))
+
+    def test_package_file_disk_cache(self):
+        """Test the local disk cache of loaded package definition files."""
+        self.update_settings({
+            "package_file_cache_path": os.path.join(self.root, "file_cache")
+        })
+
+        # copy a package so that we can modify it
+        pkg_path = os.path.join(self.root, "tmp8_packages", "versioned", "3.0")
+        shutil.copytree(os.path.join(self.py_packages_path, "versioned", "3.0"),
+                        pkg_path)
+        filepath = os.path.join(pkg_path, "package.py")
+
+        cache = get_disk_cache()
+        data = load_from_file(filepath, FileFormat.py)
+        self.assertEqual(cache.get_stats()["misses"], 1)
+
+        data_ = load_from_file(filepath, FileFormat.py)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+        self.assertEqual(data_, data)
+
+        # a changed file is not read from the cache
+        st = os.stat(filepath)
+        os.utime(filepath, (st.st_atime, st.st_mtime + 10))
+        load_from_file(filepath, FileFormat.py)
+        self.assertEqual(cache.get_stats()["misses"], 2)
+
 
 class TestMemoryPackages(TestBase):
     def test_1_memory_variant_parent(self):
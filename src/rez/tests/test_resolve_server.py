@@ -0,0 +1,205 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+test the resolve server
+"""
+from rez.tests.util import TestBase, TempdirMixin
+from rez.resolve_server import ResolveServer, ResolveServerError, \
+    send_request, get_config_key
+from rez.resolved_context import ResolvedContext
+from rez.package_repository import package_repository_manager
+from rez.config import config
+from rez.rex import OutputStyle
+import unittest
+import threading
+import socket
+import shutil
+import os.path
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires unix sockets")
+class TestResolveServer(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
+        cls.socket_path = os.path.join(cls.root, "resolve.sock")
+        cls.packages_path = os.path.join(cls.root, "packages")
+        shutil.copytree(cls.data_path("solver", "packages"), cls.packages_path)
+
+        cls.settings = dict(
+            packages_path=[cls.packages_path],
+            package_filter=None,
+            implicit_packages=[],
+            warn_untimestamped=False,
+            resolve_caching=False,
+            resolve_server_socket=cls.socket_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def setUp(self):
+        super(TestResolveServer, self).setUp()
+
+        # the server is run in a thread rather than with `serve_forever`, so
+        # that this process still acts as a client
+        self.server = ResolveServer(self.socket_path)
+        self.server._bind()
+        self.stopping = False
+        self.thread = threading.Thread(target=self._serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        # wake the server thread up so that it sees it is stopping
+        self.stopping = True
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        sock.close()
+        self.thread.join()
+        self.server.close()
+        super(TestResolveServer, self).tearDown()
+
+    def _serve(self):
+        sock = self.server._socket
+        while True:
+            conn, _ = sock.accept()
+            if self.stopping:
+                conn.close()
+                return
+            try:
+                self.server._handle_connection(conn)
+            finally:
+                conn.close()
+
+    def test_resolve(self):
+        """Test that resolves are done by the server."""
+        r = ResolvedContext(["pyfoo", "nopy"])
+        self.assertEqual(self.server.num_requests, 1)
+        self.assertTrue(r.success)
+
+        r2 = ResolvedContext(["pyfoo", "nopy"], verbosity=1)
+        self.assertEqual(self.server.num_requests, 1)
+        self.assertEqual(r.resolved_packages, r2.resolved_packages)
+        self.assertEqual(sorted(r.graph().nodes()), sorted(r2.graph().nodes()))
+
+        r3 = ResolvedContext(["pyfoo", "!python"])
+        self.assertEqual(self.server.num_requests, 2)
+        self.assertFalse(r3.success)
+
+    def test_get_shell_code(self):
+        """Test that shell code is generated by the server."""
+        r = ResolvedContext(["nopy"])
+        code = r.get_shell_code(shell="bash", parent_environ={})
+        self.assertEqual(self.server.num_requests, 2)
+
+        code2 = r._get_shell_code(shell="bash", parent_environ={},
+                                  style=OutputStyle.file)
+        self.assertEqual(code, code2)
+
+    def test_config_mismatch(self):
+        """Test that a differently configured client resolves in-process."""
+        request = {"action": "ping", "config_key": get_config_key()}
+        response = self.server.handle_request(request)
+        self.assertEqual(response["result"]["num_requests"], 0)
+
+        self.update_settings({"resolve_caching_threads": 2})
+        self.assertRaises(ResolveServerError, send_request,
+                          self.socket_path, "ping")
+
+        r = ResolvedContext(["nopy"])
+        self.assertTrue(r.success)
+        self.assertEqual(self.server.num_requests, 2)
+
+    def test_stale_repository(self):
+        """Test that the server sees newly released packages."""
+        r = ResolvedContext(["nopy"])
+        self.assertEqual(str(r.get_resolved_package("nopy").version), "2.1")
+
+        repo = package_repository_manager.get_repository(self.packages_path)
+        self.assertFalse(repo.is_stale())
+
+        src_path = os.path.join(self.packages_path, "nopy", "2.1")
+        dest_path = os.path.join(self.packages_path, "nopy", "3.0")
+        shutil.copytree(src_path, dest_path)
+        package_file = os.path.join(dest_path, "package.py")
+        with open(package_file) as f:
+            content = f.read().replace("2.1", "3.0")
+        with open(package_file, 'w') as f:
+            f.write(content)
+
+        self.assertTrue(repo.is_stale())
+
+        r2 = ResolvedContext(["nopy"])
+        self.assertEqual(self.server.num_requests, 2)
+        self.assertEqual(str(r2.get_resolved_package("nopy").version), "3.0")
+
+        shutil.rmtree(dest_path)
+
+    def test_edited_package(self):
+        """Test that the server sees a package definition file edited in place."""
+        r = ResolvedContext(["nopy"])
+        variant = r.get_resolved_package("nopy")
+        self.assertEqual(variant.description, None)
+
+        repo = package_repository_manager.get_repository(self.packages_path)
+        self.assertFalse(repo.is_stale())
+
+        package_file = os.path.join(self.packages_path, "nopy", "2.1",
+                                    "package.py")
+        with open(package_file) as f:
+            content = f.read()
+
+        try:
+            with open(package_file, 'w') as f:
+                f.write(content + "\ndescription = 'edited'\n")
+
+            # make sure the mtime changes, however coarse its resolution
+            st = os.stat(package_file)
+            os.utime(package_file, (st.st_atime, st.st_mtime + 10))
+
+            self.assertTrue(repo.is_stale())
+
+            r2 = ResolvedContext(["nopy"])
+            self.assertEqual(self.server.num_requests, 2)
+            variant = r2.get_resolved_package("nopy")
+            self.assertEqual(variant.description, "edited")
+        finally:
+            with open(package_file, 'w') as f:
+                f.write(content)
+
+    def test_timeout(self):
+        """Test that a client resolves in-process if the server is busy."""
+        # a socket that is listened on, but never served
+        busy_path = os.path.join(self.root, "busy.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(busy_path)
+        sock.listen(1)
+
+        try:
+            self.update_settings({"resolve_server_socket": busy_path,
+                                  "resolve_server_timeout": 0.5})
+            r = ResolvedContext(["nopy"])
+            self.assertTrue(r.success)
+        finally:
+            sock.close()
+            os.remove(busy_path)
+
+        self.assertEqual(self.server.num_requests, 0)
+
+if __name__ == '__main__':
+    unittest.main()
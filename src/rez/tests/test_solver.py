@@ -19,25 +19,39 @@ test dependency resolving algorithm
 from __future__ import print_function
 
 from rez.vendor.version.requirement import Requirement
-from rez.solver import Solver, Cycle, SolverStatus
+from rez.vendor.version.version import Version, VersionRange
+from rez.solver import Solver, Cycle, SolverStatus, SolverSession, \
+    ScopeSplitMode, _ResolvePhase, _VersionIndex, _TestMemo, _conflict_memo, \
+    _containment_memo
 from rez.config import config
+from rez import module_root_path
 import unittest
-from rez.tests.util import TestBase
+from rez.tests.util import TestBase, TempdirMixin
 import itertools
+import os
+import random
+import tarfile
+import json
 
 
 solver_verbosity = 1
 
 
-class TestSolver(TestBase):
+class TestSolver(TestBase, TempdirMixin):
     @classmethod
     def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
         packages_path = cls.data_path("solver", "packages")
         cls.packages_path = [packages_path]
         cls.settings = dict(
             packages_path=cls.packages_path,
             package_filter=None)
 
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
     def _create_solvers(self, reqs):
         s1 = Solver(reqs,
                     self.packages_path,
@@ -95,6 +109,24 @@ class TestSolver(TestBase):
 
         return s1
 
+    def _get_benchmark(self):
+        """Get the benchmark requests, and the packages path they solve
+        against."""
+        packages_path = os.path.join(self.root, "packages")
+
+        if not os.path.exists(packages_path):
+            filepath = os.path.join(module_root_path, "data", "benchmarking",
+                                    "packages.tar.gz")
+            with tarfile.open(filepath) as tar:
+                tar.extractall(self.root)
+
+        filepath = os.path.join(module_root_path, "data", "benchmarking",
+                                "requests.json")
+        with open(filepath) as f:
+            requests = json.load(f)
+
+        return requests, [packages_path]
+
     def _fail(self, *packages):
         print()
         reqs = [Requirement(x) for x in packages]
@@ -259,6 +291,302 @@ class TestSolver(TestBase):
                      "test_variant_split_mid2-2.0[0]",
                      "test_variant_split_start-1.0[1]"])
 
+    def test_12_nogood_pruning(self):
+        """A conflict learned in one phase prunes a later phase."""
+        s = self._solve(["test_nogood_a", "test_nogood_b", "test_nogood_c"],
+                        ["test_nogood_a-1.0[]",
+                         "test_nogood_d-1.0[]",
+                         "test_nogood_b-1.0[]",
+                         "test_nogood_c-1.0[]"])
+
+        stats = s.solve_stats["nogoods"]
+        self.assertEqual(stats["num_nogoods"], 1)
+        self.assertEqual(stats["num_nogood_prunes"], 1)
+
+    def test_13_version_index(self):
+        """Bisect-based version intersection matches a linear scan."""
+        rand = random.Random(42)
+
+        def random_version():
+            return '.'.join(str(rand.randint(0, 3))
+                            for _ in range(rand.randint(1, 3)))
+
+        def random_range():
+            parts = []
+            for _ in range(rand.randint(1, 3)):
+                a, b = sorted([Version(random_version()),
+                               Version(random_version())])
+                forms = [str(a), "==%s" % a, "%s+" % a, ">%s" % a,
+                         "<%s" % b, "<=%s" % b]
+                if a < b:
+                    forms += ["%s+<%s" % (a, b), "%s..%s" % (a, b)]
+                parts.append(rand.choice(forms))
+            return VersionRange('|'.join(parts))
+
+        for _ in range(200):
+            versions = [Version(random_version())
+                        for _ in range(rand.randint(1, 30))]
+            index = _VersionIndex(versions)
+
+            for _ in range(20):
+                range_ = random_range()
+                expected = [i for i, v in enumerate(versions) if v in range_]
+                self.assertEqual(index.get_intersection(range_), expected,
+                                 "mismatch for range %r" % str(range_))
+
+        index = _VersionIndex(versions)
+        self.assertEqual(index.get_intersection(VersionRange()),
+                         list(range(len(versions))))
+
+    def test_14_solver_session(self):
+        """Solves that share a session match independent solves."""
+        session = SolverSession()
+        requests = [
+            ["pyfoo"],
+            ["pybah", "!python-2.5"],
+            ["python", "pyodd"],
+            ["pyvariants", "python", "nada"],
+            ["bahish", "pybah<5"],
+            ["test_variant_split_start"],
+            ["test_nogood_a", "test_nogood_b", "test_nogood_c"]
+        ]
+
+        def _result(s):
+            s.solve()
+            if s.status == SolverStatus.solved:
+                return [str(x) for x in s.resolved_packages]
+            return str(s.failure_reason())
+
+        for packages in requests * 2:
+            reqs = [Requirement(x) for x in packages]
+            s1 = Solver(reqs, self.packages_path)
+            s2 = Solver(reqs, self.packages_path, session=session)
+            self.assertEqual(_result(s2), _result(s1))
+
+        # solves with different package paths don't share variants
+        self.assertEqual(len(session.variant_lists), 1)
+        variant_lists = session.get_variant_lists(s2)
+        self.assertIn("python", variant_lists)
+
+        s3 = Solver([Requirement("pyfoo")], self.packages_path * 2,
+                    session=session)
+        s3.solve()
+        self.assertEqual(len(session.variant_lists), 2)
+
+        session.clear()
+        self.assertEqual(session.variant_lists, {})
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires fork")
+    def test_15_parallel_solve(self):
+        """Parallel solves get the same results as serial solves.
+
+        Solve and fail counts are not compared. Nogoods learned in worker
+        processes are discarded, so these can differ from a serial solve's.
+        """
+        def _compare(requests, packages_path):
+            num_skips = 0
+            session = SolverSession()
+
+            for packages in requests:
+                reqs = [Requirement(x) for x in packages]
+                results = []
+
+                for num_workers in (0, 2):
+                    s = Solver(reqs, packages_path, session=session,
+                               num_workers=num_workers)
+                    s.solve()
+
+                    if s.status == SolverStatus.solved:
+                        result = [str(x) for x in s.resolved_packages]
+                    else:
+                        result = str(s.failure_reason())
+
+                    results.append(result)
+
+                self.assertEqual(results[1], results[0],
+                                 "mismatch for request %r" % packages)
+                num_skips += s.solve_stats["speculations"]["num_speculative_skips"]
+
+            return num_skips
+
+        interval = Solver.speculation_interval
+        Solver.speculation_interval = 1
+
+        try:
+            # a failed subtree is skipped
+            num_skips = _compare([["python", "pyodd"]], self.packages_path)
+            self.assertEqual(num_skips, 1)
+
+            _compare([["pybah", "!python-2.5"],
+                      ["bahish", "pybah<5"],
+                      ["pymum-1"],
+                      ["test_variant_split_start"],
+                      ["test_nogood_a", "test_nogood_b", "test_nogood_c"]],
+                     self.packages_path)
+
+            # a sample of the benchmark requests
+            requests, packages_path = self._get_benchmark()
+            Solver.speculation_interval = 5
+            _compare(requests[::40], packages_path)
+        finally:
+            Solver.speculation_interval = interval
+
+    def test_16_variant_slice_copies(self):
+        """Variant slice copies share the tests that didn't affect them."""
+        s = Solver([], self.packages_path)
+        slice_ = s._get_variant_slice("pybah", VersionRange())
+
+        slice2, reductions = slice_.reduce_by(Requirement("python-2"))
+        self.assertIs(slice2, slice_)
+        self.assertEqual(reductions, [])
+
+        # both halves of a split share the tests of the slice they came from
+        first, next_ = slice_.split()
+        self.assertEqual(len(first) + len(next_), 2)
+        self.assertIs(first.been_reduced_by, slice_.been_reduced_by)
+        self.assertIs(next_.been_reduced_by, slice_.been_reduced_by)
+
+        # tests added to the original apply to its copies...
+        slice_.reduce_by(Requirement("python"))
+        self.assertIn(Requirement("python"), first.been_reduced_by)
+
+        # ...but not the other way around
+        first.reduce_by(Requirement("python-2.5+"))
+        self.assertIn(Requirement("python-2.5+"), first.been_reduced_by)
+        self.assertNotIn(Requirement("python-2.5+"), slice_.been_reduced_by)
+        self.assertNotIn(Requirement("python-2.5+"), next_.been_reduced_by)
+
+        slice2, reductions = slice_.reduce_by(Requirement("python-2.6"))
+        self.assertEqual(len(slice2), 1)
+        self.assertEqual(len(reductions), 1)
+        self.assertNotIn(Requirement("python-2.6"), slice_.been_reduced_by)
+
+    def test_17_test_memo(self):
+        """Conflict and range tests are remembered across solves."""
+        _conflict_memo.clear()
+        _containment_memo.clear()
+
+        def _solve(packages):
+            s = Solver([Requirement(x) for x in packages], self.packages_path,
+                       optimised=True, verbosity=False)
+            s.solve()
+            return s
+
+        packages = ["pyvariants", "python-2"]
+        s = _solve(packages)
+        self.assertEqual(s.status, SolverStatus.solved)
+        self.assertGreater(len(_conflict_memo.results), 0)
+        self.assertGreater(len(_containment_memo.results), 0)
+
+        s2 = _solve(packages)
+        self.assertEqual(s2.resolved_packages, s.resolved_packages)
+        stats = s2.solve_stats
+        self.assertGreater(stats["reductions"]["num_reduction_memo_hits"], 0)
+        self.assertGreater(stats["intersections"]["num_intersection_memo_hits"], 0)
+
+        # a full table is cleared, and solves are unaffected
+        max_size = _TestMemo.max_size
+        _TestMemo.max_size = 2
+        _conflict_memo.clear()
+        _containment_memo.clear()
+        try:
+            s3 = _solve(packages)
+            self.assertLessEqual(len(_conflict_memo.results), 2)
+            self.assertLessEqual(len(_containment_memo.results), 2)
+        finally:
+            _TestMemo.max_size = max_size
+
+        self.assertEqual(s3.resolved_packages, s.resolved_packages)
+
+    def test_18_split_modes(self):
+        """Every scope split mode finds a valid resolve."""
+        requests = [["pyvariants", "python"],
+                    ["pybah", "!python-2.5"],
+                    ["bahish", "pybah<5"],
+                    ["pymum-1"],
+                    ["pyodd", "python"],
+                    ["test_variant_split_start"],
+                    ["test_nogood_a", "test_nogood_b", "test_nogood_c"]]
+
+        for packages in requests:
+            reqs = [Requirement(x) for x in packages]
+            statuses = []
+
+            for mode in ScopeSplitMode:
+                s = Solver(reqs, self.packages_path, split_mode=mode)
+                s.solve()
+                statuses.append(s.status)
+
+                if s.status != SolverStatus.solved:
+                    continue
+
+                # each package's requirements are met by the resolve
+                versions = dict((x.name, x.version) for x in s.resolved_packages)
+                for variant in s.resolved_packages:
+                    for req in variant.requires_list:
+                        version = versions.get(req.name)
+                        if req.conflict:
+                            self.assertTrue(version is None
+                                            or version not in req.range)
+                        elif not req.name.startswith('.'):
+                            self.assertIn(version, req.range)
+
+            self.assertEqual(len(set(statuses)), 1,
+                             "status mismatch for request %r" % packages)
+
+    def test_19_reduction_index(self):
+        """Indexed reductions give the same solves as reducing every pair."""
+        def _solve(requests, packages_path):
+            session = SolverSession()
+            results = []
+            num_tests = 0
+
+            for packages in requests:
+                s = Solver([Requirement(x) for x in packages], packages_path,
+                           session=session)
+                s.solve()
+
+                if s.status == SolverStatus.solved:
+                    result = [str(x) for x in s.resolved_packages]
+                else:
+                    result = str(s.failure_reason())
+
+                results.append((result, s.num_solves, s.num_fails))
+                num_tests += s.solve_stats["reductions"]["num_reduction_broad_tests"]
+
+            return results, num_tests
+
+        def _get_unindexed(self, scopes):
+            def _all(i):
+                return range(len(scopes))
+            return _all, _all
+
+        benchmark_requests, benchmark_path = self._get_benchmark()
+        samples = [
+            ([["pyvariants", "python"],
+              ["pybah", "!python-2.5"],
+              ["bahish", "pybah<5"],
+              ["pymum-1"],
+              ["python", "pyodd"],
+              ["test_nogood_a", "test_nogood_b", "test_nogood_c"]],
+             self.packages_path),
+            (benchmark_requests[::30], benchmark_path)
+        ]
+
+        for requests, packages_path in samples:
+            results, num_tests = _solve(requests, packages_path)
+
+            get_reduction_index = _ResolvePhase._get_reduction_index
+            _ResolvePhase._get_reduction_index = _get_unindexed
+            try:
+                expected_results, expected_num_tests = \
+                    _solve(requests, packages_path)
+            finally:
+                _ResolvePhase._get_reduction_index = get_reduction_index
+
+            self.assertEqual(results, expected_results)
+            self.assertLess(num_tests, expected_num_tests)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -14,11 +14,13 @@
 
 
 """
-unit tests for 'utils.filesystem' module
+unit tests for 'utils.filesystem' and 'utils.disk_cache' modules
 """
 import os
-from rez.tests.util import TestBase
+import time
+from rez.tests.util import TestBase, TempdirMixin
 from rez.utils import filesystem
+from rez.utils.disk_cache import DiskCache
 from rez.utils.platform_ import Platform, platform_
 
 
@@ -59,3 +61,68 @@ class TestCanonicalPath(TestBase):
         path = filesystem.canonical_path('/a/b/File.txt', platform)
         expects = '/a/b/file.txt'.replace('\\', os.sep)
         self.assertEqual(path, expects)
+
+
+class TestDiskCache(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+        cls.settings = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def test_get_set(self):
+        """Test that values are cached, and shared between cache instances."""
+        path = os.path.join(self.root, "cache1")
+        cache = DiskCache(path)
+
+        self.assertIs(cache.get("foo"), cache.miss)
+        cache.set("foo", {"a": [1, 2]})
+        cache.set("none", None)
+        self.assertEqual(cache.get("foo"), {"a": [1, 2]})
+        self.assertEqual(cache.get("none"), None)
+
+        cache2 = DiskCache(path)
+        self.assertEqual(cache2.get("foo"), {"a": [1, 2]})
+        cache2.delete("foo")
+        self.assertIs(cache.get("foo"), cache.miss)
+
+        self.assertEqual(cache.get_stats(),
+                         {"hits": 2, "misses": 2, "sets": 2, "evictions": 0})
+
+    def test_corrupt_entry(self):
+        """Test that a corrupt entry is a cache miss."""
+        cache = DiskCache(os.path.join(self.root, "cache2"))
+        cache.set("foo", "bah")
+
+        filepath = cache._filepath(cache._qualified_key("foo"))
+        with open(filepath, "wb") as f:
+            f.write(b"garbage")
+
+        self.assertIs(cache.get("foo"), cache.miss)
+        self.assertFalse(os.path.exists(filepath))
+
+    def test_prune(self):
+        """Test that least recently used entries are evicted."""
+        cache = DiskCache(os.path.join(self.root, "cache3"))
+        value = "x" * 1000
+
+        for i in range(10):
+            cache.set(i, value)
+            filepath = cache._filepath(cache._qualified_key(i))
+            os.utime(filepath, (time.time() - 100 + i,) * 2)
+
+        entry_size = cache.get_size() // 10
+
+        # reading an entry marks it as recently used
+        self.assertEqual(cache.get(0), value)
+
+        cache.max_size = entry_size * 5
+        self.assertEqual(cache.prune(), 6)
+
+        for i in (0, 7, 8, 9):
+            self.assertEqual(cache.get(i), value)
+        for i in range(1, 7):
+            self.assertIs(cache.get(i), cache.miss)
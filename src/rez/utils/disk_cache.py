@@ -0,0 +1,278 @@
+# Copyright Contributors to the Rez project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Key-value cache stored on local disk, shared between processes.
+"""
+from hashlib import md5
+import errno
+import os
+import os.path
+import random
+import sys
+
+from rez.config import config
+from rez.utils.filesystem import make_tmp_name, replace_file_or_dir
+from rez.vendor.six.six.moves import cPickle as pickle
+
+
+# this version should be changed if and when the entry format changes
+cache_format_version = 1
+
+
+class DiskCache(object):
+    """A size-bounded key-value cache stored in a local directory.
+
+    Each entry is stored as a pickle in its own file, in a subdirectory
+    sharded by key hash. Entries are written to a temp file and then renamed
+    into place, so concurrent writers are safe, and readers never see a
+    partially written entry.
+
+    Reading an entry updates its mtime. When the total size of the cache goes
+    over `max_size`, the entries with the oldest mtimes (ie the least recently
+    used) are deleted.
+    """
+    class _Miss(object):
+        def __nonzero__(self):
+            return False
+        __bool__ = __nonzero__  # py3 compat
+
+    miss = _Miss()
+
+    logger = config.debug_printer("disk_cache")
+
+    # fraction of `max_size` that the cache is pruned down to, so that pruning
+    # isn't needed again straight away
+    prune_ratio = 0.8
+
+    # expected number of bytes (as a fraction of `max_size`) written, across
+    # all processes, between checks of the cache size
+    prune_interval_ratio = 0.1
+
+    def __init__(self, path, max_size=0):
+        """Create a disk cache.
+
+        Args:
+            path (str): Directory to store the cache in. It is created if it
+                does not exist.
+            max_size (int): Maximum size of the cache in bytes. Zero means no
+                limit.
+        """
+        self.path = path
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Get a cached value.
+
+        Returns:
+            object: The value if cached, else `self.miss`.
+        """
+        key = self._qualified_key(key)
+        filepath = self._filepath(key)
+
+        try:
+            with open(filepath, "rb") as f:
+                key_, value = pickle.load(f)
+        except (IOError, OSError):
+            key_ = None
+        except Exception as e:
+            # a corrupt entry - remove it
+            self.logger("CORRUPT: %s (%s)", key, e)
+            self._remove(filepath)
+            key_ = None
+
+        if key_ != key:
+            self.misses += 1
+            self.logger("MISS: %s", key)
+            return self.miss
+
+        # mark as recently used
+        try:
+            os.utime(filepath, None)
+        except OSError:
+            pass
+
+        self.hits += 1
+        self.logger("HIT: %s", key)
+        return value
+
+    def get_multi(self, keys):
+        """Get multiple cached values.
+
+        Returns:
+            dict: Cached values, keyed by the given keys. Missing values are
+            not present in the dict.
+        """
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not self.miss:
+                result[key] = value
+        return result
+
+    def set(self, key, value):
+        """Cache a value.
+
+        Failure to write to the cache is not an error, the value is just not
+        cached.
+        """
+        key = self._qualified_key(key)
+        filepath = self._filepath(key)
+
+        try:
+            blob = pickle.dumps((key, value), protocol=2)
+        except Exception as e:
+            self.logger("UNPICKLABLE: %s (%s)", key, e)
+            return
+
+        try:
+            self._write(filepath, blob)
+        except (IOError, OSError) as e:
+            self.logger("WRITE FAILED: %s (%s)", key, e)
+            return
+
+        self.sets += 1
+        self.logger("SET: %s", key)
+
+        # Check the cache size every so often. This is done at random so that
+        # the cache stays bounded however writes are spread across processes.
+        if self.max_size:
+            interval = self.max_size * self.prune_interval_ratio
+            if random.random() < (len(blob) / interval):
+                self.prune()
+
+    def delete(self, key):
+        """Delete a cached value, if present."""
+        key = self._qualified_key(key)
+        self._remove(self._filepath(key))
+
+    def clear(self):
+        """Delete all entries from the cache."""
+        for filepath, _, _ in self._iter_entries():
+            self._remove(filepath)
+
+    def prune(self):
+        """Delete least recently used entries, if the cache is over size.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        if not self.max_size:
+            return 0
+
+        entries = list(self._iter_entries())
+        total_size = sum(x[2] for x in entries)
+        if total_size <= self.max_size:
+            return 0
+
+        target_size = self.max_size * self.prune_ratio
+        num_removed = 0
+
+        for filepath, _, size in sorted(entries, key=lambda x: x[1]):
+            if total_size <= target_size:
+                break
+
+            if self._remove(filepath):
+                num_removed += 1
+            total_size -= size
+
+        self.evictions += num_removed
+        self.logger("PRUNED: %d entries from %s", num_removed, self.path)
+        return num_removed
+
+    def get_size(self):
+        """Get the total size of the cache.
+
+        Returns:
+            int: Size in bytes.
+        """
+        return sum(x[2] for x in self._iter_entries())
+
+    def get_stats(self):
+        """Get statistics for this process's use of the cache.
+
+        Returns:
+            dict: Hit, miss, set and eviction counts.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def _qualified_key(self, key):
+        return "%s:%d:%s" % (cache_format_version, sys.version_info[0], key)
+
+    def _filepath(self, key):
+        hashed_key = md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, hashed_key[:2], hashed_key)
+
+    def _write(self, filepath, blob):
+        dirpath = os.path.dirname(filepath)
+
+        if not os.path.exists(dirpath):
+            try:
+                os.makedirs(dirpath)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+        with make_tmp_name(filepath) as tmp_filepath:
+            with open(tmp_filepath, "wb") as f:
+                f.write(blob)
+            replace_file_or_dir(filepath, tmp_filepath)
+
+    def _remove(self, filepath):
+        try:
+            os.remove(filepath)
+            return True
+        except OSError:
+            return False
+
+    def _iter_entries(self):
+        # yields (filepath, mtime, size) for each entry
+        try:
+            shards = os.listdir(self.path)
+        except OSError:
+            return
+
+        for shard in shards:
+            dirpath = os.path.join(self.path, shard)
+
+            try:
+                names = os.listdir(dirpath)
+            except OSError:
+                continue
+
+            for name in names:
+                filepath = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    continue
+
+                yield filepath, st.st_mtime, st.st_size
@@ -19,20 +19,274 @@ from rez.config import config
 from rez.vendor.memcache.memcache import Client as Client_, \
     SERVER_MAX_KEY_LENGTH, __version__ as memcache_client_version
 from rez.utils import py23
-from threading import local
+from threading import local, Lock
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
 from functools import update_wrapper
 from inspect import isgeneratorfunction
 from hashlib import md5
 from uuid import uuid4
+import atexit
+import re
 from rez.vendor.six import six
+from rez.vendor.six.six.moves import cPickle as pickle
 
 
 basestring = six.string_types[0]
 
 
 # this version should be changed if and when the caching interface changes
-cache_interface_version = 2
+cache_interface_version = 3
+
+
+class DiskCacheBackend(object):
+    """Cache backend that stores entries in a local directory.
+
+    This is used in place of a memcached server, for server URIs of the form
+    'file:///path/to/cache/dir'. The cache directory is shared between all rez
+    processes on the host that use it. It has the same interface as
+    `memcache.Client`.
+    """
+    scheme = "file://"
+
+    def __init__(self, servers):
+        from rez.utils.disk_cache import DiskCache
+
+        if len(servers) != 1:
+            raise ValueError("Expected a single disk cache URI, got: %r"
+                             % list(servers))
+
+        self.uri = servers[0]
+        self.cache = DiskCache(self.uri[len(self.scheme):],
+                               max_size=config.memcached_disk_cache_max_size)
+
+    def set(self, key, val, time=0, min_compress_len=0):
+        # entry expiry and compression are not supported
+        self.cache.set(key, val)
+        return True
+
+    def get(self, key):
+        value = self.cache.get(key)
+        return None if value is self.cache.miss else value
+
+    def get_multi(self, keys):
+        return self.cache.get_multi(keys)
+
+    def set_multi(self, mapping, time=0, key_prefix='', min_compress_len=0):
+        for key, val in mapping.items():
+            self.cache.set(key_prefix + key, val)
+        return []
+
+    def add(self, key, val, time=0, min_compress_len=0):
+        # Note: Unlike memcached, this is not atomic. Concurrent processes can
+        # both add the same key, and the last write wins.
+        if self.cache.get(key) is not self.cache.miss:
+            return False
+        self.cache.set(key, val)
+        return True
+
+    def incr(self, key, delta=1):
+        # Note: Unlike memcached, this is not atomic. Increments made by
+        # concurrent processes can be lost, so counters kept in a disk cache
+        # (see `Client.get_kind_stats`) are approximate.
+        value = self.cache.get(key)
+        if value is self.cache.miss:
+            return None
+
+        value = int(value) + delta
+        self.cache.set(key, value)
+        return value
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def flush_all(self):
+        self.cache.clear()
+
+    def get_stats(self, stat_args=None):
+        if stat_args == "reset":
+            self.cache.reset_stats()
+            return []
+
+        # mirror the memcached stats used by rez-memcache
+        stats = self.cache.get_stats()
+        return [(self.uri, {
+            "get_hits": stats["hits"],
+            "get_misses": stats["misses"],
+            "cmd_get": stats["hits"] + stats["misses"],
+            "cmd_set": stats["sets"],
+            "evictions": stats["evictions"],
+            "curr_connections": 1,
+            "bytes": self.cache.get_size(),
+            "limit_maxbytes": self.cache.max_size
+        })]
+
+    def disconnect_all(self):
+        pass
+
+
+# Cache backends, by server URI scheme. Server URIs that do not match any of
+# these schemes are memcached servers.
+cache_backends = {
+    DiskCacheBackend.scheme: DiskCacheBackend
+}
+
+
+def register_cache_backend(scheme, backend_class):
+    """Register a cache backend.
+
+    Args:
+        scheme (str): Server URI prefix that selects the backend, for example
+            'file://'.
+        backend_class (type): Backend class. It is constructed with the list of
+            server URIs, and must provide the same interface as
+            `memcache.Client`.
+    """
+    cache_backends[scheme] = backend_class
+
+
+class _LocalCache(object):
+    """In-process LRU cache of pickled entries, bounded by total byte size.
+
+    Entries are kept pickled so that each hit gets its own copy of the value,
+    the same as a get from the remote cache would.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            blob = self.entries.pop(key, None)
+            if blob is not None:
+                self.entries[key] = blob  # mark as most recently used
+        return blob
+
+    def set(self, key, blob):
+        if len(blob) > self.max_size:
+            return
+
+        with self.lock:
+            prev_blob = self.entries.pop(key, None)
+            if prev_blob is not None:
+                self.size -= len(prev_blob)
+
+            self.entries[key] = blob
+            self.size += len(blob)
+
+            while self.size > self.max_size:
+                _, blob_ = self.entries.popitem(last=False)
+                self.size -= len(blob_)
+
+    def delete(self, key):
+        with self.lock:
+            blob = self.entries.pop(key, None)
+            if blob is not None:
+                self.size -= len(blob)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+_local_cache = None
+
+
+def get_local_cache():
+    """Get the in-process cache that sits in front of remote caches.
+
+    Returns:
+        `_LocalCache`: The cache, or None if disabled (see the
+        'memcached_local_cache_max_size' config setting).
+    """
+    global _local_cache
+
+    max_size = config.memcached_local_cache_max_size
+    if not max_size:
+        return None
+
+    if _local_cache is None:
+        _local_cache = _LocalCache(max_size)
+    else:
+        _local_cache.max_size = max_size
+
+    return _local_cache
+
+
+def _key_kind(key):
+    # Keys are stringified tuples whose first item is the kind of entry, for
+    # example "('listdir', '/svr/packages', ...)".
+    m = re.match(r"\('(\w+)'", key)
+    return m.group(1) if m else "other"
+
+
+class _KindStats(object):
+    """Counts cache hits and misses by kind of entry, in this process.
+
+    The counts are added to counters in the remote cache when the process
+    exits, so that they can be reported across all processes (see
+    `Client.get_kind_stats`). This costs some round trips to the server at
+    exit, so counting is only done if the 'memcached_kind_stats' or
+    'debug_memcache' setting is enabled.
+    """
+    fields = ("local_hits", "hits", "misses")
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.lock = Lock()
+        self.registered = False
+
+    @property
+    def enabled(self):
+        return bool(config.memcached_kind_stats or config.debug_memcache)
+
+    def add(self, servers, kind, field):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.counts[(tuple(servers), kind, field)] += 1
+
+            if not self.registered:
+                atexit.register(self.flush)
+                self.registered = True
+
+    def flush(self):
+        with self.lock:
+            counts = self.counts
+            self.counts = defaultdict(int)
+
+        by_servers = defaultdict(dict)
+        for (servers, kind, field), count in counts.items():
+            by_servers[servers][(kind, field)] = count
+
+        for servers, counts_ in by_servers.items():
+            client = Client(list(servers))
+            try:
+                client.add_kind_stats(counts_)
+            except Exception:
+                pass  # stats are not worth failing over
+            finally:
+                client.disconnect()
+
+
+kind_stats = _KindStats()
+
+
+def create_cache_backend(servers):
+    """Create the cache backend for the given server URIs.
+
+    Returns:
+        Object with the same interface as `memcache.Client`.
+    """
+    for scheme, backend_class in cache_backends.items():
+        if servers and all(x.startswith(scheme) for x in servers):
+            return backend_class(servers)
+
+    return Client_(servers)
 
 
 class Client(object):
@@ -41,7 +295,8 @@ class Client(object):
     Adds the features:
     - unlimited key length;
     - hard/soft flushing;
-    - ability to cache None.
+    - ability to cache None;
+    - other cache backends (see `cache_backends`).
     """
     class _Miss(object):
         def __nonzero__(self):
@@ -56,7 +311,8 @@ class Client(object):
         """Create a memcached client.
 
         Args:
-            servers (str or list of str): Server URI(s), eg '127.0.0.1:11211'.
+            servers (str or list of str): Server URI(s), eg '127.0.0.1:11211',
+                or the URI of another cache backend, eg 'file:///tmp/cache'.
             debug (bool): If True, quasi human readable keys are used. This helps
                 debugging - run 'memcached -vv' in the foreground to see the keys
                 being get/set/stored.
@@ -77,10 +333,10 @@ class Client(object):
         """Get the native memcache client.
 
         Returns:
-            `memcache.Client` instance.
+            `memcache.Client` instance, or other cache backend.
         """
         if self._client is None:
-            self._client = Client_(self.servers)
+            self._client = create_cache_backend(self.servers)
         return self._client
 
     def test_servers(self):
@@ -91,7 +347,7 @@ class Client(object):
         """
         responders = set()
         for server in self.servers:
-            client = Client_([server])
+            client = create_cache_backend([server])
             key = uuid4().hex
             client.set(key, 1)
             if client.get(key) == 1:
@@ -105,10 +361,13 @@ class Client(object):
 
         key = self._qualified_key(key)
         hashed_key = self.key_hasher(key)
-        val = (key, val)
+
+        local_cache = get_local_cache()
+        if local_cache:
+            local_cache.set(self._local_key(key), pickle.dumps(val, protocol=2))
 
         self.client.set(key=hashed_key,
-                        val=val,
+                        val=(key, val),
                         time=time,
                         min_compress_len=min_compress_len)
         self.logger("SET: %s", key)
@@ -124,24 +383,100 @@ class Client(object):
         if not self.servers:
             return self.miss
 
+        kind = _key_kind(key)
         key = self._qualified_key(key)
+
+        local_cache = get_local_cache()
+        if local_cache:
+            local_key = self._local_key(key)
+            blob = local_cache.get(local_key)
+
+            if blob is not None:
+                kind_stats.add(self.servers, kind, "local_hits")
+                self.logger("LOCAL HIT: %s", key)
+                return pickle.loads(blob)
+
         hashed_key = self.key_hasher(key)
         entry = self.client.get(hashed_key)
 
         if isinstance(entry, tuple) and len(entry) == 2:
             key_, result = entry
             if key_ == key:
+                if local_cache:
+                    local_cache.set(local_key, pickle.dumps(result, protocol=2))
+
+                kind_stats.add(self.servers, kind, "hits")
                 self.logger("HIT: %s", key)
                 return result
 
+        kind_stats.add(self.servers, kind, "misses")
         self.logger("MISS: %s", key)
         return self.miss
 
+    def get_multi(self, keys):
+        """Get multiple entries from the cache, in a single round trip.
+
+        Args:
+            keys (list of str): Keys to get.
+
+        Returns:
+            dict: Entries found in the cache, keyed by the given keys. Missing
+            entries are not present in the dict.
+        """
+        result = {}
+        if not self.servers:
+            return result
+
+        local_cache = get_local_cache()
+        pending = {}  # hashed key -> (key, qualified key)
+
+        for key in keys:
+            kind = _key_kind(key)
+            qualified_key = self._qualified_key(key)
+
+            if local_cache:
+                blob = local_cache.get(self._local_key(qualified_key))
+                if blob is not None:
+                    kind_stats.add(self.servers, kind, "local_hits")
+                    self.logger("LOCAL HIT: %s", qualified_key)
+                    result[key] = pickle.loads(blob)
+                    continue
+
+            pending[self.key_hasher(qualified_key)] = (key, qualified_key)
+
+        entries = self.client.get_multi(list(pending.keys())) if pending else {}
+
+        for hashed_key, (key, qualified_key) in pending.items():
+            kind = _key_kind(key)
+            entry = entries.get(hashed_key)
+
+            if isinstance(entry, tuple) and len(entry) == 2:
+                key_, value = entry
+                if key_ == qualified_key:
+                    if local_cache:
+                        local_cache.set(self._local_key(qualified_key),
+                                        pickle.dumps(value, protocol=2))
+
+                    kind_stats.add(self.servers, kind, "hits")
+                    self.logger("HIT: %s", qualified_key)
+                    result[key] = value
+                    continue
+
+            kind_stats.add(self.servers, kind, "misses")
+            self.logger("MISS: %s", qualified_key)
+
+        return result
+
     def delete(self, key):
         """See memcache.Client."""
         if self.servers:
             key = self._qualified_key(key)
             hashed_key = self.key_hasher(key)
+
+            local_cache = get_local_cache()
+            if local_cache:
+                local_cache.delete(self._local_key(key))
+
             self.client.delete(hashed_key)
 
     def flush(self, hard=False):
@@ -157,6 +492,10 @@ class Client(object):
         if hard:
             self.client.flush_all()
             self.reset_stats()
+
+            local_cache = get_local_cache()
+            if local_cache:
+                local_cache.clear()
         else:
             from uuid import uuid4
             tag = uuid4().hex
@@ -175,6 +514,84 @@ class Client(object):
     def reset_stats(self):
         """Reset the server stats."""
         self._get_stats("reset")
+        self.reset_kind_stats()
+
+    def get_kind_stats(self):
+        """Get cache hit and miss counts by kind of entry.
+
+        These are totals across all processes that have used the cache. Hits
+        in the in-process cache that sits in front of the remote cache are
+        counted separately, as 'local_hits'.
+
+        Returns:
+            dict: Maps entry kind (eg 'listdir', 'package_file', 'resolve') to
+            a dict of counts.
+        """
+        keys = {}
+        for kind in self._get_kinds():
+            for field in _KindStats.fields:
+                keys[(kind, field)] = self._kind_stats_key(kind, field)
+
+        values = self.client.get_multi(list(keys.values())) if keys else {}
+        result = {}
+
+        for (kind, field), key in keys.items():
+            counts = result.setdefault(kind, {})
+            counts[field] = int(values.get(key) or 0)
+
+        return result
+
+    def add_kind_stats(self, counts):
+        """Add to the cache hit and miss counts by kind of entry.
+
+        Existing counters are incremented, and new ones are created in a
+        single batch. Two processes creating the same counter at once can lose
+        one of the counts, so the counts are approximate.
+
+        Args:
+            counts (dict): Maps (kind, field) to count to add.
+        """
+        kinds_key = self._kind_stats_key()
+        keys = dict((x, self._kind_stats_key(*x)) for x in counts)
+        values = self.client.get_multi([kinds_key] + list(keys.values()))
+        new_values = {}
+
+        kinds = set(values.get(kinds_key) or [])
+        new_kinds = set(kind for kind, _ in counts) - kinds
+        if new_kinds:
+            new_values[kinds_key] = sorted(kinds | new_kinds)
+
+        for kind_field, count in counts.items():
+            key = keys[kind_field]
+            if key in values:
+                self.client.incr(key, count)
+            else:
+                new_values[key] = count
+
+        if new_values:
+            self.client.set_multi(new_values)
+
+    def reset_kind_stats(self):
+        """Reset the cache hit and miss counts by kind of entry."""
+        for kind in self._get_kinds():
+            for field in _KindStats.fields:
+                self.client.delete(self._kind_stats_key(kind, field))
+        self.client.delete(self._kind_stats_key())
+
+    def _get_kinds(self):
+        return self.client.get(self._kind_stats_key()) or []
+
+    def _kind_stats_key(self, *parts):
+        key = "%s:%s:%s" % (
+            memcache_client_version,
+            cache_interface_version,
+            str(("cache_stats",) + parts)
+        )
+        # not self.key_hasher, so that debug clients share the same counters
+        return self._key_hash(key)
+
+    def _local_key(self, key):
+        return (tuple(self.servers), key)
 
     def disconnect(self):
         """Disconnect from server(s). Behaviour is undefined after this call."""
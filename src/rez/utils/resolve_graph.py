@@ -14,6 +14,274 @@
 
 
 from rez.utils.graph_utils import _request_from_label
+from rez.vendor.pygraph.classes.digraph import digraph
+from rez.vendor.pygraph.algorithms.accessibility import accessibility
+from rez.vendor.version.requirement import Requirement, RequirementList
+
+
+def graph_from_data(graph_data):
+    """Build a resolve graph from the data that describes a solver phase.
+
+    Building the graph is deferred until it is needed, since most resolves
+    never look at it. See `rez.solver._ResolvePhase.get_graph_data` for the
+    format of `graph_data`.
+
+    Args:
+        graph_data (dict): Resolve phase data.
+
+    Returns:
+        A pygraph.digraph object.
+    """
+    g = digraph()
+    request_list = [Requirement(x) for x in graph_data["requests"]]
+    scope_list = [
+        (name, label, state, Requirement(request_str), requires)
+        for name, label, state, request_str, requires in graph_data["scopes"]
+    ]
+    scopes = dict((x[0], x) for x in scope_list)
+    failure_nodes = set()
+    request_nodes = {}  # (request, node_id)
+    scope_nodes = {}  # (package_name, node_id)
+    scope_requests = {}  # (node_id, request)
+
+    # -- graph creation basics
+
+    node_color = "#F6F6F6"
+    request_color = "#FFFFAA"
+    solved_color = "#AAFFAA"
+    node_fontsize = 10
+    counter = [1]
+
+    def _uid():
+        id_ = counter[0]
+        counter[0] += 1
+        return "_%d" % id_
+
+    def _add_edge(id1, id2, arrowsize=0.5):
+        e = (id1, id2)
+        if g.has_edge(e):
+            g.del_edge(e)
+        g.add_edge(e)
+        g.add_edge_attribute(e, ("arrowsize", str(arrowsize)))
+        return e
+
+    def _add_extraction_merge_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.add_edge_attribute(e, ("arrowhead", "odot"))
+
+    def _add_conflict_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, "CONFLICT")
+        g.add_edge_attribute(e, ("style", "bold"))
+        g.add_edge_attribute(e, ("color", "red"))
+        g.add_edge_attribute(e, ("fontcolor", "red"))
+
+    def _add_cycle_edge(id1, id2):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, "CYCLE")
+        g.add_edge_attribute(e, ("style", "bold"))
+        g.add_edge_attribute(e, ("color", "red"))
+        g.add_edge_attribute(e, ("fontcolor", "red"))
+
+    def _add_reduct_edge(id1, id2, label):
+        e = _add_edge(id1, id2, 1)
+        g.set_edge_label(e, label)
+        g.add_edge_attribute(e, ("fontsize", node_fontsize))
+
+    def _add_node(label, color, style):
+        attrs = [("label", label),
+                 ("fontsize", node_fontsize),
+                 ("fillcolor", color),
+                 ("style", '"%s"' % style)]
+        id_ = _uid()
+        g.add_node(id_, attrs=attrs)
+        return id_
+
+    def _add_request_node(request, initial_request=False):
+        id_ = request_nodes.get(request)
+        if id_ is not None:
+            return id_
+
+        label = str(request)
+        if initial_request:
+            color = request_color
+        else:
+            color = node_color
+
+        id_ = _add_node(label, color, "filled,dashed")
+        request_nodes[request] = id_
+        return id_
+
+    def _add_scope_node(scope):
+        name, label, state, package_request, _ = scope
+        id_ = scope_nodes.get(name)
+        if id_ is not None:
+            return id_
+
+        if state == "solved":
+            color = solved_color
+            style = "filled"
+        elif state == "conflict":
+            color = node_color
+            style = "filled,dashed"
+        else:
+            color = node_color
+            style = "filled"
+
+        id_ = _add_node(label, color, style)
+        scope_nodes[name] = id_
+        scope_requests[id_] = package_request
+        return id_
+
+    def _add_reduct_node(request):
+        return _add_node(str(request), node_color, "filled,dashed")
+
+    # -- generate the graph
+
+    # create initial request nodes
+    for request in request_list:
+        _add_request_node(request, True)
+
+    # create scope nodes
+    for scope in scope_list:
+        name, _, state, package_request, _ = scope
+        if state == "conflict":
+            id1 = request_nodes.get(package_request)
+            if id1 is not None:
+                # special case - a scope that matches an initial conflict request,
+                # we switch nodes so the request node becomes a scope node
+                scope_nodes[name] = id1
+                del request_nodes[package_request]
+                continue
+
+        _add_scope_node(scope)
+
+    # create (initial request -> scope) edges
+    for request in request_list:
+        id1 = request_nodes.get(request)
+        if id1 is not None:
+            id2 = scope_nodes.get(request.name)
+            if id2 is not None:
+                _add_edge(id1, id2)
+
+    # for solved scopes, create (scope -> requirement) edge
+    for name, _, state, _, requires in scope_list:
+        if state == "solved":
+            id1 = scope_nodes[name]
+
+            for request_str in requires:
+                id2 = _add_request_node(Requirement(request_str))
+                _add_edge(id1, id2)
+
+    # add extractions
+    extractions = [(src_fam, fam, Requirement(request_str))
+                   for src_fam, fam, request_str in graph_data["extractions"]]
+
+    for src_fam, _, dest_req in extractions:
+        id1 = scope_nodes.get(src_fam)
+        if id1 is not None:
+            id2 = _add_request_node(dest_req)
+            _add_edge(id1, id2)
+
+    # add extraction intersections
+    extracted_fams = set(x[1] for x in extractions)
+    for fam in extracted_fams:
+        requests = [x[2] for x in extractions if x[1] == fam]
+        if len(requests) > 1:
+            reqlist = RequirementList(requests)
+            if not reqlist.conflict:
+                merged_request = reqlist.get(fam)
+                for request in requests:
+                    if merged_request != request:
+                        id1 = _add_request_node(request)
+                        id2 = _add_request_node(merged_request)
+                        _add_extraction_merge_edge(id1, id2)
+
+    # add conflicts
+    failure = graph_data["failure"]
+    if failure:
+        failure_type, items = failure
+
+        if failure_type == "conflicts":
+            for dependency_str, conflicting_str in items:
+                dependency = Requirement(dependency_str)
+                conflicting_request = Requirement(conflicting_str)
+                scope_n = scope_nodes.get(conflicting_request.name)
+                scope_r = scope_requests.get(scope_n)
+
+                if scope_n is not None \
+                        and scope_r is not None \
+                        and scope_r.conflicts_with(conflicting_request):
+                    # confirmed that scope node is in conflict
+                    id1 = _add_request_node(conflicting_request)
+                    id2 = scope_n
+                elif scope_n is not None and scope_r is None:
+                    # occurs when an existing conflict request conflicts
+                    # with a pkg requirement
+                    id1 = scope_n
+                    id2 = _add_request_node(dependency)
+                else:
+                    id1 = _add_request_node(dependency)
+                    id2 = scope_n or _add_request_node(conflicting_request)
+
+                _add_conflict_edge(id1, id2)
+
+                failure_nodes.add(id1)
+                failure_nodes.add(id2)
+        elif failure_type == "reductions":
+            if len(items) == 1:
+                # special case - singular total reduction
+                name, dependency_str, conflicting_str, _ = items[0]
+                id1 = scope_nodes[name]
+                id2 = _add_request_node(Requirement(dependency_str))
+                id3 = scope_nodes[Requirement(conflicting_str).name]
+                _add_edge(id1, id2)
+                _add_conflict_edge(id2, id3)
+
+                failure_nodes.add(id1)
+                failure_nodes.add(id2)
+                failure_nodes.add(id3)
+            else:
+                for name, dependency_str, conflicting_str, reducee_str in items:
+                    id1 = scope_nodes[name]
+                    id2 = _add_reduct_node(dependency_str)
+                    id3 = scope_nodes[Requirement(conflicting_str).name]
+                    _add_reduct_edge(id1, id2, reducee_str)
+                    _add_conflict_edge(id2, id3)
+
+                    failure_nodes.add(id1)
+                    failure_nodes.add(id2)
+                    failure_nodes.add(id3)
+        elif failure_type == "cycle":
+            for i, name in enumerate(items):
+                id1 = scope_nodes[name]
+                failure_nodes.add(id1)
+                name2 = items[(i + 1) % len(items)]
+                id2 = scope_nodes[name2]
+                _add_cycle_edge(id1, id2)
+
+    # connect leaf-node requests to a matching scope, if any
+    for request, id1 in request_nodes.items():
+        if not g.neighbors(id1):  # leaf node
+            id2 = scope_nodes.get(request.name)
+            if id2 is not None:
+                package_request = scopes[request.name][3]
+                if not request.conflicts_with(package_request):
+                    _add_edge(id1, id2)
+
+    # prune nodes not related to failure
+    if graph_data["prune_unfailed"] and failure_nodes:
+        access_dict = accessibility(g)
+        del_nodes = set()
+
+        for n, access_nodes in access_dict.items():
+            if not (set(access_nodes) & failure_nodes):
+                del_nodes.add(n)
+
+        for n in del_nodes:
+            g.del_node(n)
+
+    return g
 
 
 def failure_detail_from_graph(graph):
@@ -23,7 +291,7 @@ def failure_detail_from_graph(graph):
         graph (rez.vendor.pygraph.classes.digraph.digraph): context graph object
 
     """
-    # Base on `rez.solver._ResolvePhase.get_graph()`
+    # Base on `graph_from_data`
     #   the failure reason has three types:
     #
     #   * DependencyConflicts
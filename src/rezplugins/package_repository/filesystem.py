@@ -17,6 +17,7 @@
 Filesystem-based package repository
 """
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 import os.path
 import os
 import stat
@@ -38,14 +39,16 @@ from rez.utils.formatting import is_valid_package_name
 from rez.utils.resources import cached_property
 from rez.utils.logging_ import print_warning, print_info
 from rez.utils.memcached import memcached, pool_memcached_connections
-from rez.utils.filesystem import make_path_writable, \
-    canonical_path, is_subdirectory
+from rez.utils.filesystem import make_path_writable, make_tmp_name, \
+    replace_file_or_dir, canonical_path, is_subdirectory
 from rez.utils.platform_ import platform_
 from rez.utils.yaml import load_yaml
+from rez.utils import json
 from rez.config import config
 from rez.backport.lru_cache import lru_cache
 from rez.vendor.schema.schema import Schema, Optional, And, Use, Or
 from rez.vendor.six import six
+from rez.vendor.six.six.moves import cPickle as pickle
 from rez.vendor.version.version import Version, VersionRange
 
 
@@ -95,6 +98,225 @@ class PackageDefinitionFileMissing(PackageMetadataError):
     pass
 
 
+class _DirEntry(object):
+    """Stand-in for `os.DirEntry`, on python versions without `os.scandir`.
+    """
+    def __init__(self, root, name):
+        self.name = name
+        self.path = os.path.join(root, name)
+
+    def is_dir(self):
+        return os.path.isdir(self.path)
+
+    def is_file(self):
+        return os.path.isfile(self.path)
+
+
+def _scandir(path):
+    """List a directory.
+
+    Uses `os.scandir` where available. On most filesystems this gets the type
+    of each entry as part of the listing, rather than with a stat per entry.
+
+    Returns:
+        List of `os.DirEntry`.
+    """
+    if hasattr(os, "scandir"):
+        return list(os.scandir(path))
+    return [_DirEntry(path, name) for name in os.listdir(path)]
+
+
+def _dir_key(path):
+    st = os.stat(path)
+    return (int(st.st_ino), st.st_mtime)
+
+
+class RepositoryIndex(object):
+    """An on-disk index of the contents of a filesystem package repository.
+
+    The index is stored in a '.rez_index' directory in the repository root. It
+    contains the family and version directory listings of the repository, and
+    the loaded contents of each package definition file. A new process can
+    then get these from a single file read, rather than listing directories
+    and loading package definition files one at a time.
+
+    Every entry is validated before it's used: listings against the inode and
+    mtime of their directory, and package data against the mtime of its
+    package definition file. An out of date entry is ignored, never used.
+
+    The index is only written when the repository is changed (a variant is
+    installed, or a package is ignored or removed), and only the entries of
+    the changed family are updated.
+    """
+    dirname = ".rez_index"
+    filename = "index"
+
+    # increment when the structure of the index changes
+    format_version = 1
+
+    def __init__(self, location):
+        self.path = os.path.join(location, self.dirname)
+        self.filepath = os.path.join(self.path, self.filename)
+        self.data = self._new_data()
+
+    def load(self):
+        """Load the index from disk.
+
+        Returns:
+            bool: True if a valid index was loaded.
+        """
+        try:
+            with open(self.filepath, "rb") as f:
+                data = pickle.load(f)
+        except (IOError, OSError):
+            return False
+        except Exception as e:
+            print_warning("Ignoring unreadable package repository index %s: %s"
+                          % (self.filepath, e))
+            return False
+
+        if not isinstance(data, dict) or \
+                data.get("format_version") != self.format_version:
+            return False
+
+        self.data = data
+        return True
+
+    def save(self):
+        """Atomically write the index to disk."""
+        with make_tmp_name(self.filepath) as tmp_filepath:
+            with open(tmp_filepath, "wb") as f:
+                pickle.dump(self.data, f, protocol=2)
+            replace_file_or_dir(self.filepath, tmp_filepath)
+
+    def get_family_dirs(self, key):
+        entry = self.data["families"]
+        if entry is None or entry[0] != key:
+            return None
+        return list(entry[1])
+
+    def set_family_dirs(self, key, dirs):
+        self.data["families"] = (key, list(dirs))
+
+    def get_version_dirs(self, name, key):
+        entry = self.data["versions"].get(name)
+        if entry is None or entry[0] != key:
+            return None
+        return list(entry[1])
+
+    def set_version_dirs(self, name, key, dirs):
+        self.data["versions"][name] = (key, list(dirs))
+
+        # discard packages that are no longer present
+        packages = self.data["packages"].get(name, {})
+        for version_str in set(packages) - set(dirs):
+            del packages[version_str]
+
+    def get_package_data(self, name, version_str, key):
+        entry = self.data["packages"].get(name, {}).get(version_str)
+        if entry is None or entry[0] != key:
+            return None
+        return pickle.loads(entry[1])
+
+    def set_package_data(self, name, version_str, key, data):
+        # package data is stored pickled, so that it is only unpickled when
+        # the package is actually loaded
+        packages = self.data["packages"].setdefault(name, {})
+        packages[version_str] = (key, pickle.dumps(data, protocol=2))
+
+    def get_package_key(self, name, version_str):
+        entry = self.data["packages"].get(name, {}).get(version_str)
+        return None if entry is None else entry[0]
+
+    def remove_family(self, name):
+        self.data["versions"].pop(name, None)
+        self.data["packages"].pop(name, None)
+
+    @contextmanager
+    def lock(self, repository):
+        """Lock the index for writing."""
+        if not os.path.exists(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+
+        with repository._lock_file(os.path.join(self.path, "lock")):
+            yield
+
+    @classmethod
+    def _new_data(cls):
+        return {
+            "format_version": cls.format_version,
+            "families": None,
+            "versions": {},
+            "packages": {}
+        }
+
+
+class FamilyTimestamps(object):
+    """The release times of the packages in a package family.
+
+    These are stored in a '.rez_timestamps' file in the family directory, so
+    that the release time of a package (which is all that timestamped resolves
+    need from most packages) can be read without loading its package definition
+    file.
+
+    Each entry is validated against the mtime of the package definition file
+    that it was taken from. An out of date entry is ignored, never used.
+    """
+    filename = ".rez_timestamps"
+
+    # increment when the structure of the file changes
+    format_version = 1
+
+    def __init__(self, family_path):
+        self.filepath = os.path.join(family_path, self.filename)
+        self.timestamps = {}
+
+    def load(self):
+        """Load the release times from disk.
+
+        Returns:
+            bool: True if valid release times were loaded.
+        """
+        try:
+            with open(self.filepath) as f:
+                data = json.loads(f.read())
+        except (IOError, OSError):
+            return False
+        except Exception as e:
+            print_warning("Ignoring unreadable package release times %s: %s"
+                          % (self.filepath, e))
+            return False
+
+        if not isinstance(data, dict) or \
+                data.get("format_version") != self.format_version:
+            return False
+
+        self.timestamps = data["timestamps"]
+        return True
+
+    def save(self):
+        """Atomically write the release times to disk."""
+        data = {
+            "format_version": self.format_version,
+            "timestamps": self.timestamps
+        }
+
+        with make_tmp_name(self.filepath) as tmp_filepath:
+            with open(tmp_filepath, 'w') as f:
+                f.write(json.dumps(data))
+            replace_file_or_dir(self.filepath, tmp_filepath)
+
+    def get_timestamp(self, version_str, key):
+        entry = self.timestamps.get(version_str)
+        if entry is None or entry[1] != key:
+            return None
+        return entry[0]
+
+
 # ------------------------------------------------------------------------------
 # resources
 # ------------------------------------------------------------------------------
@@ -121,7 +343,7 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
     def iter_packages(self):
         # check for unversioned package
         if config.allow_unversioned_packages:
-            filepath, _ = self._repository._get_file(self.path)
+            filepath, _ = self._repository.get_file(self.path)
             if filepath:
                 package = self._repository.get_resource(
                     FileSystemPackageResource.key,
@@ -204,11 +426,26 @@ class FileSystemPackageResource(PackageResourceHelper):
             raise PackageDefinitionFileMissing(
                 "Missing package definition file: %r" % self)
 
-        data = load_from_file(
-            self.filepath,
-            self.file_format,
-            disable_memcache=self._repository.disable_memcache
-        )
+        # an edited or re-released package doesn't change any directory mtime,
+        # so the file itself is tracked (see `is_stale`)
+        self._repository._track_path(self.filepath)
+
+        data = None
+        index = self._repository.index
+
+        if index:
+            data = index.get_package_data(
+                self.name,
+                self.get("version") or '',
+                (self.filepath, self.state_handle)
+            )
+
+        if data is None:
+            data = load_from_file(
+                self.filepath,
+                self.file_format,
+                disable_memcache=self._repository.disable_memcache
+            )
 
         check_format_version(self.filepath, data)
 
@@ -479,7 +716,9 @@ class FileSystemPackageRepository(PackageRepository):
     schema_dict = {"file_lock_timeout": int,
                    "file_lock_dir": Or(None, str),
                    "file_lock_type": Or("default", "link", "mkdir"),
-                   "package_filenames": [basestring]}
+                   "package_filenames": [basestring],
+                   "use_index": bool,
+                   "scan_threads": int}
 
     building_prefix = ".building"
     ignore_prefix = ".ignore"
@@ -542,6 +781,15 @@ class FileSystemPackageRepository(PackageRepository):
         self.get_packages = lru_cache(maxsize=None)(self._get_packages)
         self.get_variants = lru_cache(maxsize=None)(self._get_variants)
         self.get_file = lru_cache(maxsize=None)(self._get_file)
+        self.get_timestamps = lru_cache(maxsize=None)(self._get_timestamps)
+
+        # version dir listings read ahead of time by `prefetch_packages`, as
+        # (path key, listing) tuples (see `_path_key`)
+        self._prefetched_version_dirs = {}
+
+        # keys (see `_dir_key`) of paths that cached data was read from, so
+        # that changes can be detected (see `is_stale`)
+        self._read_path_keys = {}
 
         # decorate with memcachemed memoizers unless told otherwise
         if not self.disable_memcache:
@@ -581,6 +829,44 @@ class FileSystemPackageRepository(PackageRepository):
         for package in self.get_packages(package_family_resource):
             yield package
 
+    def prefetch_packages(self, names):
+        # scan family dirs concurrently, to hide filesystem latency (which can
+        # be significant on network storage)
+        num_threads = min(_settings.scan_threads, len(names))
+        if num_threads < 2:
+            return
+
+        # listings would come from memcached instead
+        if not self.disable_memcache and config.memcached_uri \
+                and config.cache_listdir:
+            return
+
+        def _scan(name):
+            root = os.path.join(self.location, name)
+
+            # unversioned packages have no version dirs
+            if config.allow_unversioned_packages and self.get_file(root)[0]:
+                return root, None, None
+
+            key = self._path_key(root)
+            try:
+                return root, key, self._scan_version_dirs(root)
+            except OSError:
+                return root, None, None  # not a family dir, or removed since
+
+        self.index  # load the index first, rather than in every thread
+
+        pool = ThreadPool(num_threads)
+        try:
+            results = pool.map(_scan, names)
+        finally:
+            pool.close()
+            pool.join()
+
+        for root, key, dirs in results:
+            if dirs is not None:
+                self._prefetched_version_dirs[root] = (key, dirs)
+
     def iter_variants(self, package_resource):
         for variant in self.get_variants(package_resource):
             yield variant
@@ -598,6 +884,19 @@ class FileSystemPackageRepository(PackageRepository):
     def get_last_release_time(self, package_family_resource):
         return package_family_resource.get_last_release_time()
 
+    def get_package_timestamp(self, package_resource):
+        # release times are only stored for packages in their own version dir
+        if not isinstance(package_resource, FileSystemPackageResource):
+            return None
+
+        version_str = package_resource.get("version")
+        if not version_str or not package_resource.filepath:
+            return None
+
+        timestamps = self.get_timestamps(package_resource.name)
+        return timestamps.get_timestamp(version_str,
+                                        package_resource.state_handle)
+
     def get_package_from_uri(self, uri):
         """
         Example URIs:
@@ -740,10 +1039,12 @@ class FileSystemPackageRepository(PackageRepository):
         # delete the payload
         pkg_dir = os.path.join(self.location, pkg_name, str(pkg_version))
         shutil.rmtree(pkg_dir)
+        self._store_timestamps(pkg_name)
 
         # unignore (just so the .ignore{ver} file is removed)
         self.unignore_package(pkg_name, pkg_version)
 
+        self._on_changed(pkg_name)
         return True
 
     def remove_ignored_since(self, days, dry_run=False, verbose=False):
@@ -946,15 +1247,6 @@ class FileSystemPackageRepository(PackageRepository):
 
     @contextmanager
     def _lock_package(self, package_name, package_version=None):
-        from rez.vendor.lockfile import NotLocked
-
-        if _settings.file_lock_type == 'default':
-            from rez.vendor.lockfile import LockFile
-        elif _settings.file_lock_type == 'mkdir':
-            from rez.vendor.lockfile.mkdirlockfile import MkdirLockFile as LockFile
-        elif _settings.file_lock_type == 'link':
-            from rez.vendor.lockfile.linklockfile import LinkLockFile as LockFile
-
         path = self.location
 
         if self.file_lock_dir:
@@ -970,6 +1262,21 @@ class FileSystemPackageRepository(PackageRepository):
             filename += "-%s" % str(package_version)
 
         lock_file = os.path.join(path, filename)
+
+        with self._lock_file(lock_file):
+            yield
+
+    @contextmanager
+    def _lock_file(self, lock_file):
+        from rez.vendor.lockfile import NotLocked
+
+        if _settings.file_lock_type == 'default':
+            from rez.vendor.lockfile import LockFile
+        elif _settings.file_lock_type == 'mkdir':
+            from rez.vendor.lockfile.mkdirlockfile import MkdirLockFile as LockFile
+        elif _settings.file_lock_type == 'link':
+            from rez.vendor.lockfile.linklockfile import LinkLockFile as LockFile
+
         lock = LockFile(lock_file)
 
         try:
@@ -989,6 +1296,10 @@ class FileSystemPackageRepository(PackageRepository):
         self.get_packages.cache_clear()
         self.get_variants.cache_clear()
         self.get_file.cache_clear()
+        self.get_timestamps.cache_clear()
+        self._prefetched_version_dirs.clear()
+        self._read_path_keys.clear()
+        cached_property.uncache(self, "index")
 
         if not self.disable_memcache:
             self._get_family_dirs.forget()
@@ -1005,6 +1316,77 @@ class FileSystemPackageRepository(PackageRepository):
 
         return path
 
+    @cached_property
+    def index(self):
+        """Get the repository index.
+
+        Returns:
+            `RepositoryIndex`: The index, or None if there is no index, or the
+            'use_index' setting is disabled.
+        """
+        if not _settings.use_index:
+            return None
+
+        index = RepositoryIndex(self.location)
+        if index.load():
+            return index
+        return None
+
+    def update_index(self, families=None):
+        """Update the repository index.
+
+        The index is created if it does not exist.
+
+        Args:
+            families (list of str): Names of the package families to update.
+                If None, all families are updated.
+        """
+        index = RepositoryIndex(self.location)
+
+        # take a copy so that ignored packages are honored, and so that
+        # nothing is read from memcache or from the index being written
+        repo = self._copy(disable_memcache=True)
+
+        with index.lock(self):
+            index.load()
+
+            if os.path.isdir(self.location):
+                key = _dir_key(self.location)
+                family_dirs = repo._list_family_dirs()
+                index.set_family_dirs(key, family_dirs)
+
+                if families is None:
+                    families = [name for name, ext in family_dirs
+                                if ext is None]
+
+            for name in (families or []):
+                repo._update_index_family(index, name)
+
+            index.save()
+
+        cached_property.uncache(self, "index")
+
+    def update_timestamps(self, families=None):
+        """Update the stored release times of packages.
+
+        Release times are stored whenever a package is installed, so this is
+        only needed for packages that were installed before that was the case,
+        or that were changed outside of rez. Any package whose release time is
+        missing or out of date is loaded to get it.
+
+        Args:
+            families (list of str): Names of the package families to update.
+                If None, all families are updated.
+        """
+        if families is None:
+            families = [name for name, ext in self._list_family_dirs()
+                        if ext is None]
+
+        for name in families:
+            self._update_timestamps(name, load_missing=True)
+
+        self.get_timestamps.cache_clear()
+
     # -- internal
 
     def _get_family_dirs__key(self):
@@ -1015,17 +1397,25 @@ class FileSystemPackageRepository(PackageRepository):
             return str(("listdir", self.location))
 
     def _get_family_dirs(self):
+        if self.index and os.path.isdir(self.location):
+            dirs = self.index.get_family_dirs(_dir_key(self.location))
+            if dirs is not None:
+                return dirs
+
+        return self._list_family_dirs()
+
+    def _list_family_dirs(self):
         dirs = []
         if not os.path.isdir(self.location):
             return dirs
 
-        for name in os.listdir(self.location):
-            path = os.path.join(self.location, name)
+        for entry in _scandir(self.location):
+            name = entry.name
 
             if name in ("settings.yaml", self.file_lock_dir):
                 continue  # skip reserved file/dirnames
 
-            if os.path.isdir(path):
+            if entry.is_dir():
                 if is_valid_package_name(name):
                     dirs.append((name, None))
             else:
@@ -1040,27 +1430,56 @@ class FileSystemPackageRepository(PackageRepository):
         return str(("listdir", root, int(st.st_ino), st.st_mtime))
 
     def _get_version_dirs(self, root):
+        # a prefetched listing may not be read until much later, by which
+        # time the dir may have changed
+        key, dirs = self._prefetched_version_dirs.pop(root, (None, None))
+        if dirs is not None and self._path_key(root) == key:
+            return dirs
+
+        return self._scan_version_dirs(root)
+
+    def _scan_version_dirs(self, root):
+        if self.index and not self.disable_pkg_ignore:
+            dirs = self.index.get_version_dirs(
+                os.path.basename(root),
+                self._version_dirs_key(root)
+            )
+            if dirs is not None:
+                return dirs
+
+        return self._list_version_dirs(root)
+
+    def _version_dirs_key(self, root):
+        return _dir_key(root) + (_settings.check_package_definition_files,)
+
+    def _list_version_dirs(self, root):
+        entries = _scandir(root)
+
         # Ignore a version if there is a .ignore<version> file next to it
+        ignored = set()
+
+        if not self.disable_pkg_ignore:
+            i = len(self.ignore_prefix)
+            ignored = set(
+                entry.name[i:] for entry in entries
+                if entry.name.startswith(self.ignore_prefix) and entry.is_file()
+            )
+
         def ignore_dir(name):
-            if self.disable_pkg_ignore:
-                return False
-            else:
-                path = os.path.join(root, self.ignore_prefix + name)
-                return os.path.isfile(path)
+            return name in ignored
 
         # simpler case if this test is on
         #
         if _settings.check_package_definition_files:
             dirs = []
 
-            for name in os.listdir(root):
+            for entry in entries:
+                name = entry.name
                 if name.startswith('.'):
                     continue
 
-                path = os.path.join(root, name)
-
-                if os.path.isdir(path) and not ignore_dir(name) \
-                        and self._is_valid_package_directory(path):
+                if entry.is_dir() and not ignore_dir(name) \
+                        and self._is_valid_package_directory(entry.path):
                     dirs.append(name)
 
             return dirs
@@ -1073,7 +1492,8 @@ class FileSystemPackageRepository(PackageRepository):
         building_dirs = set()
 
         # find dirs and dirs marked as 'building'
-        for name in os.listdir(root):
+        for entry in entries:
+            name = entry.name
             if name.startswith('.'):
                 if not name.startswith(self.building_prefix):
                     continue
@@ -1081,9 +1501,7 @@ class FileSystemPackageRepository(PackageRepository):
                 ver_str = name[len(self.building_prefix):]
                 building_dirs.add(ver_str)
 
-            path = os.path.join(root, name)
-
-            if os.path.isdir(path) and not ignore_dir(name):
+            if entry.is_dir() and not ignore_dir(name):
                 dirs.add(name)
 
         # check 'building' dirs for validity
@@ -1102,7 +1520,30 @@ class FileSystemPackageRepository(PackageRepository):
     def _is_valid_package_directory(self, path):
         return bool(self._get_file(path, "package")[0])
 
+    def is_stale(self):
+        # Packages are released by adding version dirs to family dirs, and new
+        # families are added to the repository root, so changes are detected
+        # from the same (inode, mtime) keys used for listings. Package
+        # definition files that were loaded are tracked too, since editing one
+        # (or re-releasing over an existing version) leaves dir mtimes as is.
+        for path, key in list(self._read_path_keys.items()):
+            if self._path_key(path) != key:
+                return True
+        return False
+
+    def _path_key(self, path):
+        try:
+            return _dir_key(path)
+        except OSError:
+            return None
+
+    def _track_path(self, path):
+        # record the state of a path, before cached data is read from it
+        if path not in self._read_path_keys:
+            self._read_path_keys[path] = self._path_key(path)
+
     def _get_families(self):
+        self._track_path(self.location)
         families = []
         for name, ext in self._get_family_dirs():
             if ext is None:  # is a directory
@@ -1122,6 +1563,7 @@ class FileSystemPackageRepository(PackageRepository):
 
     def _get_family(self, name):
         is_valid_package_name(name, raise_error=True)
+        self._track_path(self.location)
         if os.path.isdir(os.path.join(self.location, name)):
             # force case-sensitive match on pkg family dir, on case-insensitive platforms
             if not platform_.has_case_sensitive_filesystem and \
@@ -1151,6 +1593,11 @@ class FileSystemPackageRepository(PackageRepository):
         return None
 
     def _get_packages(self, package_family_resource):
+        if isinstance(package_family_resource, FileSystemPackageFamilyResource):
+            self._track_path(package_family_resource.path)
+        else:
+            self._track_path(package_family_resource.filepath)
+
         return [x for x in package_family_resource.iter_packages()]
 
     def _get_variants(self, package_resource):
@@ -1434,6 +1881,12 @@ class FileSystemPackageRepository(PackageRepository):
         except:
             pass
 
+        if variant_version:
+            self._store_timestamps(
+                variant_name,
+                released={str(variant_version): package_data["timestamp"]}
+            )
+
         self._on_changed(variant_name)
 
         # load new variant. Note that we load it from a copy of this repo, with
@@ -1477,9 +1930,121 @@ class FileSystemPackageRepository(PackageRepository):
         family_path = os.path.join(self.location, pkg_name)
         os.utime(family_path, None)
 
+        if _settings.use_index:
+            try:
+                self.update_index(families=[pkg_name])
+            except Exception as e:
+                # the index is validated on read, so it's safe to leave it
+                # out of date
+                print_warning("Failed to update package repository index "
+                              "in %s: %s" % (self.location, e))
+
         # clear internal caches, otherwise change may not be visible
         self.clear_caches()
 
+    def _update_index_family(self, index, name):
+        family_path = os.path.join(self.location, name)
+        if not os.path.isdir(family_path):
+            index.remove_family(name)
+            return
+
+        # keys are taken before contents are read, so that a change made
+        # while the index is being updated invalidates the entry
+        key = self._version_dirs_key(family_path)
+        versions = self._list_version_dirs(family_path)
+        index.set_version_dirs(name, key, versions)
+
+        for version_str in versions:
+            path = os.path.join(family_path, version_str)
+            filepath, format_ = self._get_file(path)
+            if not filepath:
+                continue
+
+            key = (filepath, os.path.getmtime(filepath))
+            if index.get_package_key(name, version_str) == key:
+                continue
+
+            data = load_from_file(filepath, format_, disable_memcache=True)
+            index.set_package_data(name, version_str, key, data)
+
+    def _get_timestamps(self, name):
+        timestamps = FamilyTimestamps(os.path.join(self.location, name))
+        timestamps.load()
+        return timestamps
+
+    def _store_timestamps(self, name, released=None):
+        try:
+            self._update_timestamps(name, released=released)
+        except Exception as e:
+            # release times are validated on read, so it's safe to leave them
+            # out of date
+            print_warning("Failed to update package release times in %s: %s"
+                          % (os.path.join(self.location, name), e))
+
+    def _update_timestamps(self, name, released=None, load_missing=False):
+        """Update the stored release times of a package family.
+
+        Entries of packages that no longer exist are discarded, and entries of
+        packages whose definition file has changed are dropped, unless the new
+        release time is known.
+
+        Args:
+            name (str): Package family name.
+            released (dict): Release times of packages that have just been
+                installed, keyed by version string.
+            load_missing (bool): If True, load the packages that have no valid
+                entry, to get their release time.
+        """
+        family_path = os.path.join(self.location, name)
+        if not os.path.isdir(family_path):
+            return
+
+        released = released or {}
+        timestamps = FamilyTimestamps(family_path)
+
+        with self._lock_package(name):
+            timestamps.load()
+            entries = {}
+
+            # ignored packages are kept, so they don't need to be loaded if
+            # they are unignored again
+            for entry in _scandir(family_path):
+                version_str = entry.name
+                if version_str.startswith('.') or not entry.is_dir():
+                    continue
+
+                filepath, format_ = self._get_file(entry.path)
+                if not filepath:
+                    continue
+
+                key = os.path.getmtime(filepath)
+                timestamp = released.get(version_str)
+
+                if timestamp is None:
+                    timestamp = timestamps.get_timestamp(version_str, key)
+
+                if timestamp is None and load_missing:
+                    data = load_from_file(filepath, format_,
+                                          disable_memcache=True)
+                    timestamp = data.get("timestamp")
+
+                if timestamp:
+                    entries[version_str] = [timestamp, key]
+
+            if entries == timestamps.timestamps:
+                return
+
+            timestamps.timestamps = entries
+
+            # The family dir mtime is its last release time (see
+            # `get_last_release_time`), and writing the file must not change
+            # it. Installs and removes update the mtime separately.
+            st = os.stat(family_path)
+
+            with make_path_writable(family_path):
+                timestamps.save()
+                os.utime(family_path, (st.st_atime, st.st_mtime))
+
     def _delete_stale_build_tagfiles(self, family_path):
         now = time.time()
 